@@ -40,7 +40,7 @@ import datetime
 import os
 import shutil
 import sys
-from distutils.core import setup
+from distutils.core import setup, Extension
 
 ############################################################
 # Subprojects resolving
@@ -258,6 +258,11 @@ with open('setup.cfg', 'wb') as fileptr:
 
 modules += make_modules(src_path, include_path)
 
+libgeom_src = os.path.join(src_path, 'uc2', 'libgeom')
+modules.append(Extension('uc2.libgeom._libgeom',
+                         sources=[os.path.join(libgeom_src, '_libgeom.c')],
+                         libraries=['m']))
+
 ############################################################
 # Setup routine
 ############################################################
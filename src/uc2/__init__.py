@@ -44,5 +44,10 @@ def uc2_init():
 def uc2_run(cwd=None):
     """UniConvertor launch routine."""
 
+    from uc2.utils import importprofile
+    option = importprofile.get_option()
+    if option:
+        importprofile.install(option)
+
     app = uc2_init()
     app.run(cwd or os.getcwd())
@@ -34,6 +34,7 @@ class AppColorManager(ColorManager):
     def update(self):
         self.handles = {}
         self.clear_transforms()
+        self.app.appdata.check_color_profiles()
         config = self.app.config
         profiles = [config.cms_rgb_profile,
                     config.cms_cmyk_profile,
@@ -20,9 +20,8 @@ import os
 import sys
 
 import uc2
-from uc2 import app_cms, cmds
+from uc2 import cmds
 from uc2 import events, msgconst
-from uc2.app_palettes import PaletteManager
 from uc2.uc2conf import UCData, UCConfig
 from uc2.utils import fsutils
 from uc2.utils.mixutils import echo, config_logging
@@ -43,8 +42,8 @@ class UCApplication(object):
     path = ''
     config = None
     appdata = None
-    default_cms = None
-    palettes = None
+    _default_cms = None
+    _palettes = None
     do_verbose = False
     log_filepath = ''
 
@@ -59,9 +58,26 @@ class UCApplication(object):
         setattr(uc2, 'appdata', self.appdata)
 
     def init_mngrs(self):
-        if not self.default_cms:
-            self.default_cms = app_cms.AppColorManager(self)
-            self.palettes = PaletteManager(self)
+        """
+        Creates color and palette managers. Both of them are created
+        on first access too, so translations which don't need color
+        management don't load lcms at all.
+        """
+        if not self._default_cms:
+            from uc2.app_cms import AppColorManager
+            from uc2.app_palettes import PaletteManager
+            self._default_cms = AppColorManager(self)
+            self._palettes = PaletteManager(self)
+
+    @property
+    def default_cms(self):
+        self.init_mngrs()
+        return self._default_cms
+
+    @property
+    def palettes(self):
+        self.init_mngrs()
+        return self._palettes
 
     def verbose(self, *args):
         status = msgconst.MESSAGES[args[0]]
@@ -103,6 +119,9 @@ class UCApplication(object):
             cmds.change_config(options)
             self.config.save()
             sys.exit(0)
+        elif any(item.split('=')[0] in cmds.SERVE_CMDS
+                 for item in sys.argv[1:]):
+            self.serve(current_dir)
         elif len(sys.argv) == 2:
             cmds.show_short_help('Not enough arguments!')
             sys.exit(1)
@@ -147,8 +166,6 @@ class UCApplication(object):
         self.log_filepath = os.path.join(self.appdata.app_config_dir, 'uc2.log')
         config_logging(self.log_filepath, log_level)
 
-        self.init_mngrs()
-
         # EXECUTION ----------------------------
         status = 0
         # noinspection PyBroadException
@@ -160,3 +177,20 @@ class UCApplication(object):
         if self.do_verbose:
             echo()
         sys.exit(status)
+
+    def serve(self, current_dir=None):
+        self.do_verbose = cmds.check_args(cmds.VERBOSE_CMDS)
+        current_dir = os.getcwdu() if current_dir is None else current_dir
+        options = cmds.parse_cmd_args(current_dir)[1]
+        events.connect(events.MESSAGES, self.verbose)
+        log_level = options.get('log', self.config.log_level)
+        self.log_filepath = os.path.join(self.appdata.app_config_dir, 'uc2.log')
+        config_logging(self.log_filepath, log_level)
+
+        status = 0
+        # noinspection PyBroadException
+        try:
+            cmds.serve(self.appdata, options, current_dir)
+        except Exception:
+            status = 1
+        sys.exit(status)
@@ -24,6 +24,7 @@ from .translate import convert, wildcard_convert, multiple_convert
 from .translate import normalize_options
 from .configure import show_config, change_config
 from .parts import show_parts
+from .serve import serve
 from .const import *
 
 
@@ -19,7 +19,7 @@ import os
 import shutil
 
 import uc2
-from uc2 import uc2const, cms
+from uc2 import uc2const
 from uc2.utils import fsutils
 from uc2.utils.mixutils import echo
 
@@ -42,7 +42,7 @@ INTENTS = {
 }
 
 BOOL_ATTRS = ('cms_use', 'black_point_compensation',
-              'black_preserving_transform')
+              'black_preserving_transform', 'glyph_cache_store')
 INTENT_ATTRS = ('cms_rgb_intent', 'cms_cmyk_intent')
 PROFILES = ('cms_rgb_profile', 'cms_cmyk_profile',
             'cms_lab_profile', 'cms_gray_profile')
@@ -72,6 +72,9 @@ def show_config():
     echo('  --black_point_compensation=%s' % to_bool(config.cms_bpc_flag))
     echo('  --black_preserving_transform=%s' % to_bool(config.cms_bpt_flag))
     echo()
+    echo('  --glyph_cache_size=%d' % config.glyph_cache_size)
+    echo('  --glyph_cache_store=%s' % to_bool(config.glyph_cache_store))
+    echo()
 
 
 def change_config(options):
@@ -85,6 +88,9 @@ def change_config(options):
         elif key == 'log_level':
             if value in LEVELS:
                 config.log_level = value
+        elif key == 'glyph_cache_size':
+            if isinstance(value, int) and value > 0:
+                config.glyph_cache_size = value
         elif key in INTENT_ATTRS:
             if isinstance(value, int) and value in INTENTS:
                 config.__dict__[key] = value
@@ -99,6 +105,7 @@ def change_config(options):
             if not fsutils.exists(path):
                 echo('ERROR: file "%s" is not found!' % path)
                 continue
+            from uc2 import cms
             profile_name = cms.get_profile_name(path)
             if not profile_name:
                 echo('ERROR: file "%s" is not valid color profile!' % path)
@@ -27,11 +27,19 @@ CONFIG_CMDS = ('--configure', '-configure', '--config', '-config',
                '--preferences', '-preferences', '--prefs', '-prefs')
 CFG_SHOW_CMDS = ('--show-config', '-show-config', '--show-prefs', '-show-prefs')
 PARTS_CMDS = ('--parts', '-parts', '--components')
+JOBS_CMDS = ('--jobs',)
+ORDERED_CMDS = ('--ordered',)
+IMPORT_PROFILE_CMDS = ('--import-profile',)
+SERVE_CMDS = ('--serve',)
+PROFILE_CMDS = ('--profile',)
 
 ALL_CMDS = HELP_CMDS + DIR_CMDS + LOG_CMDS + VERBOSE_CMDS + VS_CMDS + \
-           CONFIG_CMDS + CFG_SHOW_CMDS + PARTS_CMDS
+           CONFIG_CMDS + CFG_SHOW_CMDS + PARTS_CMDS + JOBS_CMDS + \
+           ORDERED_CMDS + IMPORT_PROFILE_CMDS + SERVE_CMDS + PROFILE_CMDS
 
-IMAGE_ACTIONS = ('--image-scale', '--image-antialiasing')
+IMAGE_ACTIONS = ('--image-scale', '--image-antialiasing',
+                 '--image-tile-size', '--image-threads')
+PDF_ACTIONS = ('--pdf-gradients', '--pdf-jobs', '--pdf-streaming')
 
 FIT_PAGE_TO_IMAGE = '--fit-page-to-image'
 FIT_TO_PAGE = '--fit-to-page'
@@ -37,6 +37,8 @@ Example: uniconvertor drawing.cdr drawing.svg
  --format=       Type of output file format (values provided below)
  --package-dir   Show installation directory (for import as Python package)
  --show-log      Show detailed log of previous run
+ --import-profile[=FILE]  Report module import times (JSON into FILE)
+ --profile       Save per stage timing report into OUTPUT_FILE.profile.json
  
 ---Bulk operations:---------------------------------
  
@@ -47,6 +49,9 @@ Example: uniconvertor --recursive --format=PDF ~/clipart/*.svg ~/clipart_pdf/
  -vs, --verbose-short    Show minimized internal logs
  --dry-run               Execute command without translation
  --recursive             Recursive scanning
+ --jobs=                 Number of parallel translation processes (by default, 1)
+ --ordered               Report translated files in input order (with --jobs)
+ --profile               Save summary timing report into output directory
  
 ---Editing operations:---------------------------------
 
@@ -54,6 +59,23 @@ Example: uniconvertor --recursive --format=PDF ~/clipart/*.svg ~/clipart_pdf/
  --fit-to-page=          Adjust drawing size to page. Default "yes" (keep ratio)
  --image-scale=          Scale output image by decimal coefficient (PNG export)
  --image-antialiasing=   On/off antialiasing. Default "yes" (PNG export) 
+ --image-tile-size=      Render image by NxN px tiles (PNG export). Images larger
+                         than 4096x4096 px are tiled by 1024 px by default,
+                         "-1" disables tiling
+ --image-threads=        Number of tile rendering threads (by default, CPU count)
+ --pdf-gradients=        Gradients as "shading" (default) or "stripes" (PDF export)
+ --pdf-jobs=             Number of page rendering processes (PDF export)
+ --pdf-streaming=        Flush finished pages into file. Default "no" (PDF export)
+ 
+---Conversion server:-------------------------------
+
+Usage: uniconvertor --serve[=SOCKET_PATH] [--jobs=N]
+Example: uniconvertor --serve=/tmp/uc2.sock --jobs=4
+
+ Listens on Unix socket (by default, ~/.config/uc2/uc2.sock) for newline
+ separated JSON requests {"input": ..., "output": ..., "options": {...}}
+ and answers with JSON status line per request. Translations are executed
+ by N warm worker processes. {"command": "shutdown"} stops the server.
  
 ---Configuring:-------------------------------------
 
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Conversion server (uniconvertor --serve).
+
+Server listens on Unix socket and reads newline separated JSON requests.
+Each connection may send any number of requests, every request gets
+single JSON line response in the same order:
+
+  {"id": 1, "input": "/in.cdr", "output": "/out.svg", "options": {}}
+  => {"id": 1, "status": "ok", "input": ..., "output": ...,
+      "time": 0.154, "messages": [["JOB", "..."], ...]}
+
+Service commands are {"command": "ping"} and {"command": "shutdown"}.
+Translations run in pool of --jobs=N worker processes which keep
+initialized application, color manager, font map and loaded format
+modules between jobs. Job which is not finished in JOB_TIMEOUT seconds
+(e.g. its worker is crashed) fails, and worker pool is restarted.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import stat
+import threading
+import time
+
+try:
+    import SocketServer as socketserver
+except ImportError:
+    import socketserver
+
+from uc2 import events, msgconst
+from uc2.utils.mixutils import echo
+
+from . import translate
+
+LOG = logging.getLogger(__name__)
+
+SOCKET_NAME = 'uc2.sock'
+# seconds
+JOB_TIMEOUT = 600
+
+
+def _init_server_worker():
+    translate._init_worker()
+    # noinspection PyBroadException
+    try:
+        from uc2.libpango import fonts
+        fonts.update_fonts()
+    except Exception:
+        LOG.warning('Font map is not preloaded in conversion worker')
+
+
+def _response(request, status, **kw):
+    response = {'status': status}
+    if isinstance(request, dict) and 'id' in request:
+        response['id'] = request['id']
+    response.update(kw)
+    return response
+
+
+class ConversionServer(socketserver.ThreadingMixIn,
+                       socketserver.UnixStreamServer):
+    daemon_threads = True
+    jobs = 1
+    job_timeout = JOB_TIMEOUT
+    pool = None
+    pool_lock = None
+    workdir = None
+
+    def start_pool(self, jobs):
+        self.jobs = jobs
+        self.pool_lock = threading.Lock()
+        self.pool = multiprocessing.Pool(jobs, _init_server_worker)
+
+    def restart_pool(self, pool):
+        """
+        Replaces broken pool. Pool which is already replaced
+        by other connection thread is ignored.
+        """
+        with self.pool_lock:
+            if self.pool is not pool:
+                return
+            self.pool = multiprocessing.Pool(self.jobs, _init_server_worker)
+        LOG.warning('Conversion worker pool is restarted')
+        pool.terminate()
+        pool.join()
+
+    def stop_pool(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def run_job(self, request):
+        if request.get('command') == 'ping':
+            return _response(request, 'ok')
+        if request.get('command') == 'shutdown':
+            threading.Thread(target=self.shutdown).start()
+            return _response(request, 'ok')
+
+        filepath = request.get('input')
+        out_filepath = request.get('output')
+        options = request.get('options') or {}
+        if not filepath or not out_filepath or not isinstance(options, dict):
+            msg = 'Request should contain "input" and "output" file paths'
+            return _response(request, 'fail', error=msg)
+        filepath = os.path.join(self.workdir, filepath)
+        out_filepath = os.path.join(self.workdir, out_filepath)
+
+        start = time.time()
+        job = (filepath, out_filepath, options)
+        pool = self.pool
+        try:
+            result = pool.apply_async(translate._worker_convert, (job,))
+            status, messages = result.get(self.job_timeout)[2:4]
+        except multiprocessing.TimeoutError:
+            self.restart_pool(pool)
+            msg = 'Translation is not finished in %s seconds' % \
+                  self.job_timeout
+            return _response(request, 'fail', input=filepath,
+                             output=out_filepath, error=msg)
+        except Exception as e:
+            LOG.exception('Conversion worker error')
+            self.restart_pool(pool)
+            return _response(request, 'fail', input=filepath,
+                             output=out_filepath, error=str(e))
+        messages = [[msgconst.MESSAGES[level], text]
+                    for level, text in messages]
+        return _response(request, 'ok' if status else 'fail',
+                         input=filepath, output=out_filepath,
+                         time=round(time.time() - start, 6),
+                         messages=messages)
+
+
+class ConversionHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            request = None
+            # noinspection PyBroadException
+            try:
+                request = json.loads(line.decode('utf-8'))
+                if not isinstance(request, dict):
+                    raise ValueError('JSON object is expected')
+                response = self.server.run_job(request)
+            except Exception as e:
+                LOG.exception('Error processing request %s', line)
+                response = _response(request, 'fail', error=str(e))
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+def _get_socket_path(appdata, options):
+    path = options.get('serve')
+    if not isinstance(path, str) or not path:
+        path = os.path.join(appdata.app_config_dir, SOCKET_NAME)
+    return os.path.abspath(os.path.expanduser(path))
+
+
+def _is_socket(path):
+    return stat.S_ISSOCK(os.stat(path).st_mode)
+
+
+def _check_stale_socket(path):
+    """
+    Checks socket path is free. Socket file left by killed server
+    is removed, other files are never touched.
+    """
+    if not os.path.exists(path):
+        return True
+    if not _is_socket(path):
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except socket.error:
+        os.remove(path)
+        return True
+    finally:
+        sock.close()
+    return False
+
+
+def serve(appdata, options, current_dir=None):
+    """
+    Runs conversion server until shutdown command or interruption.
+    """
+    path = _get_socket_path(appdata, options)
+    if os.path.exists(path) and not _is_socket(path):
+        msg = 'Cannot use "%s" as server socket, file is not a socket' % path
+        events.emit(events.MESSAGES, msgconst.STOP, msg)
+        raise Exception(msg)
+    if not _check_stale_socket(path):
+        msg = 'Conversion server is already running on "%s"' % path
+        events.emit(events.MESSAGES, msgconst.STOP, msg)
+        raise Exception(msg)
+
+    jobs = translate._get_jobs_number(options)
+    server = None
+    try:
+        server = ConversionServer(path, ConversionHandler)
+        server.workdir = current_dir or os.getcwd()
+        server.start_pool(jobs)
+
+        msg = 'Conversion server listens on "%s" with %d workers' % \
+              (path, jobs)
+        events.emit(events.MESSAGES, msgconst.OK, msg)
+        echo(msg)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.server_close()
+            if os.path.exists(path) and _is_socket(path):
+                os.remove(path)
+            server.stop_pool()
+    events.emit(events.MESSAGES, msgconst.OK, 'Conversion server is stopped')
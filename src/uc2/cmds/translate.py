@@ -18,11 +18,14 @@
 import copy
 import glob
 import logging
+import multiprocessing
 import os
 import sys
 
+import uc2
 from uc2 import events, uc2const, msgconst
 from uc2.formats import get_loader, get_saver, get_saver_by_id
+from uc2.utils import convprofile
 from uc2.utils.mixutils import echo
 
 from . import const
@@ -45,7 +48,50 @@ def normalize_options(options):
             options[key.replace('-', '_')] = options.pop(key)
 
 
+def _configure_glyph_cache(appdata):
+    from uc2 import libpango
+    config = appdata.app.config
+    store_path = None
+    if config.glyph_cache_store:
+        store_path = os.path.join(appdata.app_config_dir, 'glyph_cache')
+    libpango.configure_glyph_cache(config.glyph_cache_size, store_path)
+
+
+def _log_glyph_cache_info():
+    from uc2 import libpango
+    hits, store_hits, misses, size, max_size = libpango.get_glyph_cache_info()
+    if hits or store_hits or misses:
+        LOG.info('Glyph cache: %d hits, %d store hits, %d misses (%.1f%%), '
+                 '%d of %d glyphs', hits, store_hits, misses,
+                 libpango.get_glyph_cache_hit_rate() * 100.0, size, max_size)
+
+
 def convert(appdata, files, options):
+    """
+    Translates files[0] into files[1]. With --profile per stage timing
+    report is saved next to output file and returned.
+    """
+    if not options.get('profile') or options.get('dry-run'):
+        _convert(appdata, files, options)
+        return None
+
+    profile = convprofile.ConversionProfile(files[0])
+    profile.start()
+    try:
+        _convert(appdata, files, options)
+    finally:
+        profile.stop()
+        report = profile.get_report()
+        report_path = files[1] + convprofile.REPORT_EXTENSION
+        try:
+            convprofile.save_report(report, report_path)
+        except (IOError, OSError) as e:
+            msg = 'Cannot write profile report "%s": %s' % (report_path, e)
+            events.emit(events.MESSAGES, msgconst.WARNING, msg)
+    return report
+
+
+def _convert(appdata, files, options):
     dry_run = bool(options.get('dry-run'))
     normalize_options(options)
 
@@ -68,7 +114,8 @@ def convert(appdata, files, options):
         raise Exception(msg)
 
     # Define loader -----------------------------------------
-    loader, loader_id = get_loader(files[0], return_id=True)
+    with convprofile.stage('detect'):
+        loader, loader_id = get_loader(files[0], return_id=True)
     if loader is None:
         msg = 'Input file format of "%s" is unsupported.' % files[0]
         events.emit(events.MESSAGES, msgconst.ERROR, msg)
@@ -80,13 +127,16 @@ def convert(appdata, files, options):
     if dry_run:
         return
 
+    _configure_glyph_cache(appdata)
+
     # File loading -----------------------------------------
     try:
-        if loader_id in uc2const.PALETTE_LOADERS and \
-                saver_id in uc2const.PALETTE_SAVERS:
-            doc = loader(appdata, files[0], convert=True, **options)
-        else:
-            doc = loader(appdata, files[0], **options)
+        with convprofile.stage('load'):
+            if loader_id in uc2const.PALETTE_LOADERS and \
+                    saver_id in uc2const.PALETTE_SAVERS:
+                doc = loader(appdata, files[0], convert=True, **options)
+            else:
+                doc = loader(appdata, files[0], **options)
     except Exception:
         msg = 'Error while loading "%s"' % files[0]
         msg += 'The file may be corrupted or contains unknown file format.'
@@ -97,28 +147,34 @@ def convert(appdata, files, options):
         events.emit(events.MESSAGES, msgconst.STOP, msg)
         raise
 
+    if doc is not None:
+        convprofile.add_objects(doc.model)
+
     # Model transforming ----------------------------------
-    if doc and doc.cid == uc2const.SK2:
-        for action in CLI_ACTIONS:
-            if action == const.FIT_PAGE_TO_IMAGE:
-                msg = 'ACTION: Fit page to image'
-                LOG.info(msg)
-                events.emit(events.MESSAGES, msgconst.JOB, msg)
-                doc.methods.fit_pages_to_image()
-            elif action == const.FIT_TO_PAGE:
-                msg = 'ACTION: Fit drawing to page'
-                LOG.info(msg)
-                events.emit(events.MESSAGES, msgconst.JOB, msg)
-                doc.methods.fit_to_pages()
+    if doc and doc.cid == uc2const.SK2 and CLI_ACTIONS:
+        with convprofile.stage('actions'):
+            for action in CLI_ACTIONS:
+                if action == const.FIT_PAGE_TO_IMAGE:
+                    msg = 'ACTION: Fit page to image'
+                    LOG.info(msg)
+                    events.emit(events.MESSAGES, msgconst.JOB, msg)
+                    doc.methods.fit_pages_to_image()
+                elif action == const.FIT_TO_PAGE:
+                    msg = 'ACTION: Fit drawing to page'
+                    LOG.info(msg)
+                    events.emit(events.MESSAGES, msgconst.JOB, msg)
+                    doc.methods.fit_to_pages()
 
     # File saving -----------------------------------------
     if doc is not None:
         try:
-            if loader_id in uc2const.PALETTE_LOADERS and \
-                    saver_id in uc2const.PALETTE_SAVERS:
-                saver(doc, files[1], translate=False, convert=True, **options)
-            else:
-                saver(doc, files[1], **options)
+            with convprofile.stage('save'):
+                if loader_id in uc2const.PALETTE_LOADERS and \
+                        saver_id in uc2const.PALETTE_SAVERS:
+                    saver(doc, files[1], translate=False, convert=True,
+                          **options)
+                else:
+                    saver(doc, files[1], **options)
         except Exception:
             msg = 'Error while translation and saving "%s"' % files[0]
             events.emit(events.MESSAGES, msgconst.ERROR, msg)
@@ -135,7 +191,9 @@ def convert(appdata, files, options):
         events.emit(events.MESSAGES, msgconst.STOP, msg2)
         raise Exception(msg)
 
-    doc.close()
+    with convprofile.stage('close'):
+        doc.close()
+    _log_glyph_cache_info()
     msg = 'Translation is successful'
     events.emit(events.MESSAGES, msgconst.OK, msg)
 
@@ -175,38 +233,144 @@ def _get_filelist(path, subpath, wildcard, recursive=False):
     return filelist
 
 
-def multiple_convert(appdata, files, options):
-    saver_ext = _get_saver_extension(options)
+def _get_jobs_number(options):
+    jobs = options.get('jobs', 1)
+    if jobs is True:
+        jobs = multiprocessing.cpu_count()
+    elif not isinstance(jobs, int) or jobs < 1:
+        msg = 'Wrong jobs number "%s", serial translation is used' % jobs
+        events.emit(events.MESSAGES, msgconst.WARNING, msg)
+        jobs = 1
+    return jobs
+
+
+def _report(filepath, out_filepath, status, verbose, verbose_short):
+    if status and verbose:
+        echo()
+    elif verbose_short:
+        echo('Translation of "%s"' % filepath)
+        echo('into "%s" ...[%s]\n' % (out_filepath,
+                                     '  OK  ' if status else ' FAIL '))
+
+
+# Batch translation in process pool ----------------------
+
+WORKER_APP = None
+WORKER_MESSAGES = []
+
+
+def _collect_message(*args):
+    WORKER_MESSAGES.append(args)
+
+
+def _init_worker():
+    global WORKER_APP
+    WORKER_APP = uc2.uc2_init()
+    WORKER_APP.init_mngrs()
+    events.clean_channel(events.MESSAGES)
+    events.connect(events.MESSAGES, _collect_message)
+
+
+def _worker_convert(job):
+    filepath, out_filepath, options = job
+    WORKER_MESSAGES[:] = []
+    status = True
+    report = None
+    # noinspection PyBroadException
+    try:
+        report = convert(WORKER_APP.appdata, (filepath, out_filepath), options)
+    except Exception:
+        status = False
+    return filepath, out_filepath, status, list(WORKER_MESSAGES), report
+
+
+def _batch_convert(appdata, filelist, options):
+    """
+    Translates (filepath, out_filepath) pairs. With --jobs=N files are sent
+    to pool of N worker processes, each one initializes UCApplication
+    and its color manager once and reuses them for all received files.
+    Worker messages are replayed in main process so per-file reports
+    are not mixed. With --ordered reports follow filelist order,
+    otherwise files are reported as soon as translated.
+    Returns list of profile reports of translated files (with --profile).
+    """
     verbose = bool(options.get('verbose'))
     verbose_short = bool(options.get('verbose-short'))
+    jobs = min(_get_jobs_number(options), len(filelist))
+    reports = []
+
+    if jobs < 2:
+        for filepath, out_filepath in filelist:
+            kw = copy.deepcopy(options)
+            status = True
+            report = None
+            try:
+                report = convert(appdata, (filepath, out_filepath), kw)
+            except Exception:
+                status = False
+            if report:
+                reports.append(report)
+            _report(filepath, out_filepath, status, verbose, verbose_short)
+        return reports
+
+    msg = 'Translation of %d files in %d processes' % (len(filelist), jobs)
+    events.emit(events.MESSAGES, msgconst.JOB, msg)
+
+    pool = multiprocessing.Pool(jobs, _init_worker)
+    try:
+        tasks = [(filepath, out_filepath, copy.deepcopy(options))
+                 for filepath, out_filepath in filelist]
+        imap = pool.imap if options.get('ordered') else pool.imap_unordered
+        for filepath, out_filepath, status, messages, report in imap(
+                _worker_convert, tasks):
+            for item in messages:
+                events.emit(events.MESSAGES, *item)
+            if report:
+                reports.append(report)
+            _report(filepath, out_filepath, status, verbose, verbose_short)
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return reports
+
+
+def _save_batch_profile(reports, dir_path):
+    if not reports:
+        return
+    path = os.path.join(dir_path, convprofile.BATCH_REPORT_NAME)
+    try:
+        convprofile.save_report(convprofile.aggregate(reports), path)
+    except (IOError, OSError) as e:
+        msg = 'Cannot write profile report "%s": %s' % (path, e)
+        events.emit(events.MESSAGES, msgconst.WARNING, msg)
+        return
+    msg = 'Profile report of %d files is saved into "%s"' % (len(reports), path)
+    events.emit(events.MESSAGES, msgconst.INFO, msg)
+
 
-    filelist = files[:-1]
+def multiple_convert(appdata, files, options):
+    saver_ext = _get_saver_extension(options)
+
+    filelist = []
     dir_path = files[-1]
-    for filepath in filelist:
+    for filepath in files[:-1]:
         if not os.path.exists(filepath):
             msg = 'File "%s" is not found' % filepath
             events.emit(events.MESSAGES, msgconst.STOP, msg)
             continue
         filename = os.path.basename(filepath).split('.', 1)[0]
         out_filepath = os.path.join(dir_path, '%s.%s' % (filename, saver_ext))
-        kw = copy.deepcopy(options)
-        try:
-            convert(appdata, (filepath, out_filepath), kw)
-            if verbose:
-                echo()
-            elif verbose_short:
-                echo('Translation of "%s"' % filepath)
-                echo('into "%s" ...[  OK  ]\n' % out_filepath)
-        except Exception:
-            if verbose_short:
-                echo('Translation of "%s"' % filepath)
-                echo('into "%s" ...[ FAIL ]\n' % out_filepath)
+        filelist.append((filepath, out_filepath))
+
+    reports = _batch_convert(appdata, filelist, options)
+    _save_batch_profile(reports, dir_path)
 
 
 def wildcard_convert(appdata, files, options):
     saver_ext = _get_saver_extension(options)
-    verbose = bool(options.get('verbose'))
-    verbose_short = bool(options.get('verbose-short'))
 
     path = os.path.dirname(files[0])
     wildcard = os.path.basename(files[0])
@@ -217,20 +381,13 @@ def wildcard_convert(appdata, files, options):
         events.emit(events.MESSAGES, msgconst.STOP, msg)
         return
 
+    pairs = []
     for filepath, subpath, filename in filelist:
         dir_path = os.path.join(files[1], subpath)
         if not os.path.exists(dir_path):
             os.makedirs(dir_path)
         out_filepath = os.path.join(dir_path, '%s.%s' % (filename, saver_ext))
-        kw = copy.deepcopy(options)
-        try:
-            convert(appdata, (filepath, out_filepath), kw)
-            if verbose:
-                echo()
-            elif verbose_short:
-                echo('Translation of "%s"' % filepath)
-                echo('into "%s" ...[  OK  ]\n' % out_filepath)
-        except Exception:
-            if verbose_short:
-                echo('Translation of "%s"' % filepath)
-                echo('into "%s" ...[ FAIL ]\n' % out_filepath)
+        pairs.append((filepath, out_filepath))
+
+    reports = _batch_convert(appdata, pairs, options)
+    _save_batch_profile(reports, files[1])
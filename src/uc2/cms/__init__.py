@@ -17,6 +17,9 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import copy
+import itertools
+import threading
+from collections import OrderedDict
 from copy import deepcopy
 
 from . import libcms
@@ -28,7 +31,12 @@ from uc2.uc2const import IMAGE_MONO, IMAGE_GRAY, IMAGE_RGB, IMAGE_CMYK, \
     IMAGE_LAB, IMAGE_TO_COLOR
 from uc2.utils import fsutils
 
+# unique ids of color management states, see ColorManager.get_state_key()
+STATE_IDS = itertools.count(1)
+
 CS = [COLOR_RGB, COLOR_CMYK, COLOR_LAB, COLOR_GRAY]
+# bytes per color of lcms transform types which are not 4 bytes long
+PIXEL_SIZES = {COLOR_GRAY: 1, COLOR_LAB: 3}
 
 
 def get_registration_black():
@@ -345,6 +353,14 @@ def colorb(color=None, cmyk=False):
     return result
 
 
+def get_pixel_size(color_type):
+    """
+    Returns bytes per color of lcms transform type used for colorspace.
+    Grayscale and Lab transforms use TYPE_GRAY_8 and TYPE_Lab_8.
+    """
+    return PIXEL_SIZES.get(color_type, 4)
+
+
 def decode_colorb(colorb, color_type):
     """
     Decodes colorb list into generic color values.
@@ -458,6 +474,13 @@ class ColorManager(object):
     transforms = None
     proof_transforms = None
 
+    color_cache = None
+    cache_lock = None
+    color_cache_size = 4096
+    cache_hits = 0
+    cache_misses = 0
+    state_id = 0
+
     use_cms = True
     use_display_profile = False
     proofing = False
@@ -470,6 +493,8 @@ class ColorManager(object):
     flags = uc2const.cmsFLAGS_NOTPRECALC
 
     def __init__(self):
+        # renderers may share color manager between threads
+        self.cache_lock = threading.Lock()
         self.update()
 
     def update(self):
@@ -484,6 +509,53 @@ class ColorManager(object):
     def clear_transforms(self):
         self.transforms = {}
         self.proof_transforms = {}
+        self.state_id = next(STATE_IDS)
+        self.clear_color_cache()
+
+    def get_state_key(self):
+        """
+        Returns hashable key of current color management state.
+        Key is changed when profiles are reloaded or any option
+        affecting color conversion is changed, so it can be used
+        in keys of cached color converted images.
+        """
+        return (self.state_id, self.use_cms, self.use_display_profile,
+                self.proofing, self.gamutcheck, tuple(self.alarm_codes),
+                self.proof_for_spot, self.rgb_intent, self.cmyk_intent,
+                self.flags)
+
+    def clear_color_cache(self):
+        """
+        Drops memoized color conversions. Hit/miss counters
+        are kept to be able to size the cache over the whole session.
+        """
+        self.color_cache = OrderedDict()
+
+    def get_cache_info(self):
+        """
+        Returns color conversion cache statistics as
+        (hits, misses, current size, maximum size) tuple.
+        """
+        return (self.cache_hits, self.cache_misses,
+                len(self.color_cache), self.color_cache_size)
+
+    def _cache_get(self, key):
+        with self.cache_lock:
+            cache = self.color_cache
+            value = cache.pop(key, None)
+            if value is None:
+                self.cache_misses += 1
+                return None
+            self.cache_hits += 1
+            cache[key] = value
+            return value
+
+    def _cache_put(self, key, value):
+        with self.cache_lock:
+            cache = self.color_cache
+            cache[key] = value
+            if len(cache) > self.color_cache_size:
+                cache.popitem(last=False)
 
     def get_transform(self, cs_in, cs_out):
         """
@@ -535,11 +607,60 @@ class ColorManager(object):
         if not self.use_cms:
             return do_simple_transform(color[1], cs_in, cs_out)
         in_color = colorb(color)
-        out_color = colorb()
-        transform = self.get_transform(cs_in, cs_out)
-        libcms.cms_do_transform(transform, in_color, out_color)
+        key = (cs_in, cs_out, tuple(in_color))
+        out_color = self._cache_get(key)
+        if out_color is None:
+            out_color = colorb()
+            transform = self.get_transform(cs_in, cs_out)
+            libcms.cms_do_transform(transform, in_color, out_color)
+            self._cache_put(key, out_color)
         return decode_colorb(out_color, cs_out)
 
+    def do_transform_many(self, colors, cs_in, cs_out):
+        """
+        Converts list of colors between colorspaces.
+        All colors are transformed by single lcms call.
+        Returns list of color values lists.
+        """
+        if not self.use_cms:
+            return [do_simple_transform(color[1], cs_in, cs_out)
+                    for color in colors]
+        return self._transform_many(colors, cs_in, cs_out)
+
+    def _transform_many(self, colors, cs_in, cs_out, proof=False):
+        """
+        Transforms colors missing in color cache by single lcms call.
+        Proof transform results are cached under None output colorspace.
+        """
+        key_cs = None if proof else cs_out
+        # proof transforms output RGB values
+        in_size = get_pixel_size(cs_in)
+        out_size = get_pixel_size(COLOR_RGB if proof else cs_out)
+        results = []
+        misses = []
+        inbuff = []
+        for color in colors:
+            in_color = colorb(color)
+            key = (cs_in, key_cs, tuple(in_color))
+            out_color = self._cache_get(key)
+            if out_color is None:
+                misses.append((len(results), key))
+                inbuff += in_color[:in_size]
+            results.append(out_color)
+        if misses:
+            if proof:
+                transform = self.get_proof_transform(cs_in)
+            else:
+                transform = self.get_transform(cs_in, cs_out)
+            outbuff = libcms.cms_do_transform_many(
+                transform, inbuff, len(misses), in_size, out_size)
+            padding = [0] * (4 - out_size)
+            for i, (index, key) in enumerate(misses):
+                out_color = outbuff[i * out_size:(i + 1) * out_size] + padding
+                self._cache_put(key, out_color)
+                results[index] = out_color
+        return [decode_colorb(item, cs_out) for item in results]
+
     def do_bitmap_transform(self, img, mode, cs_out=None):
         """
         Does image proof transform.
@@ -559,11 +680,23 @@ class ColorManager(object):
         Returns list of color values.
         """
         in_color = colorb(color)
-        out_color = colorb()
-        transform = self.get_proof_transform(cs_in)
-        libcms.cms_do_transform(transform, in_color, out_color)
+        key = (cs_in, None, tuple(in_color))
+        out_color = self._cache_get(key)
+        if out_color is None:
+            out_color = colorb()
+            transform = self.get_proof_transform(cs_in)
+            libcms.cms_do_transform(transform, in_color, out_color)
+            self._cache_put(key, out_color)
         return decode_colorb(out_color, COLOR_RGB)
 
+    def do_proof_transform_many(self, colors, cs_in):
+        """
+        Does color proof transform for list of colors.
+        All colors are transformed by single lcms call.
+        Returns list of color values lists.
+        """
+        return self._transform_many(colors, cs_in, COLOR_RGB, proof=True)
+
     def do_proof_bitmap_transform(self, img):
         """
         Does image proof transform.
@@ -659,6 +792,32 @@ class ColorManager(object):
                        COLOR_GRAY: self.get_grayscale_color}
         return methods_map[cs](color)
 
+    def get_colors(self, colors, cs=COLOR_RGB):
+        """
+        Batch variant of get_color(). Colors are grouped by colorspace
+        and each group is converted by single lcms call.
+        Stores alpha channel and color name.
+        """
+        result = [None] * len(colors)
+        groups = {}
+        for index, color in enumerate(colors):
+            if color[0] == COLOR_SPOT:
+                rgb, cmyk = color[1]
+                if (cs == COLOR_CMYK and cmyk) or not rgb:
+                    color = [COLOR_CMYK, [] + cmyk, color[2], color[3]]
+                else:
+                    color = [COLOR_RGB, [] + rgb, color[2], color[3]]
+            if color[0] == cs:
+                result[index] = deepcopy(color)
+            else:
+                groups.setdefault(color[0], []).append((index, color))
+        for cs_in, items in groups.items():
+            values = self.do_transform_many([item[1] for item in items],
+                                            cs_in, cs)
+            for (index, color), vals in zip(items, values):
+                result[index] = [cs, vals, color[2], color[3]]
+        return result
+
     def mix_colors(self, color0, color1, coef=.5):
         supported = [COLOR_RGB, COLOR_CMYK, COLOR_GRAY]
         if not color0[0] in supported:
@@ -716,6 +875,46 @@ class ColorManager(object):
                 ret = self.do_transform(color, cs_in, cs_out)
         return ret
 
+    def get_display_colors(self, colors):
+        """
+        Batch variant of get_display_color(). Colors are grouped
+        by required transform and each group is processed
+        by single lcms call.
+        Returns list of RGB values lists.
+        """
+        if not self.use_cms:
+            return [item[1] for item in self.get_colors(colors)]
+
+        cs_out = COLOR_RGB
+        if self.use_display_profile and COLOR_DISPLAY in self.handles:
+            cs_out = COLOR_DISPLAY
+        result = [None] * len(colors)
+        groups = {}
+        for index, color in enumerate(colors):
+            cs_in = color[0]
+            proof = False
+            if cs_in == COLOR_SPOT:
+                if self.proofing and self.proof_for_spot:
+                    color = self.get_cmyk_color(color)
+                else:
+                    color = self.get_rgb_color(color)
+                cs_in = color[0]
+            elif self.proofing and not cs_in == COLOR_CMYK:
+                proof = True
+            if not proof and cs_in == cs_out:
+                result[index] = color[1]
+            else:
+                groups.setdefault((proof, cs_in), []).append((index, color))
+        for (proof, cs_in), items in groups.items():
+            group = [item[1] for item in items]
+            if proof:
+                values = self.do_proof_transform_many(group, cs_in)
+            else:
+                values = self.do_transform_many(group, cs_in, cs_out)
+            for (index, color), vals in zip(items, values):
+                result[index] = vals
+        return result
+
     def get_display_color255(self, color):
         return val_255(self.get_display_color(color))
 
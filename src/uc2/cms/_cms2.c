@@ -493,6 +493,37 @@ pycms_TransformPixels (PyObject *self, PyObject *args) {
 	return Py_BuildValue("O",  PyCObject_FromVoidPtr((void *)result, (void *)free));
 }
 
+static PyObject *
+pycms_TransformBuffer (PyObject *self, PyObject *args) {
+
+	int count;
+	int size;
+	unsigned char *inbuf;
+	void *transform;
+	cmsHTRANSFORM hTransform;
+	PyObject *result;
+
+	if (!PyArg_ParseTuple(args, "Os#i", &transform, &inbuf, &size, &count)) {
+		Py_INCREF(Py_None);
+		return Py_None;
+	}
+
+	if (count < 0 || size < count * 4) {
+		Py_INCREF(Py_None);
+		return Py_None;
+	}
+
+	hTransform = (cmsHTRANSFORM) PyCObject_AsVoidPtr(transform);
+
+	result = PyString_FromStringAndSize(NULL, count * 4);
+	if (result == NULL) return NULL;
+
+	if (count) cmsDoTransform(hTransform, inbuf,
+			(unsigned char *) PyString_AS_STRING(result), count);
+
+	return result;
+}
+
 static PyObject *
 pycms_GetVersion (PyObject *self, PyObject *args) {
 	return Py_BuildValue("i",  LCMS_VERSION);
@@ -518,6 +549,7 @@ PyMethodDef pycms_methods[] = {
 	{"getPixelsFromImage", pycms_GetPixelsFromImage, METH_VARARGS},
 	{"setImagePixels", pycms_SetImagePixels, METH_VARARGS},
 	{"transformPixels", pycms_TransformPixels, METH_VARARGS},
+	{"transformBuffer", pycms_TransformBuffer, METH_VARARGS},
 	{NULL, NULL}
 };
 
@@ -19,7 +19,6 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
-from PIL import Image
 
 from . import _cms
 
@@ -415,6 +414,33 @@ def cms_do_transform(transform, inbuff, outbuff):
         raise CmsError(msg)
 
 
+def cms_do_transform_many(transform, inbuff, count, in_size=4, out_size=4):
+    """Transform packed color values using provided lcms transform handle.
+    All colors are processed by single lcms call.
+
+    :param transform: valid lcms transformation handle
+    :param inbuff: list of count*in_size members. The members should be
+                   between 0 and 255
+    :param count: number of packed colors
+    :param in_size: bytes per color of transform input type
+                    (1 for TYPE_GRAY_8, 3 for TYPE_Lab_8, otherwise 4)
+    :param out_size: bytes per color of transform output type
+    :return: list of count*out_size transformed values
+    """
+    if not isinstance(inbuff, list) or not len(inbuff) == count * in_size:
+        msg = 'inbuff must be Python list object of count*in_size members'
+        raise CmsError(msg)
+    if not count:
+        return []
+    # transformBuffer expects and returns buffers of count*4 bytes,
+    # packed colors of shorter types occupy their beginning
+    inbuff = inbuff + [0] * (count * (4 - in_size))
+    ret = _cms.transformBuffer(transform, bytes(bytearray(inbuff)), count)
+    if ret is None:
+        raise CmsError('Cannot transform color buffer')
+    return list(bytearray(ret))[:count * out_size]
+
+
 def cms_do_bitmap_transform(transform, image, in_mode, out_mode):
     """Provides PIL images support for color management.
     Currently supports L, RGB, CMYK and LAB modes only.
@@ -436,6 +462,8 @@ def cms_do_bitmap_transform(transform, image, in_mode, out_mode):
     if out_mode not in uc2const.IMAGE_COLORSPACES:
         raise CmsError('unsupported out_mode type: %s' % out_mode)
 
+    from PIL import Image
+
     w, h = image.size
     image.load()
     new_image = Image.new(out_mode, (w, h))
@@ -16,6 +16,7 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import logging
+import time
 
 LOG = logging.getLogger(__name__)
 
@@ -67,14 +68,22 @@ def disconnect(channel, receiver):
             LOG.error(msg, receiver, channel, e)
 
 
+def has_receivers(channel):
+    """
+    Checks are there receivers connected to channel.
+    """
+    return len(channel) > 1
+
+
 def emit(channel, *args):
     """
     Sends signal to all receivers in channel.
     """
+    if len(channel) < 2:
+        return
     for receiver in channel[1:]:
         try:
-            if callable(receiver):
-                receiver(*args)
+            receiver(*args)
         except Exception as e:
             msg = 'Error calling <%s> receiver with %s %s'
             LOG.error(msg, receiver, args, e)
@@ -96,3 +105,84 @@ def clean_all_channels():
     """
     for item in (CONFIG_MODIFIED, MESSAGES, FILTER_INFO):
         clean_channel(item)
+
+
+# Progress reporting
+
+PROGRESS_INTERVAL = 0.1
+PROGRESS_STEP = 0.01
+
+
+class Progress(object):
+    """
+    Throttled progress reporter for FILTER_INFO channel.
+
+    Position in range 0.0-1.0 is scaled into [start, end] range and
+    is emitted only if it is moved for step at least and interval
+    (in seconds) is passed since previous message. Without receivers
+    in FILTER_INFO channel nothing is computed and emitted. In loops
+    over known number of items tick() checks position about a hundred
+    times per loop.
+    """
+
+    def __init__(self, msg='', start=0.0, end=1.0,
+                 interval=PROGRESS_INTERVAL, step=PROGRESS_STEP):
+        self.msg = msg
+        self.start = start
+        self.end = end
+        self.interval = interval
+        self.step = step
+        self.position = None
+        self.timestamp = 0.0
+        self.total = 0
+        self.count = 0
+        self.next_check = 0
+
+    def is_active(self):
+        return len(FILTER_INFO) > 1
+
+    def set_message(self, msg):
+        self.msg = msg
+
+    def set_range(self, start=0.0, end=1.0):
+        self.start = start
+        self.end = end
+
+    def set_total(self, total):
+        self.total = total
+        self.count = 0
+        self.next_check = max(1, total // 100)
+
+    def update(self, position, msg=None, force=False):
+        if len(FILTER_INFO) < 2:
+            return
+        position = self.start + position * (self.end - self.start)
+        if not force and self.position is not None:
+            if abs(position - self.position) < self.step:
+                return
+            now = time.time()
+            if now - self.timestamp < self.interval:
+                return
+            self.timestamp = now
+        else:
+            self.timestamp = time.time()
+        self.position = position
+        if msg is not None:
+            self.msg = msg
+        emit(FILTER_INFO, self.msg, position)
+
+    def tick(self, num=1):
+        self.count += num
+        if self.count < self.next_check:
+            return
+        self.next_check = self.count + max(1, self.total // 100)
+        if self.total:
+            self.update(min(1.0, float(self.count) / self.total))
+
+
+def emit_progress(msg, position):
+    """
+    Sends single progress message without throttling.
+    """
+    if len(FILTER_INFO) > 1:
+        emit(FILTER_INFO, msg, position)
@@ -16,9 +16,9 @@
 # 	along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import logging
+import time
 from importlib import import_module
 
-from fallback import fallback_check, im_loader
 from uc2 import events, msgconst
 from uc2 import uc2const
 from uc2.utils import fsutils
@@ -28,6 +28,43 @@ LOG = logging.getLogger(__name__)
 LOADERS = {}
 SAVERS = {}
 CHECKERS = {}
+SIGNATURES = {}
+
+# Size of file header which is read once for format detection
+HEADER_SIZE = 8192
+
+# Format signatures are declared in format modules as <pid>_signatures
+# tuple of alternatives. Each alternative is a tuple of (offset, bytes)
+# conditions which all should match. None offset means substring search
+# in the whole header. Such weak matches are confirmed by full checker.
+# Bitmap formats share fallback loader and have no own modules.
+BITMAP_SIGNATURES = {
+    uc2const.PNG: (((0, '\x89PNG\r\n\x1a\n'),),),
+    uc2const.JPG: (((0, '\xff\xd8\xff'),),),
+    uc2const.PSD: (((0, '8BPS'),),),
+    uc2const.XCF: (((0, 'gimp xcf'),),),
+    uc2const.JP2: (((0, '\x00\x00\x00\x0cjP  \r\n\x87\n'),),
+                   ((0, '\xff\x4f\xff\x51'),)),
+    uc2const.TIF: (((0, 'II*\x00'),), ((0, 'MM\x00*'),),
+                   ((0, 'II+\x00'),), ((0, 'MM\x00+'),)),
+    uc2const.GIF: (((0, 'GIF87a'),), ((0, 'GIF89a'),)),
+    uc2const.BMP: (((0, 'BM'),),),
+    uc2const.XPM: (((0, '/* XPM */'),),),
+    uc2const.WEBP: (((0, 'RIFF'), (8, 'WEBP')),),
+}
+
+
+# Fallback loader depends on PIL, Cairo and SK2 model,
+# so it is imported on demand only.
+def fallback_check(path):
+    from uc2.formats import fallback
+    return fallback.fallback_check(path)
+
+
+def im_loader(appdata, filename=None, fileptr=None, translate=True, cnf=None,
+              **kw):
+    from uc2.formats import fallback
+    return fallback.im_loader(appdata, filename, fileptr, translate, cnf, **kw)
 
 
 def _get_loader(pid):
@@ -79,6 +116,75 @@ def _get_checker(pid):
     return checker
 
 
+def _get_signatures(pid):
+    if pid in BITMAP_SIGNATURES:
+        return BITMAP_SIGNATURES[pid]
+    if not isinstance(pid, str):
+        return None
+    if pid not in SIGNATURES:
+        signatures = None
+        try:
+            format_mod = import_module('uc2.formats.' + pid)
+            signatures = getattr(format_mod, pid + '_signatures', None)
+        except Exception as e:
+            LOG.error('Error accessing <%s> signatures %s', pid, e)
+        SIGNATURES[pid] = signatures
+    return SIGNATURES[pid]
+
+
+def _match_signatures(header, signatures):
+    """
+    Returns 'strong' or 'weak' for matched signatures and None otherwise.
+    """
+    for alternative in signatures:
+        weak = False
+        for offset, value in alternative:
+            if offset is None:
+                if value not in header:
+                    break
+                weak = True
+            elif not header[offset:offset + len(value)] == value:
+                break
+        else:
+            return 'weak' if weak else 'strong'
+    return None
+
+
+def _run_checker(pid, path, checked):
+    checker = _get_checker(pid)
+    if checker is None:
+        return False
+    if checker not in checked:
+        checked[checker] = checker(path)
+    return checked[checker]
+
+
+def _detect_format(path, header, formats, checked):
+    """
+    Detects file format among provided format ids using file header.
+    Single strong signature match is accepted as is, other signature
+    matches are confirmed by format checker in formats order. Formats
+    without declared signatures are checked last.
+    Checker results are stored in checked dict to avoid repeated checks.
+    """
+    matches = []
+    unsigned = []
+    for pid in formats:
+        signatures = _get_signatures(pid)
+        if signatures is None:
+            unsigned.append(pid)
+            continue
+        match = _match_signatures(header, signatures)
+        if match:
+            matches.append((pid, match))
+    if len(matches) == 1 and matches[0][1] == 'strong':
+        return matches[0][0]
+    for pid in [item[0] for item in matches] + unsigned:
+        if _run_checker(pid, path, checked):
+            return pid
+    return None
+
+
 def get_loader_by_id(pid):
     loader = _get_loader(pid)
     if not loader:
@@ -102,38 +208,41 @@ def get_loader(path, experimental=False, return_id=False):
     msg = 'Start to search for loader by file extension %s' % (ext.__str__())
     events.emit(events.MESSAGES, msgconst.INFO, msg)
 
+    start = time.time()
+    with fsutils.get_fileptr(path) as fileptr:
+        header = fileptr.read(HEADER_SIZE)
+    checked = {}
+
     if experimental:
         ld_formats += uc2const.EXPERIMENTAL_LOADERS
-    for item in ld_formats:
-        if ext in uc2const.FORMAT_EXTENSION[item]:
-            checker = _get_checker(item)
-            if checker and checker(path):
-                loader = _get_loader(item)
-                ret_id = item
-                break
+    ext_formats = [item for item in ld_formats
+                   if ext in uc2const.FORMAT_EXTENSION[item]]
+    ret_id = _detect_format(path, header, ext_formats, checked)
 
-    if loader is None:
+    if ret_id is None:
         msg = 'Loader is not found or not suitable for %s' % path
         events.emit(events.MESSAGES, msgconst.WARNING, msg)
         msg = 'Start to search loader by file content'
         events.emit(events.MESSAGES, msgconst.INFO, msg)
 
-        for item in ld_formats:
-            checker = _get_checker(item)
-            if checker is not None:
-                if checker(path):
-                    loader = _get_loader(item)
-                    ret_id = item
-                    break
+        ret_id = _detect_format(path, header, ld_formats, checked)
 
-    if loader is None:
+    if ret_id is not None:
+        loader = _get_loader(ret_id)
+    else:
         msg = 'By file content loader is not found for %s' % path
         events.emit(events.MESSAGES, msgconst.WARNING, msg)
         msg = 'Try using fallback loader'
         events.emit(events.MESSAGES, msgconst.INFO, msg)
-        if fallback_check(path):
+        if fallback_check not in checked:
+            checked[fallback_check] = fallback_check(path)
+        if checked[fallback_check]:
             loader = im_loader
 
+    msg = 'Format detection took %.1f ms: %d file opens, %d full checks' % (
+        (time.time() - start) * 1000.0, len(checked) + 1, len(checked))
+    events.emit(events.MESSAGES, msgconst.INFO, msg)
+
     if loader is None:
         msg = 'Loader is not found for %s' % path
         events.emit(events.MESSAGES, msgconst.ERROR, msg)
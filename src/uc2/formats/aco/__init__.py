@@ -65,6 +65,9 @@ def aco_saver(doc, filename=None, fileptr=None, translate=True,
         doc.save(filename, fileptr)
 
 
+aco_signatures = (((0, ACO1_VER),), ((0, ACO2_VER),))
+
+
 def check_aco(path):
     fileptr = get_fileptr(path)
     string = fileptr.read(2)
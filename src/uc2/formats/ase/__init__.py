@@ -65,6 +65,9 @@ def ase_saver(doc, filename=None, fileptr=None, translate=True,
         doc.save(filename, fileptr)
 
 
+ase_signatures = (((0, ASEF),),)
+
+
 def check_ase(path):
     fileptr = get_fileptr(path)
     string = fileptr.read(len(ASEF))
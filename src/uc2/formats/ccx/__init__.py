@@ -58,6 +58,10 @@ def ccx_saver(sk2_doc, filename=None, fileptr=None,
         sk2_doc.save(filename, fileptr)
 
 
+ccx_signatures = (((0, cmx_const.ROOT_ID), (8, cmx_const.CDRX_ID)),
+                  ((0, cmx_const.ROOTX_ID), (8, cmx_const.CDRX_ID)))
+
+
 def check_ccx(path):
     with get_fileptr(path) as fileptr:
         riff_sign = fileptr.read(4) in (cmx_const.ROOT_ID, cmx_const.ROOTX_ID)
@@ -55,6 +55,10 @@ def cdr_saver(sk2_doc, filename=None, fileptr=None,
         sk2_doc.save(filename, fileptr)
 
 
+cdr_signatures = tuple(((0, cdr_const.RIFF_ID), (8, version))
+                       for version in cdr_const.CDR_VERSIONS)
+
+
 def check_cdr(path):
     fileptr = get_fileptr(path)
     header = fileptr.read(12)
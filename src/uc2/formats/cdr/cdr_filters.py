@@ -15,14 +15,13 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from uc2 import _, events
 from uc2.utils import get_chunk_size, dword2py_int, py_int2dword
 from uc2.formats.riff import model
 from uc2.formats.cdr.cdr_model import generic_dict
-from uc2.formats.generic_filters import AbstractLoader, AbstractSaver
+from uc2.formats.generic_filters import AbstractBinaryLoader, AbstractSaver
 
 
-class CDR_Loader(AbstractLoader):
+class CDR_Loader(AbstractBinaryLoader):
     name = 'CDR_Loader'
     version = 'CDRC'
     obj_map = {}
@@ -42,9 +41,8 @@ class CDR_Loader(AbstractLoader):
         self.model = self.parse_file(self.fileptr)
 
     def report_position(self, position):
-        if 100.0 * (position - self.file_position) / self.file_size > 3.0:
-            msg = _('Parsing in progress...')
-            events.emit(events.FILTER_INFO, msg, position / self.file_size)
+        if self.file_size:
+            self.progress.update(float(position) / self.file_size)
         self.file_position = position
 
     def report_stream_position(self, position):
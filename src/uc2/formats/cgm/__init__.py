@@ -56,6 +56,12 @@ def cgm_saver(sk2_doc, filename=None, fileptr=None,
         sk2_doc.save(filename, fileptr)
 
 
+# Masked 16-bit BEGIN METAFILE command header
+cgm_signatures = tuple(((0, chr(CGM_SIGNATURE >> 8) + chr(item)),)
+                      for item in range(CGM_SIGNATURE & 0xff,
+                                        (CGM_SIGNATURE & 0xff) + 0x20))
+
+
 def check_cgm(path):
     with get_fileptr(path) as fileptr:
         sign = fileptr.read(2)
@@ -52,6 +52,10 @@ def cmx_saver(sk2_doc, filename=None, fileptr=None,
         sk2_doc.save(filename, fileptr)
 
 
+cmx_signatures = (((0, cmx_const.ROOT_ID), (8, cmx_const.CMX_ID)),
+                  ((0, cmx_const.ROOTX_ID), (8, cmx_const.CMX_ID)))
+
+
 def check_cmx(path):
     with get_fileptr(path) as fileptr:
         riff_sign = fileptr.read(4) in (cmx_const.ROOT_ID, cmx_const.ROOTX_ID)
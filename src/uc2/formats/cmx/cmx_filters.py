@@ -15,9 +15,9 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from uc2 import utils
 from uc2.formats.cmx import cmx_model, cmx_const
 from uc2.formats.generic_filters import AbstractBinaryLoader, AbstractSaver
+from uc2.utils import binreader
 
 
 class CmxLoader(AbstractBinaryLoader):
@@ -33,12 +33,14 @@ class CmxLoader(AbstractBinaryLoader):
         self.parent_stack = None
 
     def read_header(self):
+        offset = self.fileptr.tell()
         identifier = self.fileptr.read(4)
         sz = self.fileptr.read(4)
         name = self.fileptr.read(4) \
             if identifier in cmx_const.LIST_IDS else ''
         shift = 4 if name else 0
-        size = utils.dword2py_int(sz, self.config.rifx) - shift
+        fmt = binreader.DWORD_BE if self.config.rifx else binreader.DWORD
+        size = self.fileptr.unpack_at(fmt, offset + 4)[0] - shift
         size += 1 if size > (size // 2) * 2 else 0
         return [identifier, sz, name], size
 
@@ -64,6 +64,9 @@ def corel_pal_saver(doc, filename=None, fileptr=None, translate=True,
         doc.save(filename, fileptr)
 
 
+corel_pal_signatures = (((None, '<palette'),),)
+
+
 def check_corel_pal(path):
     fileptr = get_fileptr(path)
     ret = False
@@ -65,6 +65,9 @@ def cpl_saver(doc, filename=None, fileptr=None, translate=True,
         doc.save(filename, fileptr)
 
 
+cpl_signatures = tuple(((0, item),) for item in CPL_IDs)
+
+
 def check_cpl(path):
     fileptr = get_fileptr(path)
     string = fileptr.read(len(CPL12))
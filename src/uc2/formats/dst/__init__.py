@@ -63,6 +63,9 @@ def dst_saver(doc, filename=None, fileptr=None, translate=True, cnf=None, **kw):
         )
 
 
+dst_signatures = (((0, DST_SIGNATURE),),)
+
+
 def check_dst(path):
     size = len(DST_SIGNATURE)
     fileptr = get_fileptr(path)
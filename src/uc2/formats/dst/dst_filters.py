@@ -16,12 +16,12 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
-from uc2.formats.generic_filters import AbstractLoader, AbstractSaver
+from uc2.formats.generic_filters import AbstractBinaryLoader, AbstractSaver
 from uc2.formats.dst import dst_model
 from uc2.formats.dst import dst_const
 
 
-class DST_Loader(AbstractLoader):
+class DST_Loader(AbstractBinaryLoader):
     name = 'DST_Loader'
 
     def do_load(self):
@@ -40,8 +40,9 @@ class EDR_Presenter(BinaryModelPresenter):
         self.model.childs = []
 
     def convert_from_skp(self, skp_doc):
-        for item in skp_doc.model.colors:
-            rgb = self.cms.get_rgb_color(item)[1]
+        rgb_colors = self.cms.get_colors(skp_doc.model.colors)
+        for item in rgb_colors:
+            rgb = item[1]
             color = EDR_Color()
             color.hexcolor = cms.rgb_to_hexcolor(rgb)
             self.model.add(color)
@@ -56,6 +56,9 @@ def fig_saver(sk2_doc, filename=None, fileptr=None,
         sk2_doc.save(filename, fileptr)
 
 
+fig_signatures = (((0, '#FIG 3'),),)
+
+
 def check_fig(path):
     file_size = os.path.getsize(path)
     fileptr = get_fileptr(path)
@@ -19,7 +19,7 @@ import logging
 
 from uc2 import _, uc2const
 from uc2 import events, msgconst
-from uc2.utils import fsutils
+from uc2.utils import convprofile, fsutils
 
 LOG = logging.getLogger(__name__)
 
@@ -34,6 +34,12 @@ class ModelObject(object):
     config = None
     childs = []
 
+    # Objects with incremental_update are rebuilt by do_update() only
+    # if they are marked as dirty (new objects are dirty) or have
+    # rebuilt childs. Such model should call set_dirty() on changes.
+    incremental_update = False
+    cache_dirty = True
+
     def destroy(self):
         for child in self.childs:
             child.destroy()
@@ -46,14 +52,29 @@ class ModelObject(object):
     def update_for_sword(self):
         pass
 
+    def set_dirty(self):
+        obj = self
+        while obj is not None and not obj.cache_dirty:
+            obj.cache_dirty = True
+            obj = obj.parent
+
     def do_update(self, presenter=None, action=False):
+        """
+        Updates object subtree. Returns number of rebuilt objects.
+        """
+        rebuilt = 0
         for child in self.childs:
             child.parent = self
             child.config = self.config
-            child.do_update(presenter, action)
-        self.update()
-        if action:
-            self.update_for_sword()
+            rebuilt += child.do_update(presenter, action) or 0
+        if rebuilt or self.cache_dirty or not self.incremental_update:
+            self.update()
+            if action:
+                self.update_for_sword()
+            if self.incremental_update:
+                self.cache_dirty = False
+            rebuilt += 1
+        return rebuilt
 
     def add(self, child, before=False):
         if before:
@@ -130,6 +151,7 @@ class ModelPresenter(object):
     saver = None
     methods = None
     obj_num = 0
+    rebuilt_num = 0
 
     def new(self):
         pass
@@ -145,7 +167,8 @@ class ModelPresenter(object):
         try:
             self.parsing_msg(0.03)
             self.send_info(_('Parsing in progress...'))
-            self.model = self.loader.load(self, filename, fileptr)
+            with convprofile.stage('parse'):
+                self.model = self.loader.load(self, filename, fileptr)
         except Exception as e:
             self.close()
             LOG.error('Error loading %s', filename)
@@ -162,13 +185,16 @@ class ModelPresenter(object):
             self.update_msg(0.0)
             try:
                 self.model.config = self.config
-                self.model.do_update(self, action)
+                with convprofile.stage('update'):
+                    self.rebuilt_num = self.model.do_update(self, action) or 0
             except Exception as e:
                 LOG.error(_('Error updating document model'))
                 LOG.exception(e)
                 raise
 
             model_name = uc2const.FORMAT_NAMES[self.cid]
+            self.send_info(_('%d of %d model objects are rebuilt') %
+                           (self.rebuilt_num, self.obj_num))
             msg = _('<%s> document model is updated successfully') % model_name
             self.send_progress_message(msg, 0.99)
             self.send_ok(msg)
@@ -184,7 +210,8 @@ class ModelPresenter(object):
         try:
             self.saving_msg(0.03)
             self.send_info(_('Saving is started...'))
-            self.saver.save(self, filename, fileptr)
+            with convprofile.stage('write'):
+                self.saver.save(self, filename, fileptr)
         except Exception as e:
             msg = _('Error while saving') + ' ' + filename + ' %s'
             LOG.error(msg)
@@ -233,7 +260,7 @@ class ModelPresenter(object):
 
     @staticmethod
     def send_progress_message(msg, val):
-        events.emit(events.FILTER_INFO, msg, val)
+        events.emit_progress(msg, val)
 
     @staticmethod
     def send_ok(msg):
@@ -15,17 +15,284 @@
 # 	You should have received a copy of the GNU Affero General Public License
 # 	along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import codecs
 import errno
+import json
 import logging
+import marshal
+import re
 import xml.sax
+from json.encoder import encode_basestring_ascii
 from xml.sax import handler
 from xml.sax.xmlreader import InputSource
 
 from uc2 import _, events, msgconst, utils
+from uc2.utils.binreader import BinaryReader
 from uc2.utils.fsutils import get_fileptr, getsize
 
 LOG = logging.getLogger(__name__)
 
+# file position is checked once per LOADING_STEP check_loading() calls
+LOADING_STEP = 100
+
+
+# --- Call line parser
+#
+# Sketch family formats (SK, SK1, SK2, SKP) are stored as lines of method
+# calls like name(args...) where arguments are python literals: numbers,
+# strings, None, True, False and lists, tuples and dicts of them. Lines
+# are parsed here and dispatched to loader methods without compile/exec.
+
+TOKEN_RE = re.compile(r'''\s*(
+[uUbBrR]{0,2}'(?:[^'\\]|\\.)*'|
+[uUbBrR]{0,2}"(?:[^"\\]|\\.)*"|
+[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?[lL]?|
+[A-Za-z_]\w*|
+\S)''', re.VERBOSE | re.DOTALL)
+
+STRING_RE = re.compile(r'''(
+[uUbBrR]{0,2}'[^'\\]*(?:\\.[^'\\]*)*'|
+[uUbBrR]{0,2}"[^"\\]*(?:\\.[^"\\]*)*")''', re.VERBOSE | re.DOTALL)
+TEXT_TYPE = type(u'')
+
+# Styles and other literals with strings are repeated in document,
+# so they are cached in marshal form which is restored into
+# new objects much faster than parsing
+LITERAL_CACHE = {}
+LITERAL_CACHE_SIZE = 1024
+CACHED_TEXT_LIMIT = 4096
+BYTES_MARK = u'\x00'
+
+IDENTIFIER_RE = re.compile(r'[A-Za-z_]\w*$')
+NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+NAMES = {'None': None, 'True': True, 'False': False}
+QUOTES = '\'"'
+CLOSING = {'[': ']', '(': ')', '{': '}'}
+
+
+class LineParserError(ValueError):
+    pass
+
+
+def _parse_string(token):
+    quote = token[-1]
+    start = token.index(quote)
+    prefix = token[:start].lower()
+    body = token[start + 1:-1]
+    if 'r' in prefix:
+        return body
+    if 'u' in prefix:
+        return codecs.decode(body, 'unicode_escape')
+    if '\\' in body:
+        return codecs.escape_decode(body)[0]
+    return body
+
+
+def _parse_number(token):
+    if token[-1] in 'lL':
+        return int(token[:-1])
+    if '.' in token or 'e' in token or 'E' in token:
+        return float(token)
+    return int(token)
+
+
+def _parse_value(tokens, pos):
+    """
+    Parses literal starting at tokens[pos].
+    Returns parsed value and position of next token.
+    """
+    token = tokens[pos]
+    char = token[0]
+    if char in QUOTES or (token[-1] in QUOTES and len(token) > 1):
+        return _parse_string(token), pos + 1
+    elif char.isdigit() or char in '-+.':
+        return _parse_number(token), pos + 1
+    elif char in CLOSING:
+        closing = CLOSING[char]
+        items = []
+        pos += 1
+        while tokens[pos] != closing:
+            if char == '{':
+                key, pos = _parse_value(tokens, pos)
+                if tokens[pos] != ':':
+                    raise LineParserError('":" is expected in dict literal')
+                value, pos = _parse_value(tokens, pos + 1)
+                items.append((key, value))
+            else:
+                value, pos = _parse_value(tokens, pos)
+                items.append(value)
+            if tokens[pos] == ',':
+                pos += 1
+            elif tokens[pos] != closing:
+                raise LineParserError('Unexpected token "%s"' % tokens[pos])
+        if char == '[':
+            return items, pos + 1
+        elif char == '(':
+            return tuple(items), pos + 1
+        return dict(items), pos + 1
+    elif token in NAMES:
+        return NAMES[token], pos + 1
+    raise LineParserError('Unexpected token "%s"' % token)
+
+
+def _parse_args(text):
+    """
+    Parses comma separated literals and keyword arguments
+    (call arguments without parentheses).
+    Returns list of values and dict of keyword arguments.
+    """
+    tokens = TOKEN_RE.findall(text)
+    tokens.append(')')
+    args = []
+    kwargs = {}
+    pos = 0
+    try:
+        while tokens[pos] != ')':
+            if tokens[pos + 1] == '=' and IDENTIFIER_RE.match(tokens[pos]):
+                value, next_pos = _parse_value(tokens, pos + 2)
+                kwargs[tokens[pos]] = value
+                pos = next_pos
+            elif kwargs:
+                raise LineParserError('Non-keyword argument after keyword')
+            else:
+                value, pos = _parse_value(tokens, pos)
+                args.append(value)
+            if tokens[pos] == ',':
+                pos += 1
+            elif tokens[pos] != ')':
+                raise LineParserError('Unexpected token "%s"' % tokens[pos])
+    except IndexError:
+        raise LineParserError('Unexpected end of line')
+    if pos != len(tokens) - 1:
+        raise LineParserError('Unexpected token "%s"' % tokens[pos])
+    return args, kwargs
+
+
+def _restore_bytes(value):
+    for index, item in enumerate(value):
+        if type(item) is list:
+            _restore_bytes(item)
+        elif type(item) is TEXT_TYPE and item[:1] == BYTES_MARK:
+            value[index] = item[1:].encode('latin-1')
+
+
+def _json_compatible(text):
+    # tuples, dicts and long integers (123L) have no json equivalent
+    return '(' not in text and '{' not in text and 'L' not in text
+
+
+def _json_literal(text):
+    """
+    Converts literal to json document if it is possible.
+    Byte strings are marked to be restored after decoding.
+    Returns json text and flag of marked strings presence.
+    """
+    if NON_ASCII_RE.search(text):
+        # json decodes raw bytes as utf-8, so strings with non-ascii
+        # bytes (SKP names, PDXF attributes) are parsed as is
+        return None, False
+    if "'" not in text and '"' not in text:
+        if not _json_compatible(text):
+            return None, False
+        if 'e' in text:
+            text = text.replace('None', 'null')
+            text = text.replace('True', 'true').replace('False', 'false')
+        return text, False
+
+    marked = False
+    parts = STRING_RE.split(text)
+    for index, part in enumerate(parts):
+        if index % 2:
+            quote = part[-1]
+            body = part[part.index(quote) + 1:-1]
+            if '\\' not in body and '"' not in body:
+                # nested strings are written by repr(), so string
+                # without escapes is printable ascii
+                if part[0] in 'uU':
+                    parts[index] = '"%s"' % body
+                else:
+                    parts[index] = '"\\u0000%s"' % body
+                    marked = True
+                continue
+            value = _parse_string(part)
+            if not isinstance(value, TEXT_TYPE):
+                value = BYTES_MARK + value.decode('latin-1')
+                marked = True
+            parts[index] = encode_basestring_ascii(value)
+        elif not _json_compatible(part):
+            return None, False
+        elif 'e' in part:
+            part = part.replace('None', 'null')
+            parts[index] = part.replace('True', 'true').replace('False',
+                                                                 'false')
+    return ''.join(parts), marked
+
+
+def _parse_literal(text):
+    json_text, marked = _json_literal(text)
+    if json_text is not None:
+        try:
+            value = json.loads(json_text)
+        except ValueError:
+            pass
+        else:
+            if marked:
+                if type(value) is list:
+                    _restore_bytes(value)
+                else:
+                    value = value[1:].encode('latin-1')
+            return value
+    args, kwargs = _parse_args(text)
+    if len(args) != 1 or kwargs:
+        raise LineParserError('Single literal is expected in "%s"' % text)
+    return args[0]
+
+
+def parse_literal(text):
+    """
+    Parses single python literal. Literals without tuples and dicts
+    (transformation matrices, paths, styles, etc.) are converted to json
+    and passed to C accelerated json decoder. Repeated literals with
+    strings are restored from cache.
+    """
+    if "'" not in text and '"' not in text:
+        return _parse_literal(text)
+    if text[0] in QUOTES:
+        # top level strings are written as is, without repr()
+        match = STRING_RE.match(text)
+        if match and match.end() == len(text):
+            return _parse_string(text)
+    if text in LITERAL_CACHE:
+        return marshal.loads(LITERAL_CACHE[text])
+    value = _parse_literal(text)
+    if len(text) < CACHED_TEXT_LIMIT:
+        if len(LITERAL_CACHE) >= LITERAL_CACHE_SIZE:
+            LITERAL_CACHE.clear()
+        LITERAL_CACHE[text] = marshal.dumps(value)
+    return value
+
+
+def parse_call(line):
+    """
+    Splits line like name(args...) into method name, list of arguments
+    and dict of keyword arguments. Arguments without keywords are parsed
+    as single list literal to use json decoder when it is possible.
+    """
+    index = line.find('(')
+    line = line.rstrip()
+    if index < 1 or line[-1] != ')':
+        raise LineParserError('Wrong line format "%s"' % line)
+    name = line[:index].strip()
+    if not IDENTIFIER_RE.match(name):
+        raise LineParserError('Wrong method name "%s"' % name)
+    text = line[index + 1:-1]
+    if '=' in text:
+        args, kwargs = _parse_args(text)
+        return name, args, kwargs
+    return name, parse_literal('[%s]' % text), {}
+
+
 
 class AbstractLoader(object):
     name = 'Abstract Loader'
@@ -38,6 +305,8 @@ class AbstractLoader(object):
     fileptr = None
     position = 0
     file_size = 0
+    progress = None
+    lines_num = 0
 
     def __init__(self):
         pass
@@ -59,6 +328,8 @@ class AbstractLoader(object):
             msg = _('There is no file for reading')
             raise IOError(errno.ENODATA, msg, '')
 
+        self.progress = events.Progress(_('Parsing in progress...'), end=0.95)
+        self.lines_num = 0
         try:
             self.init_load()
         except Exception:
@@ -81,15 +352,25 @@ class AbstractLoader(object):
             line = line.strip()
         return line
 
+    def call_line(self, line):
+        """
+        Dispatches name(args...) line to loader method.
+        Private methods are not callable from document.
+        """
+        name, args, kwargs = parse_call(line)
+        if name.startswith('_'):
+            raise LineParserError('Wrong method name "%s"' % name)
+        return getattr(self, name)(*args, **kwargs)
+
     def check_loading(self):
-        if self.file_size:
-            position = float(self.fileptr.tell()) / float(self.file_size) * 0.95
-            if position - self.position > 0.05:
-                self.position = position
-                self.parsing_msg(position)
+        self.lines_num += 1
+        if self.lines_num % LOADING_STEP or not self.file_size or \
+                not self.progress.is_active():
+            return
+        self.progress.update(float(self.fileptr.tell()) / self.file_size)
 
     def send_progress_message(self, msg, val):
-        events.emit(events.FILTER_INFO, msg, val)
+        events.emit_progress(msg, val)
 
     def parsing_msg(self, val):
         msg = _('Parsing in progress...')
@@ -109,20 +390,29 @@ class AbstractLoader(object):
 
 
 class AbstractBinaryLoader(AbstractLoader):
+    """
+    Loader of binary formats. File content is read by memory mapped
+    BinaryReader which replaces fileptr before do_load() call.
+    """
+
+    def init_load(self):
+        self.fileptr = BinaryReader(self.fileptr)
+        self.do_load()
+
     def readbytes(self, size):
         return self.fileptr.read(size)
 
     def readbyte(self):
-        return utils.byte2py_int(self.fileptr.read(1))
+        return self.fileptr.read_byte()
 
     def readword(self):
-        return utils.word2py_int(self.fileptr.read(2))
+        return self.fileptr.read_word()
 
     def readdword(self):
-        return utils.dword2py_int(self.fileptr.read(4))
+        return self.fileptr.read_dword()
 
     def read_pair_dword(self):
-        return utils.pair_dword2py_int(self.fileptr.read(8))
+        return self.fileptr.read_pair_dword()
 
     def readstr(self, size):
         return utils.latin1_bytes_2str(self.fileptr.read(size))
@@ -231,7 +521,7 @@ class AbstractSaver(object):
         return val_str
 
     def send_progress_message(self, msg, val):
-        events.emit(events.FILTER_INFO, msg, val)
+        events.emit_progress(msg, val)
 
     def saving_msg(self, val):
         msg = _('Saving in progress...')
@@ -65,6 +65,9 @@ def gpl_saver(doc, filename=None, fileptr=None, translate=True,
         doc.save(filename, fileptr)
 
 
+gpl_signatures = (((0, GPL_HEADER),),)
+
+
 def check_gpl(path):
     fileptr = get_fileptr(path)
     string = fileptr.read(len(GPL_HEADER))
@@ -65,6 +65,9 @@ def jcw_saver(doc, filename=None, fileptr=None, translate=True,
         doc.save(filename, fileptr)
 
 
+jcw_signatures = (((0, JCW_ID),),)
+
+
 def check_jcw(path):
     fileptr = get_fileptr(path)
     string = fileptr.read(len(JCW_ID))
@@ -30,7 +30,7 @@ def pdf_saver(sk2_doc, filename=None, fileptr=None, translate=True, cnf=None,
               **kw):
     cnf = merge_cnf(cnf, kw)
     sk2_saver = sk2_doc.saver
-    sk2_doc.saver = PDF_Saver()
+    sk2_doc.saver = PDF_Saver(cnf)
     sk2_doc.save(filename, fileptr)
     sk2_doc.saver = sk2_saver
 
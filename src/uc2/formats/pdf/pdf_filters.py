@@ -15,16 +15,46 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import logging
+import multiprocessing
 import os
 
 from uc2.formats.generic_filters import AbstractSaver
 
 import pdfgen
+import pdfpages
+import pdfshading
+
+LOG = logging.getLogger(__name__)
 
 
 class PDF_Saver(AbstractSaver):
     name = 'PDF_Saver'
 
+    def __init__(self, cnf=None):
+        AbstractSaver.__init__(self)
+        self.cnf = cnf or {}
+
+    def get_gradient_mode(self):
+        mode = self.cnf.get('pdf_gradients', pdfshading.SHADING_MODE)
+        if mode not in pdfshading.GRADIENT_MODES:
+            LOG.warning('Unknown PDF gradient mode "%s"', mode)
+            mode = pdfshading.SHADING_MODE
+        return mode
+
+    def get_jobs_number(self, num_pages):
+        jobs = self.cnf.get('pdf_jobs', 1)
+        if jobs is True:
+            jobs = multiprocessing.cpu_count()
+        elif not isinstance(jobs, int) or jobs < 1:
+            LOG.warning('Wrong PDF jobs number "%s"', jobs)
+            jobs = 1
+        jobs = min(jobs, num_pages)
+        if jobs > 1 and not pdfpages.is_available():
+            LOG.info('Page-parallel PDF rendering is not available')
+            jobs = 1
+        return jobs
+
     def do_save(self):
         renderer = pdfgen.PDFGenerator(self.fileptr, self.presenter.cms)
 
@@ -53,6 +83,8 @@ class PDF_Saver(AbstractSaver):
         # ---PDF doc data end
 
         renderer.set_compression(True)
+        renderer.set_gradient_mode(self.get_gradient_mode())
+        renderer.set_streaming(bool(self.cnf.get('pdf_streaming', False)))
 
         methods = self.presenter.methods
         desktop_layers = methods.get_desktop_layers()
@@ -61,14 +93,27 @@ class PDF_Saver(AbstractSaver):
 
         renderer.set_num_pages(len(pages))
 
+        page_layers = []
         for page in pages:
-            w, h = methods.get_page_size(page)
-            renderer.start_page(w, h)
-
             layers = desktop_layers + methods.get_layers(page)
             layers += master_layers
-            for layer in layers:
-                if methods.is_layer_visible(layer):
+            page_layers.append([layer for layer in layers
+                                if methods.is_layer_visible(layer)])
+
+        jobs = self.get_jobs_number(len(pages))
+        recorded_pages = iter([None] * len(pages))
+        if jobs > 1:
+            recorded_pages = pdfpages.render_pages(
+                self.presenter, renderer, page_layers, jobs)
+
+        for page, layers in zip(pages, page_layers):
+            ops = next(recorded_pages)
+            w, h = methods.get_page_size(page)
+            renderer.start_page(w, h)
+            if ops is None:
+                for layer in layers:
                     renderer.render(layer.childs, True)
+            else:
+                pdfpages.replay(renderer, ops)
             renderer.end_page()
         renderer.save()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Direct serializer of PDF path construction operators.
+
+Paths are written into m/l/c/h operators string by single pass over
+path points instead of reportlab PDFPathObject method per point.
+Operators are formatted by the same fp_str() as PDFPathObject does,
+so content streams are byte-identical to PDFPathObject output.
+"""
+
+from reportlab.lib.rl_accel import fp_str
+from reportlab.pdfgen.pathobject import PDFPathObject
+
+from uc2.libgeom.compact import CompactPath
+from uc2.sk2const import NODE_LINE
+
+
+def _get_path_prefix():
+    # some reportlab versions start path by 'n' operator
+    path = PDFPathObject()
+    path.moveTo(0, 0)
+    code = path.getCode()
+    return code[:code.rindex(fp_str(0, 0) + ' m')]
+
+
+PATH_PREFIX = _get_path_prefix()
+
+
+class PDFPath(object):
+    """
+    Path object accepted by Canvas.drawPath() and Canvas.clipPath().
+    """
+    __slots__ = ('code',)
+
+    def __init__(self, code=''):
+        self.code = code
+
+    def getCode(self):
+        return self.code
+
+
+def _compact_path_ops(path, ops):
+    coords = path.coords
+    index = 2
+    ops.append('%s m' % fp_str(coords[0], coords[1]))
+    for node in path.nodes:
+        if node == NODE_LINE:
+            ops.append('%s l' % fp_str(coords[index], coords[index + 1]))
+            index += 2
+        else:
+            ops.append('%s c' % fp_str(*coords[index:index + 6]))
+            index += 6
+
+
+def _path_ops(path, ops):
+    ops.append('%s m' % fp_str(*path[0]))
+    for point in path[1]:
+        if len(point) > 2:
+            ops.append('%s c' % fp_str(point[0][0], point[0][1],
+                                       point[1][0], point[1][1],
+                                       point[2][0], point[2][1]))
+        else:
+            ops.append('%s l' % fp_str(*point))
+
+
+def make_path(paths):
+    """
+    Returns (PDFPath, closed flag) tuple for transformed paths.
+    Closed flag is set if any path is closed.
+    """
+    ops = []
+    closed = False
+    for path in paths:
+        if isinstance(path, CompactPath):
+            _compact_path_ops(path, ops)
+        else:
+            _path_ops(path, ops)
+        if path[2]:
+            ops.append('h')
+            closed = True
+    if not ops:
+        return PDFPath(), closed
+    return PDFPath(PATH_PREFIX + ' '.join(ops)), closed
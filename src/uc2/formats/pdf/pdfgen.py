@@ -18,14 +18,22 @@
 import math
 from copy import deepcopy
 from reportlab.lib.colors import CMYKColorSep, Color, CMYKColor
+from reportlab.lib.rl_accel import fp_str
 from reportlab.lib.utils import ImageReader
-from reportlab.pdfbase.pdfdoc import PDFInfo, PDFString, PDFDate, PDFDictionary
+from reportlab.pdfbase.pdfdoc import PDFInfo, PDFString, PDFDate, \
+    PDFDictionary, PDFArray, PDFName, PDFStream, PDFObjectReference, \
+    xObjectName
 from reportlab.pdfgen.canvas import Canvas, FILL_EVEN_ODD, FILL_NON_ZERO
 
+import pdfcontent
+import pdfshading
+import pdfstream
 from pdfconst import PDF_VERSION_DEFAULT
 from uc2 import _, uc2const, events
 from uc2 import libgeom, libcairo, sk2const
 from uc2.formats.sk2 import sk2_model
+from uc2.libimg import imgcache
+from uc2.libimg.imgcache import IMAGE_CACHE
 
 
 class UC2PDFInfo(PDFInfo):
@@ -57,14 +65,23 @@ class UC2PDFInfo(PDFInfo):
 
 class PDFGenerator(object):
     canvas = None
+    writer = None
     colorspace = None
     use_spot = True
+    gradient_mode = pdfshading.SHADING_MODE
     num_pages = 0
     page_count = 0
+    pattern_count = 0
     prgs_msg = _('Saving in progress...')
 
     def __init__(self, fileptr, cms, version=PDF_VERSION_DEFAULT):
+        self.fileptr = fileptr
         self.cms = cms
+        # image XObjects by (content hash, image mode)
+        self.images = {}
+        # converted colors by color repr
+        self.pdfcolors = {}
+        self.progress = events.Progress(self.prgs_msg)
         self.canvas = Canvas(fileptr, pdfVersion=version[0])
         self.info = UC2PDFInfo(self.canvas._doc)
         self.info.pdfxversion = version[1]
@@ -100,6 +117,19 @@ class PDFGenerator(object):
     def set_spot_usage(self, val=True):
         self.use_spot = val
 
+    def set_gradient_mode(self, mode=pdfshading.SHADING_MODE):
+        self.gradient_mode = mode
+
+    def set_streaming(self, val=True):
+        """
+        In streaming mode every finished page is written into file
+        and its content is released. Should be set before first page.
+        """
+        self.writer = None
+        if val:
+            self.writer = pdfstream.PDFStreamWriter(self.canvas._doc,
+                                                    self.fileptr)
+
     # ---Page processing
 
     def set_num_pages(self, num=1):
@@ -107,33 +137,43 @@ class PDFGenerator(object):
 
     def set_progress_message(self, msg):
         self.prgs_msg = msg
+        self.progress.set_message(msg)
 
     def start_page(self, w, h, left_margin=0.0, top_margin=0.0):
         self.canvas.translate(w / 2.0 - left_margin, h / 2.0 - top_margin)
         self.canvas.setPageSize((w, h))
-        position = 0.0
+        start, end = 0.0, 1.0
         if self.num_pages:
-            position = float(self.page_count) / float(self.num_pages)
-        events.emit(events.FILTER_INFO, self.prgs_msg, position)
+            start = float(self.page_count) / float(self.num_pages)
+            end = float(self.page_count + 1) / float(self.num_pages)
+        self.progress.set_range()
+        self.progress.update(start, force=True)
+        self.progress.set_range(start, end)
 
     def end_page(self):
         self.canvas.showPage()
+        if self.writer is not None:
+            self.writer.flush()
         self.page_count += 1
-        position = 1.0
-        if self.num_pages:
-            position = float(self.page_count) / float(self.num_pages)
-        events.emit(events.FILTER_INFO, self.prgs_msg, position)
+        self.progress.update(1.0, force=True)
 
     def save(self):
-        self.canvas.save()
+        if self.writer is None:
+            self.canvas.save()
+        else:
+            self.writer.close(self.canvas)
 
     # --- Rendering
     def render(self, objs, toplevel=False):
-        obj_count = 0
+        if toplevel:
+            self.progress.set_total(len(objs))
         for obj in objs:
             if obj.is_pixmap:
                 self.draw_pixmap(obj)
             elif obj.is_primitive:
+                if self.is_plain_primitive(obj):
+                    self.draw_curve(obj)
+                    continue
                 curve_obj = obj.to_curve()
                 if curve_obj.is_primitive:
                     self.draw_curve(curve_obj)
@@ -144,18 +184,24 @@ class PDFGenerator(object):
             else:
                 self.render(obj.childs)
 
-            # ---Progress
-            obj_count += 1
-            shift = 0.0
-            page_size = 1.0
-            if self.num_pages:
-                shift = float(self.page_count) / float(self.num_pages)
-                page_size = 1.0 / float(self.num_pages)
-            position = shift + obj_count / len(objs) * page_size
-            events.emit(events.FILTER_INFO, self.prgs_msg, position)
+            if toplevel:
+                self.progress.tick()
+
+    def is_plain_primitive(self, obj):
+        """
+        Checks primitive can be drawn from its cached geometry without
+        conversion to curve. Text is drawn by glyph curves, arrows
+        are calculated for curve objects only.
+        """
+        if obj.is_text or obj.is_pixmap:
+            return False
+        if obj.is_curve:
+            return True
+        stroke = obj.style[1]
+        return obj.cache_paths is not None and not (stroke and stroke[9])
 
     def draw_curve(self, curve_obj):
-        paths = libgeom.apply_trafo_to_paths(curve_obj.paths, curve_obj.trafo)
+        paths = libgeom.get_transformed_paths(curve_obj)
         arrow_paths = []
         if curve_obj.cache_arrows:
             for pair in curve_obj.cache_arrows:
@@ -187,8 +233,10 @@ class PDFGenerator(object):
                 self.fill_pdfpath(None, arrow_paths, arrow_fill_style, None)
 
     def draw_container(self, obj):
-        container = obj.childs[0].to_curve()
-        paths = libgeom.apply_trafo_to_paths(container.paths, container.trafo)
+        container = obj.childs[0]
+        if not self.is_plain_primitive(container):
+            container = container.to_curve()
+        paths = libgeom.get_transformed_paths(container)
         pdfpath, closed = self.make_pdfpath(paths)
         fill_style = container.style[0]
         stroke_style = container.style[1]
@@ -213,21 +261,7 @@ class PDFGenerator(object):
             self.stroke_pdfpath(pdfpath, stroke_style, container.stroke_trafo)
 
     def make_pdfpath(self, paths):
-        closed = False
-        pdfpath = self.canvas.beginPath()
-        for path in paths:
-            pdfpath.moveTo(*path[0])
-            for point in path[1]:
-                if len(point) > 2:
-                    pdfpath.curveTo(point[0][0], point[0][1],
-                                    point[1][0], point[1][1],
-                                    point[2][0], point[2][1])
-                else:
-                    pdfpath.lineTo(*point)
-            if path[2]:
-                pdfpath.close()
-                closed = True
-        return pdfpath, closed
+        return pdfcontent.make_path(paths)
 
     def set_fill_rule(self, fillrule):
         if fillrule in (sk2const.FILL_EVENODD,
@@ -237,8 +271,8 @@ class PDFGenerator(object):
             fillrule = FILL_NON_ZERO
         self.canvas._fillMode = fillrule
 
-    def set_rgb_values(self, color, pdfcolor):
-        r, g, b = self.cms.get_rgb_color(color)[1]
+    def set_rgb_values(self, color, pdfcolor, rgb=None):
+        r, g, b = (rgb or self.cms.get_rgb_color(color))[1]
         density = pdfcolor.density
         if density < 1:
             r = density * (r - 1) + 1
@@ -246,19 +280,28 @@ class PDFGenerator(object):
             b = density * (b - 1) + 1
         pdfcolor.red, pdfcolor.green, pdfcolor.blue = (r, g, b)
 
-    def get_pdfcolor(self, color):
+    def get_pdfcolor(self, color, cmyk=None, rgb=None):
+        if cmyk is None and rgb is None:
+            key = repr(color)
+            pdfcolor = self.pdfcolors.get(key)
+            if pdfcolor is None:
+                pdfcolor = self.pdfcolors[key] = self._get_pdfcolor(color)
+            return pdfcolor
+        return self._get_pdfcolor(color, cmyk, rgb)
+
+    def _get_pdfcolor(self, color, cmyk=None, rgb=None):
         alpha = color[2]
         if self.use_spot and color[0] == uc2const.COLOR_SPOT:
-            c, m, y, k = self.cms.get_cmyk_color(color)[1]
+            c, m, y, k = (cmyk or self.cms.get_cmyk_color(color))[1]
             spotname = color[3]
             if spotname == uc2const.COLOR_REG:
                 spotname = 'All'
             pdfcolor = CMYKColorSep(c, m, y, k, spotName=spotname, alpha=alpha)
         elif self.colorspace == uc2const.COLOR_CMYK:
-            c, m, y, k = self.cms.get_cmyk_color(color)[1]
+            c, m, y, k = (cmyk or self.cms.get_cmyk_color(color))[1]
             pdfcolor = CMYKColor(c, m, y, k, alpha=alpha)
         elif self.colorspace == uc2const.COLOR_RGB:
-            r, g, b = self.cms.get_rgb_color(color)[1]
+            r, g, b = (rgb or self.cms.get_rgb_color(color))[1]
             return Color(r, g, b, alpha)
         elif self.colorspace == uc2const.COLOR_GRAY:
             gray = self.cms.get_grayscale_color(color)
@@ -274,12 +317,27 @@ class PDFGenerator(object):
                 c = m = y = 0.0
                 pdfcolor = CMYKColor(c, m, y, k, alpha=alpha)
             else:
-                c, m, y, k = self.cms.get_cmyk_color(color)[1]
+                c, m, y, k = (cmyk or self.cms.get_cmyk_color(color))[1]
                 pdfcolor = CMYKColor(c, m, y, k, alpha=alpha)
 
-        self.set_rgb_values(color, pdfcolor)
+        self.set_rgb_values(color, pdfcolor, rgb)
         return pdfcolor
 
+    def get_pdfcolors(self, colors):
+        """
+        Batch variant of get_pdfcolor(). CMYK and RGB values
+        for the whole color list are calculated by single CMS pass
+        per colorspace.
+        """
+        rgb_colors = self.cms.get_colors(colors, uc2const.COLOR_RGB)
+        if self.colorspace in (uc2const.COLOR_RGB, uc2const.COLOR_GRAY) \
+                and not self.use_spot:
+            cmyk_colors = [None] * len(colors)
+        else:
+            cmyk_colors = self.cms.get_colors(colors, uc2const.COLOR_CMYK)
+        return [self.get_pdfcolor(*item)
+                for item in zip(colors, cmyk_colors, rgb_colors)]
+
     def stroke_pdfpath(self, pdfpath, stroke_style, stroke_trafo=None):
         stroke_trafo = stroke_trafo or []
 
@@ -323,13 +381,9 @@ class PDFGenerator(object):
             self.canvas.drawPath(pdfpath, 0, 1)
         elif fill_style[1] == sk2const.FILL_GRADIENT:
             gradient = fill_style[2]
-            stops = gradient[2]
-            transparency = False
-            for stop in stops:
-                if stop[1][2] < 1.0:
-                    transparency = True
-                    break
-            if transparency:
+            if self.gradient_mode == pdfshading.SHADING_MODE:
+                self.fill_shading(obj, pdfpath, fill_trafo, gradient)
+            elif pdfshading.has_alpha(gradient[2]):
                 self.fill_tr_gradient(obj, pdfpath, fill_trafo, gradient)
             else:
                 self.fill_gradient(pdfpath, fill_trafo, gradient)
@@ -338,6 +392,128 @@ class PDFGenerator(object):
             pattern = fill_style[2]
             self.fill_pattern(obj, pdfpath, fill_trafo, pattern)
 
+    def get_shading_values(self, colors):
+        """
+        Returns shading colorspace name and color components of
+        gradient stops. Stop colors are converted by single CMS pass.
+        Spot and grayscale colors are represented by CMYK values.
+        """
+        if self.colorspace == uc2const.COLOR_RGB:
+            rgb_colors = self.cms.get_colors(colors, uc2const.COLOR_RGB)
+            return 'DeviceRGB', [color[1] for color in rgb_colors]
+        if self.colorspace == uc2const.COLOR_GRAY:
+            gray_colors = self.cms.get_colors(colors, uc2const.COLOR_GRAY)
+            return 'DeviceCMYK', [[0.0, 0.0, 0.0, 1.0 - color[1][0]]
+                                  for color in gray_colors]
+        if self.colorspace is None:
+            if all([color[0] == uc2const.COLOR_RGB for color in colors]):
+                return 'DeviceRGB', [color[1] for color in colors]
+            if all([color[0] == uc2const.COLOR_GRAY for color in colors]):
+                return 'DeviceCMYK', [[0.0, 0.0, 0.0, 1.0 - color[1][0]]
+                                      for color in colors]
+        cmyk_colors = self.cms.get_colors(colors, uc2const.COLOR_CMYK)
+        return 'DeviceCMYK', [color[1] for color in cmyk_colors]
+
+    def make_shading_function(self, positions, values):
+        segments, bounds = pdfshading.get_function_segments(positions, values)
+        functions = [PDFDictionary({
+            'FunctionType': 2,
+            'Domain': PDFArray([0, 1]),
+            'C0': PDFArray(list(c0)),
+            'C1': PDFArray(list(c1)),
+            'N': 1,
+        }) for c0, c1 in segments]
+        if len(functions) == 1:
+            return functions[0]
+        return PDFDictionary({
+            'FunctionType': 3,
+            'Domain': PDFArray([0, 1]),
+            'Functions': PDFArray(functions),
+            'Bounds': PDFArray(bounds),
+            'Encode': PDFArray([0, 1] * len(functions)),
+        })
+
+    def make_shading(self, gradient, colorspace, function):
+        return PDFDictionary({
+            'ShadingType': pdfshading.get_shading_type(gradient),
+            'ColorSpace': PDFName(colorspace),
+            'Coords': PDFArray(pdfshading.get_shading_coords(gradient)),
+            'Function': function,
+            'Extend': '[true true]',
+        })
+
+    def get_shading_bbox(self, obj, fill_trafo):
+        """
+        Returns object bbox in gradient coordinates.
+        """
+        if obj is None:
+            return [-1e5, -1e5, 1e5, 1e5]
+        paths = libgeom.get_transformed_paths(obj)
+        if fill_trafo:
+            paths = libgeom.apply_trafo_to_paths(
+                paths, libgeom.invert_trafo(fill_trafo))
+        return libgeom.normalize_bbox(libgeom.get_paths_bbox(paths))
+
+    def set_soft_mask(self, shading, bbox):
+        """
+        Sets luminosity soft mask painted by grayscale shading.
+        Mask is reset by restoreState().
+        """
+        doc = self.canvas._doc
+        group = PDFStream(PDFDictionary({
+            'Type': PDFName('XObject'),
+            'Subtype': PDFName('Form'),
+            'BBox': PDFArray(bbox),
+            'Group': PDFDictionary({
+                'Type': PDFName('Group'),
+                'S': PDFName('Transparency'),
+                'CS': PDFName('DeviceGray'),
+            }),
+            'Resources': PDFDictionary({
+                'Shading': PDFDictionary({'Sh0': doc.Reference(shading)}),
+            }),
+        }), '/Sh0 sh')
+        smask = PDFDictionary({
+            'Type': PDFName('Mask'),
+            'S': PDFName('Luminosity'),
+            'G': doc.Reference(group),
+        })
+        # soft mask is registered in page ExtGState resources
+        # the same way as canvas registers alpha values
+        extgstate = self.canvas._extgstate
+        name = 'gRLs%d' % len(extgstate._c)
+        extgstate._c[('SMask', smask)] = name
+        self.canvas._code.append('/%s gs' % name)
+
+    def fill_shading(self, obj, pdfpath, fill_trafo, gradient):
+        stops = pdfshading.normalize_stops(gradient[2])
+        if not stops:
+            return
+        colors = [stop[1] for stop in stops]
+        if pdfshading.is_degenerate(gradient):
+            self.canvas.setFillColor(self.get_pdfcolor(colors[-1]))
+            self.canvas.drawPath(pdfpath, 0, 1)
+            return
+
+        self.canvas.saveState()
+        self.canvas.clipPath(pdfpath, 0, 0)
+        if fill_trafo:
+            self.canvas.transform(*fill_trafo)
+        positions = [stop[0] for stop in stops]
+        colorspace, values = self.get_shading_values(colors)
+        function = self.make_shading_function(positions, values)
+        alpha = pdfshading.get_constant_alpha(stops)
+        if alpha is None:
+            alphas = [[color[2]] for color in colors]
+            mask = self.make_shading(
+                gradient, 'DeviceGray',
+                self.make_shading_function(positions, alphas))
+            self.set_soft_mask(mask, self.get_shading_bbox(obj, fill_trafo))
+        elif alpha < 1.0:
+            self.canvas.setFillAlpha(alpha)
+        self.canvas.shade(self.make_shading(gradient, colorspace, function))
+        self.canvas.restoreState()
+
     def fill_gradient(self, pdfpath, fill_trafo, gradient):
         self.canvas.saveState()
         self.canvas.clipPath(pdfpath, 0, 0)
@@ -346,11 +522,8 @@ class PDFGenerator(object):
         grad_type = gradient[0]
         sp, ep = gradient[1]
         stops = gradient[2]
-        colors = []
-        positions = []
-        for offset, color in stops:
-            positions.append(offset)
-            colors.append(self.get_pdfcolor(color))
+        positions = [stop[0] for stop in stops]
+        colors = self.get_pdfcolors([stop[1] for stop in stops])
         if grad_type == sk2const.GRADIENT_RADIAL:
             radius = libgeom.distance(sp, ep)
             self.canvas.radialGradient(sp[0], sp[1], radius, colors,
@@ -370,10 +543,17 @@ class PDFGenerator(object):
             self.fill_linear_tr_gradient(obj, pdfpath, fill_trafo, gradient)
 
     def get_grcolor_at_point(self, stops, point=0.0):
+        return self.get_pdfcolor(self.get_gradient_color(stops, point))
+
+    def get_grcolors_at_points(self, stops, points):
+        colors = [self.get_gradient_color(stops, point) for point in points]
+        return self.get_pdfcolors(colors)
+
+    def get_gradient_color(self, stops, point=0.0):
         if not point:
-            return self.get_pdfcolor(stops[0][1])
+            return stops[0][1]
         if point == 1.0:
-            return self.get_pdfcolor(stops[-1][1])
+            return stops[-1][1]
         stop0 = stops[0]
         stop1 = None
         for item in stops:
@@ -388,7 +568,7 @@ class PDFGenerator(object):
         else:
             coef = (point - stop0[0]) / size
             color = self.cms.mix_colors(stop0[1], stop1[1], coef)
-        return self.get_pdfcolor(color)
+        return color
 
     def fill_linear_tr_gradient(self, obj, pdfpath, fill_trafo, gradient):
         if not fill_trafo:
@@ -405,7 +585,7 @@ class PDFGenerator(object):
         inv_trafo = libgeom.multiply_trafo(libgeom.invert_trafo(fill_trafo),
                                            libgeom.invert_trafo(trafo))
         cv_trafo = libgeom.multiply_trafo(trafo, fill_trafo)
-        paths = libgeom.apply_trafo_to_paths(obj.paths, obj.trafo)
+        paths = libgeom.get_transformed_paths(obj)
         paths = libgeom.apply_trafo_to_paths(paths, inv_trafo)
         bbox = libgeom.sum_bbox(libgeom.get_paths_bbox(paths),
                                 [0.0, 0.0, l, 0.0])
@@ -421,21 +601,26 @@ class PDFGenerator(object):
         self.canvas.clipPath(pdfpath, 0, 0)
         self.canvas.transform(*cv_trafo)
 
-        self.canvas.setFillColor(self.get_grcolor_at_point(stops, 0.0))
-        self.canvas.rect(bbox[0], y, 0.0 - bbox[0], height, stroke=0, fill=1)
-
+        steps = []
         x = 0.0
         while x < l:
-            point = x / l
-            self.canvas.setFillColor(self.get_grcolor_at_point(stops, point))
+            steps.append(x)
+            x += d
+        points = [0.0] + [x / l for x in steps] + [1.0]
+        pdfcolors = self.get_grcolors_at_points(stops, points)
+
+        self.canvas.setFillColor(pdfcolors[0])
+        self.canvas.rect(bbox[0], y, 0.0 - bbox[0], height, stroke=0, fill=1)
+
+        for x, pdfcolor in zip(steps, pdfcolors[1:-1]):
+            self.canvas.setFillColor(pdfcolor)
             if x + d < l:
                 width = d
             else:
                 width = l - x
             self.canvas.rect(x, y, width, height, stroke=0, fill=1)
-            x += d
 
-        self.canvas.setFillColor(self.get_grcolor_at_point(stops, 1.0))
+        self.canvas.setFillColor(pdfcolors[-1])
         self.canvas.rect(l, y, bbox[2] - l, height, stroke=0, fill=1)
 
         self.canvas.restoreState()
@@ -451,7 +636,7 @@ class PDFGenerator(object):
         inv_trafo = libgeom.multiply_trafo(libgeom.invert_trafo(fill_trafo),
                                            libgeom.invert_trafo(trafo))
         cv_trafo = libgeom.multiply_trafo(trafo, fill_trafo)
-        paths = libgeom.apply_trafo_to_paths(obj.paths, obj.trafo)
+        paths = libgeom.get_transformed_paths(obj)
         paths = libgeom.apply_trafo_to_paths(paths, inv_trafo)
         bbox = libgeom.sum_bbox(libgeom.get_paths_bbox(paths),
                                 [0.0, 0.0, l, 0.0])
@@ -464,14 +649,20 @@ class PDFGenerator(object):
         trafo = [2.0, 0.0, 0.0, 2.0, -1.0, -1.0]
         circle_paths = libgeom.apply_trafo_to_paths(circle_paths, trafo)
 
-        inner_paths = []
+        steps = []
         r = 0.0
+        while r < l:
+            steps.append(r)
+            r += d
+        points = [r / l for r in steps] + [1.0]
+        pdfcolors = self.get_grcolors_at_points(stops, points)
+
+        inner_paths = []
         self.canvas.saveState()
         self.canvas.clipPath(pdfpath, 0, 0)
         self.canvas.transform(*cv_trafo)
-        while r < l:
-            point = r / l
-            self.canvas.setFillColor(self.get_grcolor_at_point(stops, point))
+        for r, pdfcolor in zip(steps, pdfcolors[:-1]):
+            self.canvas.setFillColor(pdfcolor)
             if r + d < l:
                 coef = (r + d)
             else:
@@ -481,9 +672,8 @@ class PDFGenerator(object):
             ring = self.make_pdfpath(inner_paths + paths)[0]
             inner_paths = paths
             self.canvas.drawPath(ring, stroke=0, fill=1)
-            r += d
 
-        self.canvas.setFillColor(self.get_grcolor_at_point(stops, 1.0))
+        self.canvas.setFillColor(pdfcolors[-1])
         r = max(bbox[2] - bbox[0], bbox[3] - bbox[1])
         trafo = [2.0 * r, 0.0, 0.0, 2.0 * r, 0.0, 0.0]
         paths = libgeom.apply_trafo_to_paths(circle_paths, trafo)
@@ -492,30 +682,104 @@ class PDFGenerator(object):
 
         self.canvas.restoreState()
 
-    def draw_image(self, image, alpha_channel=None):
-        if not image:
-            return
+    def get_image_mode(self):
+        """
+        Returns image mode of document colorspace or None
+        if images are embedded as is.
+        """
         if self.colorspace == uc2const.COLOR_CMYK:
-            image = self.cms.convert_image(image, uc2const.IMAGE_CMYK)
+            return uc2const.IMAGE_CMYK
         elif self.colorspace == uc2const.COLOR_RGB:
-            image = self.cms.convert_image(image, uc2const.IMAGE_RGB)
+            return uc2const.IMAGE_RGB
         elif self.colorspace == uc2const.COLOR_GRAY:
-            image = self.cms.convert_image(image, uc2const.IMAGE_GRAY)
+            return uc2const.IMAGE_GRAY
+        return None
+
+    def convert_image(self, image, content_hash=None):
+        """
+        Converts image into document colorspace. If image content hash
+        is provided, converted image is shared by process wide image cache.
+        """
+        mode = self.get_image_mode()
+        if mode is None:
+            return image
+        if content_hash is None:
+            return self.cms.convert_image(image, mode)
+        key = ('pdf', mode, content_hash, self.cms.get_state_key())
+        ret = IMAGE_CACHE.get(key)
+        if ret is None:
+            ret = self.cms.convert_image(image, mode)
+            IMAGE_CACHE.put(key, ret, imgcache.get_image_size(ret))
+        return ret
+
+    def get_image_xobject(self, image, alpha_channel=None, content_hash=None):
+        """
+        Returns (name, width, height) of image XObject. Images with
+        content hash are registered once per document, so repeated
+        images and pattern tiles reference the same XObject.
+        """
+        key = None
+        if content_hash is not None:
+            key = (content_hash, self.get_image_mode())
+            if key in self.images:
+                return self.images[key]
+        image = self.convert_image(image, content_hash)
+        return self.register_image(image, alpha_channel, key)
+
+    def register_image(self, image, alpha_channel=None, key=None):
+        """
+        Registers converted image as XObject of document and returns
+        (name, width, height) of XObject.
+        """
+        if key is not None and key in self.images:
+            return self.images[key]
         img = ImageReader(image)
         img.getRGBData()
         if alpha_channel:
             img._dataA = ImageReader(alpha_channel)
-        self.canvas.drawImage(img, 0, 0, mask='auto')
-
-    def draw_pixmap_obj(self, obj):
+        # canvas registers image XObject, drawing operators are dropped
+        code = self.canvas._code
+        self.canvas._code = []
+        try:
+            width, height = self.canvas.drawImage(img, 0, 0, mask='auto')
+        finally:
+            self.canvas._code = code
+        xobject = (self.canvas._formsinuse.pop(), width, height)
+        if key is not None:
+            self.images[key] = xobject
+        return xobject
+
+    def get_pixmap_xobjects(self, obj):
         hnd = obj.handler
-        cs = self.colorspace
         if obj.colorspace in uc2const.DUOTONES:
-            for bundle in hnd.convert_duotone_to_image(self.cms, cs):
-                if bundle:
-                    self.draw_image(*bundle)
-        else:
-            self.draw_image(hnd.bitmap, hnd.alpha)
+            content_hash = hnd.get_content_hash()
+            bundles = hnd.convert_duotone_to_image(self.cms, self.colorspace)
+            return [self.get_image_xobject(bundle[0], bundle[1],
+                                           (content_hash, repr(obj.style[3]),
+                                            index))
+                    for index, bundle in enumerate(bundles) if bundle]
+        if not hnd.bitmap:
+            return []
+        return [self.get_image_xobject(hnd.bitmap, hnd.alpha,
+                                       hnd.get_content_hash())]
+
+    def draw_xobject(self, name, width, height):
+        self.canvas._formsinuse.append(name)
+        self.canvas._currentPageHasImages = 1
+        self.canvas.saveState()
+        self.canvas.scale(width, height)
+        self.canvas._code.append('/%s Do' % xObjectName(name))
+        self.canvas.restoreState()
+
+    def draw_image(self, image, alpha_channel=None, content_hash=None):
+        if not image:
+            return
+        self.draw_xobject(*self.get_image_xobject(image, alpha_channel,
+                                                  content_hash))
+
+    def draw_pixmap_obj(self, obj):
+        for xobject in self.get_pixmap_xobjects(obj):
+            self.draw_xobject(*xobject)
 
     def draw_pixmap(self, obj):
         self.canvas.saveState()
@@ -525,36 +789,78 @@ class PDFGenerator(object):
         self.draw_pixmap_obj(obj)
         self.canvas.restoreState()
 
+    def make_tiling_pattern(self, xobjects, size, matrix):
+        """
+        Creates colored tiling pattern which cell is painted
+        by image XObjects.
+        """
+        w, h = size
+        cell = ['q %s 0 0 %s 0 0 cm /%s Do Q' % (
+            fp_str(width), fp_str(height), xObjectName(name))
+            for name, width, height in xobjects]
+        names = [xObjectName(item[0]) for item in xobjects]
+        return PDFStream(PDFDictionary({
+            'Type': PDFName('Pattern'),
+            'PatternType': 1,
+            'PaintType': 1,
+            'TilingType': 1,
+            'BBox': PDFArray([0, 0, w, h]),
+            'XStep': w,
+            'YStep': h,
+            'Matrix': PDFArray(matrix),
+            'Resources': PDFDictionary({
+                'XObject': PDFDictionary(dict(
+                    (name, PDFObjectReference(name)) for name in names)),
+            }),
+        }), '\n'.join(cell))
+
     def fill_pattern(self, obj, pdfpath, fill_trafo, pattern):
         if not fill_trafo:
             fill_trafo = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
         inv_ptrn_trafo = libgeom.invert_trafo(pattern[3])
         inv_trafo = libgeom.multiply_trafo(libgeom.invert_trafo(fill_trafo),
                                            libgeom.invert_trafo(inv_ptrn_trafo))
-        paths = libgeom.apply_trafo_to_paths(obj.paths, obj.trafo)
-        paths = libgeom.apply_trafo_to_paths(paths, inv_trafo)
+        obj_paths = libgeom.get_transformed_paths(obj)
+        paths = libgeom.apply_trafo_to_paths(obj_paths, inv_trafo)
         bbox = libgeom.get_paths_bbox(paths)
         cv_trafo = libgeom.multiply_trafo(pattern[3], fill_trafo)
 
         image_obj = sk2_model.Pixmap(obj.config)
-        image_obj.handler.load_from_b64str(self.cms, pattern[1])
+        image_obj.handler.load_pattern(self.cms, pattern[1])
         if pattern[0] == sk2const.PATTERN_IMG and len(pattern) > 2:
             image_obj.style[3] = deepcopy(pattern[2])
+        xobjects = self.get_pixmap_xobjects(image_obj)
+        if not xobjects:
+            return
 
-        self.canvas.saveState()
-        self.canvas.clipPath(pdfpath, 0, 0)
-        self.canvas.transform(*cv_trafo)
-
+        # tiles grid starts at top left corner of bbox
         w, h = image_obj.get_size()
-        x = bbox[0]
-        y = bbox[3]
-        while y > bbox[1] - h:
-            while x < bbox[2]:
-                self.canvas.saveState()
-                self.canvas.transform(1.0, 0.0, 0.0, 1.0, x, y)
-                self.draw_pixmap_obj(image_obj)
-                self.canvas.restoreState()
-                x += w
-            y -= h
-            x = bbox[0]
-        self.canvas.restoreState()
+        matrix = libgeom.multiply_trafo([1.0, 0.0, 0.0, 1.0, bbox[0], bbox[3]],
+                                        cv_trafo)
+        fill_op = 'f*' if self.canvas._fillMode == FILL_EVEN_ODD else 'f'
+        form_bbox = libgeom.normalize_bbox(libgeom.get_paths_bbox(obj_paths))
+        self.draw_tiling_pattern(xobjects, (w, h), matrix, form_bbox,
+                                 '%s %s' % (pdfpath.getCode(), fill_op))
+
+    def draw_tiling_pattern(self, xobjects, size, matrix, bbox, code):
+        """
+        Paints path operators code by tiling pattern of image XObjects.
+        """
+        doc = self.canvas._doc
+        ptrn = self.make_tiling_pattern(xobjects, size, matrix)
+
+        # pattern is used inside form XObject, so pattern matrix
+        # is relative to current user space instead of page space
+        form = PDFStream(PDFDictionary({
+            'Type': PDFName('XObject'),
+            'Subtype': PDFName('Form'),
+            'BBox': PDFArray(bbox),
+            'Resources': PDFDictionary({
+                'Pattern': PDFDictionary({'P0': doc.Reference(ptrn)}),
+            }),
+        }), '/Pattern cs /P0 scn\n' + code)
+        self.pattern_count += 1
+        name = 'UC2Pattern%d' % self.pattern_count
+        doc.Reference(form, xObjectName(name))
+        self.canvas._formsinuse.append(name)
+        self.canvas._code.append('/%s Do' % xObjectName(name))
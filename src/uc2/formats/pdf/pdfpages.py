@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Page-parallel PDF rendering.
+
+Page content is translated in forked worker processes by PageRecorder,
+which has the same rendering code as PDFGenerator but records canvas
+calls instead of writing PDF document. Expensive part of translation
+(geometry, path operators, color and image conversion, gradient and
+pattern setup) is done by workers. Main process replays recorded pages
+in page order into single PDFGenerator, so document resources (images,
+shadings, spot color separations) are registered and deduplicated by
+the same canvas as in serial rendering, and output does not depend
+on number of workers.
+
+Workers share loaded document with main process, so page-parallel
+rendering is available for fork start method only.
+"""
+
+import multiprocessing
+import os
+
+import pdfgen
+from uc2 import events
+
+# generator methods recorded by PageRecorder,
+# other recorded calls are canvas methods
+REGISTER_IMAGE = 'register_image'
+DRAW_XOBJECT = 'draw_xobject'
+DRAW_TILING_PATTERN = 'draw_tiling_pattern'
+SET_SOFT_MASK = 'set_soft_mask'
+SET_FILL_RULE = 'set_fill_rule'
+GENERATOR_OPS = (REGISTER_IMAGE, DRAW_XOBJECT, DRAW_TILING_PATTERN,
+                 SET_SOFT_MASK, SET_FILL_RULE)
+
+# (presenter, page layers, renderer settings) of running job
+JOB = [None]
+WORKER_RECORDER = [None]
+
+
+class RecordingCanvas(object):
+    """
+    Records canvas method calls as (name, args, kwargs) tuples.
+    """
+    _fillMode = pdfgen.FILL_NON_ZERO
+
+    def __init__(self):
+        self.ops = []
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.ops.append((name, args, kwargs))
+
+        return record
+
+
+class PageRecorder(pdfgen.PDFGenerator):
+    """
+    Page renderer of worker process. Document resources are recorded
+    by references which are resolved on replay: image content hash key
+    or position of image in page records.
+    """
+
+    def __init__(self, cms, settings):
+        self.cms = cms
+        # keys of images which were sent to main process
+        self.images = {}
+        self.pdfcolors = {}
+        self.progress = events.Progress()
+        self.canvas = RecordingCanvas()
+        self.colorspace, self.use_spot, self.gradient_mode = settings
+
+    def record(self, name, *args):
+        self.canvas.ops.append((name, args, {}))
+
+    def render_page(self, layers):
+        self.canvas = RecordingCanvas()
+        for layer in layers:
+            self.render(layer.childs, True)
+        return self.canvas.ops
+
+    def get_image_xobject(self, image, alpha_channel=None, content_hash=None):
+        key = None
+        if content_hash is not None:
+            key = (content_hash, self.get_image_mode())
+        ref = key
+        if key is None:
+            ref = len(self.canvas.ops)
+        if key is not None and key in self.images:
+            # image was sent with one of previous pages of the worker
+            self.record(REGISTER_IMAGE, ref, None, None, key)
+        else:
+            image = self.convert_image(image, content_hash)
+            self.record(REGISTER_IMAGE, ref, image, alpha_channel, key)
+            if key is not None:
+                self.images[key] = True
+        return ref, None, None
+
+    def draw_xobject(self, name, width, height):
+        self.record(DRAW_XOBJECT, name)
+
+    def draw_tiling_pattern(self, xobjects, size, matrix, bbox, code):
+        refs = [item[0] for item in xobjects]
+        self.record(DRAW_TILING_PATTERN, refs, size, matrix, bbox, code)
+
+    def set_soft_mask(self, shading, bbox):
+        self.record(SET_SOFT_MASK, shading, bbox)
+
+    def set_fill_rule(self, fillrule):
+        pdfgen.PDFGenerator.set_fill_rule(self, fillrule)
+        self.record(SET_FILL_RULE, fillrule)
+
+
+def replay(renderer, ops):
+    """
+    Replays recorded page into current page of PDFGenerator.
+    """
+    refs = {}
+    canvas = renderer.canvas
+    for name, args, kwargs in ops:
+        if name not in GENERATOR_OPS:
+            getattr(canvas, name)(*args, **kwargs)
+        elif name == REGISTER_IMAGE:
+            ref, image, alpha_channel, key = args
+            if image is None:
+                refs[ref] = renderer.images[key]
+            else:
+                refs[ref] = renderer.register_image(image, alpha_channel, key)
+        elif name == DRAW_XOBJECT:
+            renderer.draw_xobject(*refs[args[0]])
+        elif name == DRAW_TILING_PATTERN:
+            xobjects = [refs[ref] for ref in args[0]]
+            renderer.draw_tiling_pattern(xobjects, *args[1:])
+        else:
+            getattr(renderer, name)(*args)
+
+
+def is_available():
+    """
+    Checks workers can be forked. Daemonic processes (workers of
+    batch translation) cannot have child processes.
+    """
+    if not hasattr(os, 'fork'):
+        return False
+    return not multiprocessing.current_process().daemon
+
+
+def get_settings(renderer):
+    return renderer.colorspace, renderer.use_spot, renderer.gradient_mode
+
+
+def _init_worker():
+    events.clean_channel(events.FILTER_INFO)
+    presenter, _layers, settings = JOB[0]
+    WORKER_RECORDER[0] = PageRecorder(presenter.cms, settings)
+
+
+def _render_page(index):
+    return WORKER_RECORDER[0].render_page(JOB[0][1][index])
+
+
+def render_pages(presenter, renderer, pages, jobs):
+    """
+    Renders pages (lists of visible layers) in pool of forked processes.
+    Yields recorded pages in page order. Worker renders next pages
+    while main process replays received ones.
+    """
+    JOB[0] = (presenter, pages, get_settings(renderer))
+    get_context = getattr(multiprocessing, 'get_context', None)
+    context = get_context('fork') if get_context else multiprocessing
+    pool = context.Pool(jobs, _init_worker)
+    try:
+        for ops in pool.imap(_render_page, range(len(pages))):
+            yield ops
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        JOB[0] = None
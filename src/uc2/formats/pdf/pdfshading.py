@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Gradient to PDF smooth shading translation.
+
+Linear gradients are emitted as axial (Type 2) shadings, radial ones
+as radial (Type 3) shadings. Color stops are joined by stitching
+function (Type 3) of exponential (Type 2) functions, so gradient of any
+stops number is single 'sh' operator. Stop alpha is emitted as the same
+shading in DeviceGray used as luminosity soft mask.
+
+Module contains document independent part of translation, PDF objects
+are created by PDFGenerator.
+"""
+
+import math
+
+from uc2 import sk2const
+
+SHADING_MODE = 'shading'
+STRIPES_MODE = 'stripes'
+GRADIENT_MODES = (SHADING_MODE, STRIPES_MODE)
+
+SHADING_AXIAL = 2
+SHADING_RADIAL = 3
+
+EPSILON = 1e-6
+
+
+def normalize_stops(stops):
+    """
+    Returns stops sorted by position and clamped into [0, 1] range.
+    Gradient is padded by edge stops, so first stop is at 0.0
+    and last one is at 1.0.
+    """
+    stops = sorted([[min(max(stop[0], 0.0), 1.0), stop[1]]
+                    for stop in stops], key=lambda stop: stop[0])
+    if not stops:
+        return stops
+    if stops[0][0] > 0.0:
+        stops.insert(0, [0.0, stops[0][1]])
+    if stops[-1][0] < 1.0:
+        stops.append([1.0, stops[-1][1]])
+    if len(stops) == 1:
+        stops.append([1.0, stops[0][1]])
+    return stops
+
+
+def has_alpha(stops):
+    for stop in stops:
+        if stop[1][2] < 1.0:
+            return True
+    return False
+
+
+def get_constant_alpha(stops):
+    """
+    Returns alpha value shared by all stops or None for gradient
+    with variable transparency.
+    """
+    alphas = set([stop[1][2] for stop in stops])
+    return alphas.pop() if len(alphas) == 1 else None
+
+
+def get_function_segments(positions, values):
+    """
+    Splits gradient into (C0, C1) pairs of exponential functions and
+    returns them with stitching function bounds. Coincident stops make
+    sharp color transition, so zero length segments are skipped.
+    """
+    segments = []
+    bounds = []
+    for index in range(len(positions) - 1):
+        start, end = positions[index], positions[index + 1]
+        if end - start < EPSILON:
+            continue
+        if segments:
+            bounds.append(start)
+        segments.append((values[index], values[index + 1]))
+    if not segments:
+        segments.append((values[-1], values[-1]))
+    return segments, bounds
+
+
+def get_shading_type(gradient):
+    if gradient[0] == sk2const.GRADIENT_RADIAL:
+        return SHADING_RADIAL
+    return SHADING_AXIAL
+
+
+def get_shading_coords(gradient):
+    """
+    Returns Coords array of shading. Radial gradient is circle
+    at start point which radius is distance to end point.
+    """
+    sp, ep = gradient[1]
+    if gradient[0] == sk2const.GRADIENT_RADIAL:
+        radius = math.hypot(ep[0] - sp[0], ep[1] - sp[1])
+        return [sp[0], sp[1], 0.0, sp[0], sp[1], radius]
+    return [sp[0], sp[1], ep[0], ep[1]]
+
+
+def is_degenerate(gradient):
+    """
+    Checks gradient vector has zero length, such shading paints nothing.
+    """
+    sp, ep = gradient[1]
+    return math.hypot(ep[0] - sp[0], ep[1] - sp[1]) < EPSILON
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Streaming writer of reportlab PDF document.
+
+Reportlab keeps all document objects in memory and formats them
+on save. Writer formats objects registered in document right after
+page is finished, writes them into file and releases their content
+(page content streams, image data), so memory usage does not grow
+with pages number. Objects which are modified until the end of
+document (catalog, pages tree, info, outlines, font dictionary) are
+written on close. Released objects stay registered, so resources
+are still deduplicated by their names.
+"""
+
+import hashlib
+
+from reportlab.pdfbase.pdfdoc import PDFIndirectObject
+
+# names of objects which are written on close
+DEFERRED_NAMES = ('BasicFonts',)
+DEFERRED_ATTRS = ('Catalog', 'Pages', 'info', 'Outlines')
+# attributes which hold content of written pages, streams and images
+RELEASED_ATTRS = ('stream', 'content', 'streamContent')
+
+
+def _to_bytes(data):
+    if isinstance(data, bytes):
+        return data
+    return data.encode('latin-1')
+
+
+def _to_str(data):
+    if isinstance(data, str):
+        return data
+    return data.decode('latin-1')
+
+
+def release_object(obj):
+    for attr in RELEASED_ATTRS:
+        if getattr(obj, attr, None) is not None:
+            setattr(obj, attr, None)
+
+
+class PDFStreamWriter(object):
+    """
+    Writes objects of reportlab PDFDocument into file incrementally.
+    Only object offsets are accumulated for cross-reference table.
+    """
+
+    def __init__(self, doc, fileptr):
+        self.doc = doc
+        self.fileptr = fileptr
+        self.offset = 0
+        self.offsets = {}
+        self.counter = 0
+        self.deferred = []
+        self.digest = hashlib.md5()
+        doc.encrypt.prepare(doc)
+        major, minor = getattr(doc, '_pdfVersion', (1, 4))
+        self.write('%%PDF-%d.%d\n%%\x93\x8c\x8b\x9e\n' % (major, minor))
+
+    def write(self, data):
+        data = _to_bytes(data)
+        self.fileptr.write(data)
+        self.digest.update(data)
+        self.offset += len(data)
+
+    def is_deferred(self, name, obj):
+        if name in DEFERRED_NAMES:
+            return True
+        for attr in DEFERRED_ATTRS:
+            if getattr(self.doc, attr, None) is obj:
+                return True
+        return False
+
+    def write_object(self, name):
+        doc = self.doc
+        obj = doc.idToObject[name]
+        number = doc.idToObjectNumberAndVersion[name][0]
+        self.offsets[number] = self.offset
+        self.write(PDFIndirectObject(name, obj).format(doc))
+        release_object(obj)
+
+    def flush(self, final=False):
+        """
+        Writes all registered objects except deferred ones. Formatting
+        of object can register new objects, they are written too.
+        """
+        number_to_id = self.doc.numberToId
+        while self.counter + 1 in number_to_id:
+            self.counter += 1
+            name = number_to_id[self.counter]
+            if not final and self.is_deferred(name,
+                                              self.doc.idToObject[name]):
+                self.deferred.append(name)
+            else:
+                self.write_object(name)
+
+    def close(self, canvas):
+        """
+        Writes deferred objects, cross-reference table and trailer.
+        Follows preparation of reportlab PDFDocument.GetPDFData().
+        """
+        doc = self.doc
+        for font in getattr(doc, 'delayedFonts', []):
+            font.addObjects(doc)
+        doc.info.invariant = doc.invariant
+        catalog = doc.Reference(doc.Catalog)
+        info = doc.Reference(doc.info)
+        outlines = getattr(doc, 'Outlines', None)
+        if outlines is not None:
+            outlines.prepare(doc, canvas)
+            if outlines.ready < 0:
+                doc.Catalog.Outlines = None
+        self.flush()
+        for name in self.deferred:
+            self.write_object(name)
+        self.deferred = []
+        self.flush(final=True)
+
+        xref_offset = self.offset
+        size = self.counter + 1
+        lines = ['xref', '0 %d' % size, '0000000000 65535 f ']
+        lines += ['%010d 00000 n ' % self.offsets[number]
+                  for number in range(1, size)]
+        self.write('\n'.join(lines) + '\n')
+        file_id = '<%s>' % self.digest.hexdigest()
+        self.write('trailer\n<< /ID [%s %s] /Info %s /Root %s /Size %d >>\n'
+                   'startxref\n%d\n%%%%EOF\n' % (
+                       file_id, file_id, _to_str(info.format(doc)),
+                       _to_str(catalog.format(doc)), size, xref_offset))
@@ -32,6 +32,7 @@ from uc2.formats.pdxf import model
 from uc2.formats.pdxf import const
 from uc2.formats.pdxf import methods
 from uc2.formats.generic import GENERIC_TAGS, IDENT
+from uc2.formats.generic_filters import parse_literal
 from uc2.utils import fs
 
 
@@ -142,7 +143,7 @@ class XMLDocReader(handler.ContentHandler):
         self.parent_stack = []
         self.content = False
         self.lines = 0
-        self.position = 0
+        self.progress = events.Progress('Parsing in process...')
         self.locator = None
 
     def setDocumentLocator(self, locator):
@@ -152,20 +153,18 @@ class XMLDocReader(handler.ContentHandler):
         if name == 'Content':
             pass
         else:
-            position = float(self.locator.getLineNumber()) / self.lines
-            if position - self.position > 0.05:
-                msg = 'Parsing in process...'
-                events.emit(events.FILTER_INFO, msg, position)
-                self.position = position
+            if self.progress.is_active():
+                self.progress.update(
+                    float(self.locator.getLineNumber()) / self.lines)
             obj = None
             cid = model.TAGNAME_TO_CID[name]
             obj = model.CID_TO_CLASS[cid](self.presenter.config)
             obj.tag = name
             for item in attrs._attrs.keys():
-                line = 'self.value=' + attrs._attrs[item]
-                code = compile(line, '<string>', 'exec')
-                exec(code)
-                obj.__dict__[item] = self.value
+                value = attrs._attrs[item]
+                if isinstance(value, unicode):
+                    value = value.encode('utf-8')
+                obj.__dict__[item] = parse_literal(value)
 
             if self.parent_stack:
                 parent = self.parent_stack[-1]
@@ -200,9 +199,7 @@ class PDXF_Saver:
     options = {}
     ident = 0
     content = []
-    counter = 0
-    obj_num = 0
-    position = 0
+    progress = None
 
     def __init__(self):
         pass
@@ -226,7 +223,8 @@ class PDXF_Saver:
             raise IOError(errtype, msg + '\n' + value, traceback)
 
         doc = self.presenter.model
-        self.obj_num = doc.count()
+        self.progress = events.Progress('Saving in process...')
+        self.progress.set_total(doc.count())
         self._start()
         self._write_tree(doc)
         self._finish()
@@ -240,12 +238,7 @@ class PDXF_Saver:
         self.file.write(ln)
 
     def _write_tree(self, item):
-        self.counter += 1
-        position = float(self.counter) / self.obj_num
-        if position - self.position > 0.05:
-            msg = 'Saving in process...'
-            events.emit(events.FILTER_INFO, msg, position)
-            self.position = position
+        self.progress.tick()
 
         tag = model.CID_TO_TAGNAME[item.cid]
         params = self._get_params(item)
@@ -50,6 +50,9 @@ def pes_saver(doc, filename=None, fileptr=None, translate=True, cnf=None, **kw):
         doc.save(filename)
 
 
+pes_signatures = (((0, PES_SIGNATURE),), ((0, PEC_SIGNATURE),))
+
+
 def check_pes(path):
     file_size = os.path.getsize(path)
     fileptr = get_fileptr(path)
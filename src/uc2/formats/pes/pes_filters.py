@@ -16,13 +16,13 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
-from uc2.formats.generic_filters import AbstractLoader, AbstractSaver
+from uc2.formats.generic_filters import AbstractBinaryLoader, AbstractSaver
 from uc2.formats.pes import pes_model
 from uc2.formats.pes import pes_const
 import struct
 
 
-class PES_Loader(AbstractLoader):
+class PES_Loader(AbstractBinaryLoader):
     name = 'PES_Loader'
 
     def do_load(self):
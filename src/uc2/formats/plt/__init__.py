@@ -48,6 +48,9 @@ def plt_saver(doc, filename=None, fileptr=None, translate=True, cnf=None, **kw):
         doc.save(filename)
 
 
+plt_signatures = (((0, 'IN;'),),)
+
+
 def check_plt(path):
     file_size = os.path.getsize(path)
     fileptr = get_fileptr(path)
@@ -49,8 +49,6 @@ class SK2_to_PLT_Translator(object):
     jobs = []
     plt_doc = None
     obj_stack = []
-    counter = 0
-    position = 0
 
     def translate(self, objs, plt_doc):
         self.plt_doc = plt_doc
@@ -91,15 +89,10 @@ class SK2_to_PLT_Translator(object):
                      m22 * self.plt_doc.config.plt_scale,
                      dx, dy]
 
-            obj_num = len(self.obj_stack)
+            progress = events.Progress(_('Saving in progress...'))
+            progress.set_total(len(self.obj_stack))
             for obj in self.obj_stack:
-
-                self.counter += 1
-                position = float(self.counter) / obj_num
-                if position - self.position > 0.05:
-                    msg = _('Saving in progress...')
-                    events.emit(events.FILTER_INFO, msg, position)
-                    self.position = position
+                progress.tick()
 
                 paths = libgeom.get_flattened_paths(
                     obj, trafo, self.plt_doc.config.plt_tolerance)
@@ -18,6 +18,7 @@
 import cairo
 
 from uc2.formats.fallback import im_loader
+from uc2.formats.png import png_tiles
 from uc2.formats.sk2.crenderer import CairoRenderer
 from uc2.utils.fsutils import get_fileptr
 from uc2.utils.mixutils import merge_cnf
@@ -38,18 +39,31 @@ def png_saver(sk2_doc, filename=None, fileptr=None, translate=True, cnf=None, **
     w, h = [scale * item for item in page.page_format[1]]
     trafo = (scale, 0, 0, -scale, w / 2.0, h / 2.0)
 
+    antialias_flag = not cnf.get('image_antialiasing') in (False, 0)
+    layers = sk2_doc.methods.get_visible_layers(page)
+
+    # image_tile_size=N renders page by NxN px tiles in image_threads
+    # threads; large pages are rendered by tiles unless image_tile_size=-1
+    tile_size = int(cnf.get('image_tile_size', 0))
+    if not tile_size and int(w) * int(h) > png_tiles.TILED_PIXELS:
+        tile_size = png_tiles.TILE_SIZE
+    if tile_size > 0 and int(w) and int(h):
+        threads = int(cnf.get('image_threads', 0))
+        png_tiles.render_tiled(sk2_doc, fileptr, (int(w), int(h)), trafo,
+                               layers, antialias_flag, tile_size, threads)
+        fileptr.close()
+        return
+
     canvas_matrix = cairo.Matrix(*trafo)
     surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, int(w), int(h))
     ctx = cairo.Context(surface)
     ctx.set_matrix(canvas_matrix)
 
-    antialias_flag = not cnf.get('image_antialiasing') in (False, 0)
-    layers = sk2_doc.methods.get_visible_layers(page)
     rend = CairoRenderer(sk2_doc.cms)
 
     for item in layers:
         rend.antialias_flag = not any([not item.properties[3], not antialias_flag])
-        rend.render(ctx, item.childs)
+        rend.render(ctx, index=sk2_doc.methods.get_layer_index(item))
 
     surface.write_to_png(fileptr)
     fileptr.close()
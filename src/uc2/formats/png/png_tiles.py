@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tiled page rendering for PNG saver.
+
+Page is rendered by bands of tiles. Tiles of a band are rendered in
+thread pool (pycairo releases GIL while Cairo draws), then band is
+converted to RGBA rows and streamed into PNG encoder. So peak memory
+is limited by band size (tile height x page width) instead of page size.
+"""
+
+import multiprocessing
+import struct
+import sys
+import zlib
+from multiprocessing.pool import ThreadPool
+
+import cairo
+from PIL import Image
+
+from uc2.formats.sk2.crenderer import CairoRenderer
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+TILE_SIZE = 1024
+# pages larger than this pixels number are rendered by tiles by default
+TILED_PIXELS = 4096 * 4096
+# Cairo ARGB32 is native endian premultiplied color
+ARGB32_RAWMODE = 'BGRa' if sys.byteorder == 'little' else 'aRGB'
+
+
+class PNGStreamWriter(object):
+    """
+    Writes 8-bit RGBA PNG image row by row.
+    """
+
+    def __init__(self, fileptr, width, height, level=6):
+        self.fileptr = fileptr
+        self.width = width
+        self.height = height
+        self.rows = 0
+        self.compressor = zlib.compressobj(level)
+        self.fileptr.write(PNG_SIGNATURE)
+        # 8 bits per channel, color type 6 (RGBA), no interlace
+        self.write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height,
+                                              8, 6, 0, 0, 0))
+
+    def write_chunk(self, tag, data):
+        self.fileptr.write(struct.pack('>I', len(data)))
+        self.fileptr.write(tag)
+        self.fileptr.write(data)
+        crc = zlib.crc32(data, zlib.crc32(tag)) & 0xffffffff
+        self.fileptr.write(struct.pack('>I', crc))
+
+    def write_rows(self, data):
+        """
+        Appends RGBA rows (width * 4 bytes each).
+        """
+        stride = self.width * 4
+        rows = len(data) // stride
+        # filter type 0 (none) byte precedes each row
+        chunks = []
+        for row in range(rows):
+            chunks.append(b'\x00')
+            chunks.append(data[row * stride:(row + 1) * stride])
+        compressed = self.compressor.compress(b''.join(chunks))
+        if compressed:
+            self.write_chunk(b'IDAT', compressed)
+        self.rows += rows
+
+    def close(self):
+        if self.rows != self.height:
+            raise IOError('PNG image has %d rows instead of %d' %
+                          (self.rows, self.height))
+        self.write_chunk(b'IDAT', self.compressor.flush())
+        self.write_chunk(b'IEND', b'')
+
+
+def get_tiles(width, height, tile_size):
+    """
+    Returns tile bands as lists of (x, y, width, height) tuples.
+    """
+    bands = []
+    for y in range(0, height, tile_size):
+        h = min(tile_size, height - y)
+        bands.append([(x, y, min(tile_size, width - x), h)
+                      for x in range(0, width, tile_size)])
+    return bands
+
+
+class TileRenderer(object):
+
+    def __init__(self, sk2_doc, layers, trafo, antialias_flag=True):
+        self.sk2_doc = sk2_doc
+        self.layers = layers
+        self.trafo = trafo
+        self.antialias_flag = antialias_flag
+        self.indexes = [sk2_doc.methods.get_layer_index(item)
+                        for item in layers]
+
+    def __call__(self, tile):
+        x, y, w, h = tile
+        m11, m21, m12, m22, dx, dy = self.trafo
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, w, h)
+        ctx = cairo.Context(surface)
+        ctx.set_matrix(cairo.Matrix(m11, m21, m12, m22, dx - x, dy - y))
+        rend = CairoRenderer(self.sk2_doc.cms)
+        for layer, index in zip(self.layers, self.indexes):
+            rend.antialias_flag = self.antialias_flag and layer.properties[3]
+            rend.render(ctx, index=index)
+        surface.flush()
+        return Image.frombuffer('RGBA', (w, h), surface.get_data(), 'raw',
+                                ARGB32_RAWMODE, surface.get_stride(), 1)
+
+
+def render_tiled(sk2_doc, fileptr, size, trafo, layers, antialias_flag=True,
+                 tile_size=TILE_SIZE, threads=None):
+    """
+    Renders page layers into PNG file by tiles.
+    """
+    width, height = size
+    threads = threads or multiprocessing.cpu_count()
+    renderer = TileRenderer(sk2_doc, layers, trafo, antialias_flag)
+    writer = PNGStreamWriter(fileptr, width, height)
+    pool = ThreadPool(threads)
+    try:
+        for band in get_tiles(width, height, tile_size):
+            band_image = Image.new('RGBA', (width, band[0][3]))
+            for tile, image in zip(band, pool.map(renderer, band)):
+                band_image.paste(image, (tile[0], 0))
+            writer.write_rows(band_image.tobytes())
+        writer.close()
+    finally:
+        pool.close()
+        pool.join()
@@ -34,6 +34,9 @@ def riff_saver(riff_doc, filename=None, fileptr=None, translate=True, cnf=None,
     riff_doc.save(filename, fileptr)
 
 
+riff_signatures = (((0, 'RIFF'),),)
+
+
 def check_riff(path):
     fileptr = get_fileptr(path)
     fourcc = fileptr.read(4)
@@ -16,11 +16,11 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from uc2.utils import get_chunk_size, dword2py_int, py_int2dword
-from uc2.formats.generic_filters import AbstractLoader, AbstractSaver
+from uc2.formats.generic_filters import AbstractBinaryLoader, AbstractSaver
 from uc2.formats.riff import model
 
 
-class RIFF_Loader(AbstractLoader):
+class RIFF_Loader(AbstractBinaryLoader):
     name = 'RIFF_Loader'
 
     def do_load(self):
@@ -66,6 +66,9 @@ def scribus_pal_saver(doc, filename=None, fileptr=None, translate=True,
         doc.save(filename, fileptr)
 
 
+scribus_pal_signatures = (((None, SP_TAG),),)
+
+
 def check_scribus_pal(path):
     fileptr = get_fileptr(path)
     ret = False
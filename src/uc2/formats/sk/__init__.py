@@ -53,6 +53,9 @@ def sk_saver(sk2_doc, filename=None, fileptr=None, translate=True, cnf=None,
         sk2_doc.save(filename, fileptr)
 
 
+sk_signatures = (((0, sk_const.SKDOC_ID),),)
+
+
 def check_sk(path):
     fileptr = get_fileptr(path)
     string = fileptr.read(len(sk_const.SKDOC_ID))
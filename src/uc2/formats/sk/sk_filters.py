@@ -62,8 +62,7 @@ class SK_Loader(AbstractLoader):
 
             if self.line:
                 try:
-                    code = compile('self.' + self.line, '<string>', 'exec')
-                    exec(code)
+                    self.call_line(self.line)
                 except Exception as e:
                     LOG.error('Parsing error in "%s"', self.line)
                     LOG.error('Error traceback: %s', e)
@@ -52,6 +52,9 @@ def sk1_saver(sk2_doc, filename=None, fileptr=None, translate=True, cnf=None,
         sk2_doc.save(filename, fileptr)
 
 
+sk1_signatures = (((0, '##sK1 1'),),)
+
+
 def check_sk1(path):
     fileptr = get_fileptr(path)
     string = fileptr.read(7)
@@ -69,8 +69,7 @@ class SK1Loader(AbstractLoader):
 
             if self.line:
                 try:
-                    code = compile('self.' + self.line, '<string>', 'exec')
-                    exec(code)
+                    self.call_line(self.line)
                 except Exception as e:
                     LOG.warn('Parsing error in "%s"', self.line)
                     LOG.warn('Error traceback: %s', e)
@@ -36,6 +36,9 @@ def sk2_saver(sk2_doc, filename=None, fileptr=None, translate=True, cnf=None,
     sk2_doc.save(filename, fileptr)
 
 
+sk2_signatures = (((None, SK2DOC_ID),), ((None, SK2XML_ID),))
+
+
 def check_sk2(path):
     ret = False
     fileptr = get_fileptr(path)
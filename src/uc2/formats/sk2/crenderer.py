@@ -67,6 +67,18 @@ class CairoRenderer:
             r, g, b = self.cms.get_rgb_color(color)[1]
         return r, g, b, color[2]
 
+    def get_colors(self, colors):
+        """
+        Batch variant of get_color(), the whole color list
+        is processed by single CMS pass per colorspace.
+        """
+        if self.for_display:
+            values = self.cms.get_display_colors(colors)
+        else:
+            values = [item[1] for item in self.cms.get_colors(colors)]
+        return [tuple(vals) + (color[2],)
+                for vals, color in zip(values, colors)]
+
     def get_surface(self, obj):
         if self.contour_flag:
             return obj.handler.get_surface(self.cms, stroke_mode=True)
@@ -77,33 +89,40 @@ class CairoRenderer:
         fill = obj.style[0]
         pattern_fill = fill[2]
         image_obj = sk2_model.Pixmap(obj.config)
-        image_obj.handler.load_from_b64str(self.cms, pattern_fill[1])
-        image_obj.handler.flip_top_to_bottom()
+        image_obj.handler.load_pattern(self.cms, pattern_fill[1], flip=True)
         if pattern_fill[0] == sk2const.PATTERN_IMG and len(pattern_fill) > 2:
             image_obj.style[3] = deepcopy(pattern_fill[2])
         return image_obj
 
     def get_pattern_surface(self, obj):
-        image_obj = self._create_pattern_image(obj)
         if self.contour_flag:
             if not obj.cache_gray_pattern_img:
+                image_obj = self._create_pattern_image(obj)
                 s = image_obj.handler.get_surface(self.cms, stroke_mode=True)
                 obj.cache_gray_pattern_img = s
             return obj.cache_gray_pattern_img
         elif self.cms.proofing:
             if not obj.cache_ps_pattern_img:
+                image_obj = self._create_pattern_image(obj)
                 s = image_obj.handler.get_surface(self.cms, True)
                 obj.cache_ps_pattern_img = s
             return obj.cache_ps_pattern_img
         else:
             if not obj.cache_pattern_img:
+                image_obj = self._create_pattern_image(obj)
                 s = image_obj.handler.get_surface(self.cms)
                 obj.cache_pattern_img = s
             return obj.cache_pattern_img
 
     # -------DOCUMENT RENDERING
 
-    def render(self, ctx, objs=None):
+    def render(self, ctx, objs=None, index=None):
+        """
+        Renders objects. If spatial index (see SK2_Methods.get_layer_index)
+        is provided, objects outside current clip extents are skipped.
+        """
+        if index is not None:
+            objs = index.query(list(ctx.clip_extents()))
         objs = objs or []
         if self.antialias_flag:
             ctx.set_antialias(cairo.ANTIALIAS_DEFAULT)
@@ -295,8 +314,10 @@ class CairoRenderer:
                 x0, y0 = coords[:2]
                 radius = libgeom.distance(*points)
                 grd = cairo.RadialGradient(x0, y0, 0, x0, y0, radius)
-            for stop in gradient[2]:
-                grd.add_color_stop_rgba(stop[0], *self.get_color(stop[1]))
+            stops = gradient[2]
+            colors = self.get_colors([stop[1] for stop in stops])
+            for stop, color in zip(stops, colors):
+                grd.add_color_stop_rgba(stop[0], *color)
             matrix = cairo.Matrix(*obj.fill_trafo)
             matrix.invert()
             extend = cairo.EXTEND_PAD
@@ -28,6 +28,12 @@ class SK2_Config(XmlConfigParser):
     preview_size = (300.0, 300.0)
     preview_transparent = False
 
+    # --- DOCUMENT LOADING
+    # compile/exec based loader instead of call line parser
+    legacy_loader = False
+    # keep curve paths as array backed libgeom.CompactPath objects
+    compact_paths = False
+
     # --- DOCUMENT PROPERTIES
     doc_origin = sk2const.DOC_ORIGIN_LL
     doc_units = uc2const.UNIT_MM
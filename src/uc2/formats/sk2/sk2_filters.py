@@ -16,15 +16,18 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import gc
 import logging
 
 from uc2 import libimg, sk2const
-from uc2.formats.generic_filters import AbstractLoader, AbstractSaver
+from uc2.formats.generic_filters import AbstractLoader, AbstractSaver, \
+    parse_call, parse_literal
 from uc2.formats.sk2 import sk2_model
-from uc2.formats.sk2.crenderer import CairoRenderer
 
 LOG = logging.getLogger(__name__)
 
+PROGRESS_STEP = 1000
+
 
 class SK2_Loader(AbstractLoader):
     name = 'SK2_Loader'
@@ -38,8 +41,23 @@ class SK2_Loader(AbstractLoader):
         self.parent_stack = []
         line = self.fileptr.readline()
         if not line[:len(sk2const.SK2DOC_ID)] == sk2const.SK2DOC_ID:
-            while self.fileptr.readline().rstrip('\n') != sk2const.SK2DOC_START:
+            while self.fileptr.readline().rstrip('\r\n') != \
+                    sk2const.SK2DOC_START:
                 pass
+        if self.config.legacy_loader:
+            self.exec_lines()
+        else:
+            # model objects are created in bulk and have no cyclic
+            # garbage, so collector passes over growing model are wasted
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                self.parse_lines()
+            finally:
+                if gc_enabled:
+                    gc.enable()
+
+    def exec_lines(self):
         while True:
             if self.break_flag:
                 break
@@ -57,6 +75,48 @@ class SK2_Loader(AbstractLoader):
                     self.send_error(msg)
                     raise
 
+    def parse_lines(self):
+        """
+        Builds model from document lines using call line parser instead
+        of per-line compile/exec. Frequent obj(), set() and end() lines
+        are dispatched inline.
+        """
+        methods = {'obj': self.obj, 'set': self.set, 'end': self.end}
+        set_field = self.set_field
+        position = self.fileptr.tell()
+        counter = 0
+        for line in self.fileptr:
+            position += len(line)
+            counter += 1
+            if not counter % PROGRESS_STEP:
+                self.check_position(position)
+
+            self.line = line = line.rstrip('\r\n')
+            if not line:
+                continue
+            try:
+                head = line[:5]
+                if line == 'end()':
+                    self.obj_end()
+                elif head == "set('" and "'," in line:
+                    index = line.find("',", 5)
+                    set_field(line[5:index], parse_literal(line[index + 2:-1]))
+                elif head == "obj('":
+                    self.obj(line[5:-2])
+                else:
+                    name, args, kwargs = parse_call(line)
+                    methods[name](*args, **kwargs)
+            except Exception:
+                msg = 'Parsing error in "%s"' % line
+                self.send_error(msg)
+                raise
+            if self.break_flag:
+                break
+
+    def check_position(self, position):
+        if self.file_size:
+            self.progress.update(float(position) / self.file_size)
+
     def obj(self, tag):
         obj_cid = sk2_model.TAGNAME_TO_CID[tag]
         obj = sk2_model.CID_TO_CLASS[obj_cid](self.config)
@@ -147,6 +207,7 @@ class SK2_Saver(AbstractSaver):
         self.writeln("end()")
 
     def generate_preview(self):
+        from uc2.formats.sk2.crenderer import CairoRenderer
         return libimg.generate_preview(
             self.presenter, CairoRenderer,
             size=self.config.preview_size,
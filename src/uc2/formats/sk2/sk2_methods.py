@@ -15,11 +15,15 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import math
 from copy import deepcopy
 
-from uc2 import _, uc2const, libgeom
+from uc2 import _, uc2const, libgeom, sk2const
 from uc2.formats.sk2 import sk2_model
 
+# arrow extent in line widths (arrows.py defines arrows in [-12, 12] box)
+ARROW_SIZE = 12.0
+
 
 def create_new_doc(config):
     doc = sk2_model.Document(config)
@@ -87,19 +91,23 @@ class SK2_Methods:
     def delete_object(self, obj):
         parent = obj.parent
         parent.childs.remove(obj)
+        parent.set_dirty()
 
     def insert_object(self, obj, parent, index=0):
         parent.childs.insert(index, obj)
         obj.parent = parent
+        parent.set_dirty()
 
     def append_object(self, obj, parent):
         parent.childs.append(obj)
         obj.parent = parent
+        parent.set_dirty()
 
     def append_objects(self, objs, parent):
         parent.childs += objs
         for obj in objs:
             obj.parent = parent
+        parent.set_dirty()
 
     # ---PAGES
 
@@ -382,10 +390,57 @@ class SK2_Methods:
         for obj in objs:
             if obj.is_selectable:
                 bbox = libgeom.sum_bbox(bbox, obj.cache_bbox)
+            elif obj.is_layer:
+                index = self.get_layer_index(obj)
+                bbox = libgeom.sum_bbox(bbox, index.content_bbox)
             elif obj.childs:
                 bbox = libgeom.sum_bbox(bbox, self.count_bbox(obj.childs))
         return bbox
 
+    def get_render_bbox(self, obj):
+        """
+        Returns object bbox including stroke and arrows.
+        """
+        if obj.is_container:
+            return self.get_render_bbox(obj.childs[0])
+        if obj.is_group:
+            bbox = []
+            for child in obj.childs:
+                bbox = libgeom.sum_bbox(bbox, self.get_render_bbox(child))
+            return bbox
+        bbox = obj.cache_bbox
+        stroke = obj.style[1] if obj.is_primitive else None
+        if bbox and stroke:
+            width = obj.cache_line_width or stroke[1]
+            coef = math.sqrt(2.0)
+            if stroke[5] == sk2const.JOIN_MITER:
+                coef = max(coef, stroke[6])
+            margin = width * coef / 2.0
+            if stroke[9]:
+                margin = max(margin, width * ARROW_SIZE)
+            bbox = libgeom.enlarge_bbox(bbox, 2.0 * margin, 2.0 * margin)
+        return bbox
+
+    def get_layer_index(self, layer):
+        """
+        Returns spatial index of layer childs. Index is rebuilt
+        after layer changes.
+        """
+        index = layer.cache_index
+        if index is None or layer.cache_dirty or \
+                len(index) != len(layer.childs):
+            items = [(self.get_render_bbox(obj), obj) for obj in layer.childs]
+            index = libgeom.SpatialIndex(items)
+            index.content_bbox = self.count_bbox(layer.childs)
+            layer.cache_index = index
+        return layer.cache_index
+
+    def get_objects_in_bbox(self, layer, bbox):
+        """
+        Returns layer childs which intersect bbox in z-order.
+        """
+        return self.get_layer_index(layer).query(bbox)
+
     # ---UC2 CLI API
 
     @staticmethod
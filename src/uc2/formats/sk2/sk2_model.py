@@ -27,6 +27,8 @@ from uc2.libimg.handlers import EditableImageHandler
 from . import arrows
 
 GENERIC_FIELDS = ['cid', 'childs', 'parent', 'config', 'handler']
+# fields which are not object state, i.e. do not require rebuilding
+UNTRACKED_FIELDS = ('parent', 'config')
 LOG = logging.getLogger(__name__)
 
 
@@ -34,6 +36,10 @@ class DocumentObject(TextModelObject):
     """
     Abstract parent class for all document
     objects. Provides common object properties.
+    Field assignment (obj.trafo = ...) marks object and its parents
+    as dirty, so do_update() rebuilds changed subtrees only.
+    In-place mutations of field values (obj.style[0] = ...) are not
+    tracked, such changes should be followed by set_dirty() call.
     """
     is_layer = False
     is_guide_layer = False
@@ -51,6 +57,13 @@ class DocumentObject(TextModelObject):
     is_container = False
     is_selectable = False
 
+    incremental_update = True
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if not name.startswith('cache') and name not in UNTRACKED_FIELDS:
+            self.set_dirty()
+
     def get_class_name(self):
         return CID_TO_NAME[self.cid]
 
@@ -236,6 +249,7 @@ class Layer(StructuralObject):
     properties = []
     name = ''
     is_layer = True
+    cache_index = None
 
     def __init__(self, config, parent=None, name=''):
         self.cid = LAYER
@@ -261,6 +275,7 @@ class Layer(StructuralObject):
         return StructuralObject.resolve(self, '%s' % self.name)
 
     def update(self):
+        self.cache_index = None
         if isinstance(self.color, str):
             try:
                 self.color = cms.hexcolor_to_rgba(self.color)
@@ -862,6 +877,11 @@ class Curve(PrimitiveObject):
     def to_curve(self):
         return self
 
+    def update(self):
+        if getattr(self.config, 'compact_paths', False):
+            self.paths = libgeom.pack_paths(self.paths)
+        PrimitiveObject.update(self)
+
     def arrows_to_curve(self):
         if not self.cache_arrows or not self.style[1]:
             return None
@@ -1128,7 +1148,9 @@ class Pixmap(PrimitiveObject):
     a PNG bitmap for others. 'bitmap' field contains raster info, but
     transparency data is stored as a grayscale image in 'alpha_channel'.
     Images are stored as a base64 encoded string to resolve EOL and other
-    special character issues. 'colorspace' describes 'bitmap' type.
+    special character issues. In memory images are kept encoded as loaded
+    and decoded on demand (see ImageHandler).
+    'colorspace' describes 'bitmap' type.
     Possible types are: monochrome, grayscale, RGB and CMYK.
     For monochrome and grayscale colorspaces is available duotone mode. Duotone
     colors (foreground and background) are defined in 'style' field.
@@ -1179,6 +1201,7 @@ class Pixmap(PrimitiveObject):
             self.handler.set_images_from_b64str(bitmap)
         else:
             self.handler.set_images_from_str(bitmap)
+        self.set_dirty()
 
     def get_bitmap(self):
         return self.handler.get_bitmap_b64str()
@@ -1188,6 +1211,7 @@ class Pixmap(PrimitiveObject):
             self.handler.set_images_from_b64str(None, alpha)
         else:
             self.handler.set_images_from_str(None, alpha)
+        self.set_dirty()
 
     def get_alpha_channel(self):
         return self.handler.get_alpha_b64str()
@@ -47,6 +47,9 @@ def skp_saver(doc, filename=None, fileptr=None, translate=True,
         doc.save(filename, fileptr)
 
 
+skp_signatures = (((0, SKP_ID),),)
+
+
 def check_skp(path):
     fileptr = get_fileptr(path)
     string = fileptr.read(len(SKP_ID))
@@ -41,9 +41,7 @@ class SKP_Loader(AbstractLoader):
             self.check_loading()
             if self.line:
                 try:
-                    code = compile('self.' + self.line, '<string>', 'exec')
-                    exec(code)
-
+                    self.call_line(self.line)
                 except Exception as e:
                     LOG.error('Parsing error in "%s"', self.line)
                     LOG.error('Error traceback: %s', e)
@@ -65,6 +65,9 @@ def soc_saver(doc, filename=None, fileptr=None, translate=True,
         doc.save(filename, fileptr)
 
 
+soc_signatures = (((None, SOC_PAL_TAG),), ((None, SOC_PAL_OO_TAG),))
+
+
 def check_soc(path):
     fileptr = get_fileptr(path)
     ret = False
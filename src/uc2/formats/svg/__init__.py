@@ -53,6 +53,9 @@ def svg_saver(sk2_doc, filename=None, fileptr=None,
         sk2_doc.save(filename, fileptr)
 
 
+svg_signatures = (((None, '<svg'),),)
+
+
 def check_svg(path):
     tag = None
     fileptr = get_fileptr(path)
@@ -57,6 +57,9 @@ def svgz_saver(sk2_doc, filename=None, fileptr=None,
         sk2_doc.save(None, fileptr)
 
 
+svgz_signatures = (((0, SVGZ_HEADER),),)
+
+
 def check_svgz(path):
     fileptr = get_fileptr(path)
     sign = fileptr.read(len(SVGZ_HEADER))
@@ -52,6 +52,11 @@ def wmf_saver(sk2_doc, filename=None, fileptr=None,
         sk2_doc.save(filename, fileptr)
 
 
+wmf_signatures = (((0, WMF_SIGNATURE),),) + tuple(
+    ((0, metatype), (4, metaver))
+    for metatype in METAFILETYPES for metaver in METAVERSIONS)
+
+
 def check_wmf(path):
     fileptr = get_fileptr(path)
     sign = fileptr.read(len(WMF_SIGNATURE))
@@ -55,6 +55,9 @@ def xar_saver(sk2_doc, filename=None, fileptr=None,
         sk2_doc.save(filename, fileptr)
 
 
+xar_signatures = (((0, XAR_SIGNATURE),),)
+
+
 def check_xar(path):
     with get_fileptr(path) as fileptr:
         size = len(XAR_SIGNATURE)
@@ -34,6 +34,9 @@ def xml__saver(doc, filename=None, fileptr=None, translate=False,
     doc.save(filename, fileptr)
 
 
+xml__signatures = (((None, '<?xml '),),)
+
+
 def check_xml_(path):
     fileptr = get_fileptr(path)
     ret = False
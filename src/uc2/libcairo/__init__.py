@@ -19,6 +19,7 @@ import cairo
 from cStringIO import StringIO
 
 from uc2 import uc2const
+from uc2.sk2const import NODE_LINE
 import _libcairo
 
 SURFACE = cairo.ImageSurface(cairo.FORMAT_RGB24, 1, 1)
@@ -31,11 +32,30 @@ def get_version():
     return cairo.cairo_version_string(), '%d.%d.%d' % (v0, v1, v2)
 
 
+def _append_compact_path(path):
+    coords = path.coords
+    CTX.move_to(coords[0], coords[1])
+    index = 2
+    for node in path.nodes:
+        if node == NODE_LINE:
+            CTX.line_to(coords[index], coords[index + 1])
+            index += 2
+        else:
+            CTX.curve_to(*coords[index:index + 6])
+            index += 6
+    if path.closed:
+        CTX.close_path()
+
+
 def create_cpath(paths, cmatrix=None):
     CTX.set_matrix(DIRECT_MATRIX)
     CTX.new_path()
     for path in paths:
         CTX.new_sub_path()
+        if not isinstance(path, list) and hasattr(path, 'nodes'):
+            # libgeom.CompactPath
+            _append_compact_path(path)
+            continue
         start_point = path[0]
         points = path[1]
         end = path[2]
@@ -17,12 +17,15 @@
 
 from bbox import *
 from bezier_ops import *
+from compact import CompactPath, is_compact, pack_path, pack_paths, \
+    unpack_path, unpack_paths
 from contour import stroke_to_curve
 from cwrap import *
 from flattering import get_flattened_paths, flat_paths, flat_path
 from objs import *
 from points import *
 from shaping import intersect_paths, fuse_paths, trim_paths, excluse_paths
+from spatial import SpatialIndex
 from text_on_path import set_text_on_path
 from trafo import *
 
@@ -0,0 +1,321 @@
+/* _libgeom - native Bezier curve flattening for libgeom.
+ *
+ * Copyright (C) 2019 by Ihor E.Novikov
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU Affero General Public License
+ * as published by the Free Software Foundation, either version 3
+ * of the License, or (at your option) any later version.
+
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU Affero General Public License
+ * along with this program.  If not, see <https://www.gnu.org/licenses/>.
+ */
+
+/*
+ * The module repeats flattering.py algorithm step by step (de Casteljau
+ * split at t=0.5, flatness check by angle difference between halves)
+ * using the same floating point operations, so flattened paths match
+ * pure Python implementation (path length may differ in the last digit
+ * because compiler evaluates pow(x, 2) as x * x).
+ */
+
+#include <Python.h>
+#include <math.h>
+
+/* Python implementation fails on recursion limit for degenerated
+ * curves, native one treats such segments as flat */
+#define MAX_DEPTH 64
+
+typedef struct {
+	double x;
+	double y;
+} Point;
+
+static int
+get_point(PyObject *obj, Point *point) {
+
+	PyObject *seq, *item;
+
+	seq = PySequence_Fast(obj, "point should be a sequence");
+	if (seq == NULL) return 0;
+	if (PySequence_Fast_GET_SIZE(seq) < 2) {
+		Py_DECREF(seq);
+		PyErr_SetString(PyExc_ValueError, "point should have two coordinates");
+		return 0;
+	}
+	item = PySequence_Fast_GET_ITEM(seq, 0);
+	point->x = PyFloat_AsDouble(item);
+	item = PySequence_Fast_GET_ITEM(seq, 1);
+	point->y = PyFloat_AsDouble(item);
+	Py_DECREF(seq);
+	return !PyErr_Occurred();
+}
+
+static int
+append_copy(PyObject *list, PyObject *point) {
+
+	PyObject *copy;
+	int ret;
+
+	copy = PySequence_List(point);
+	if (copy == NULL) return -1;
+	ret = PyList_Append(list, copy);
+	Py_DECREF(copy);
+	return ret;
+}
+
+static int
+append_point(PyObject *list, Point *point) {
+
+	PyObject *item;
+	int ret;
+
+	item = PyList_New(2);
+	if (item == NULL) return -1;
+	PyList_SET_ITEM(item, 0, PyFloat_FromDouble(point->x));
+	PyList_SET_ITEM(item, 1, PyFloat_FromDouble(point->y));
+	if (PyErr_Occurred()) {
+		Py_DECREF(item);
+		return -1;
+	}
+	ret = PyList_Append(list, item);
+	Py_DECREF(item);
+	return ret;
+}
+
+static Point
+mid_point(Point *p0, Point *p1) {
+
+	Point ret;
+
+	ret.x = p0->x * (1.0 - 0.5) + p1->x * 0.5;
+	ret.y = p0->y * (1.0 - 0.5) + p1->y * 0.5;
+	return ret;
+}
+
+/* libgeom.points.get_point_angle() */
+static double
+get_point_angle(Point *p, Point *c) {
+
+	double x = p->x, y = p->y, x0 = c->x, y0 = c->y, r;
+
+	r = sqrt(pow(x0 - x, 2) + pow(y0 - y, 2));
+	if (x >= x0 && y == y0) return 0.0;
+	if (x < x0 && y == y0) return M_PI;
+	if (x == x0 && y > y0) return M_PI / 2.0;
+	if (x == x0 && y < y0) return M_PI / 2.0 + M_PI;
+	if (x > x0 && y > y0) return acos((x - x0) / r);
+	if (x < x0 && y > y0) return M_PI - acos((x0 - x) / r);
+	if (x < x0 && y < y0) return M_PI + acos((x0 - x) / r);
+	return 2.0 * M_PI - acos((x - x0) / r);
+}
+
+static int
+is_equal(Point *p0, Point *p1) {
+	return p0->x == p1->x && p0->y == p1->y;
+}
+
+/*
+ * Appends flattened segment points (excluding start point) into list.
+ * Last point is copied from end_obj if provided.
+ */
+static int
+flat_segment(PyObject *list, Point p0, Point p1, Point p2, Point p3,
+		PyObject *end_obj, double tlr, int depth) {
+
+	Point p0_1, p1_2, p2_3, p01_12, p12_23, mid;
+
+	p0_1 = mid_point(&p0, &p1);
+	p1_2 = mid_point(&p1, &p2);
+	p2_3 = mid_point(&p2, &p3);
+	p01_12 = mid_point(&p0_1, &p1_2);
+	p12_23 = mid_point(&p1_2, &p2_3);
+	mid = mid_point(&p01_12, &p12_23);
+
+	if (depth >= MAX_DEPTH || is_equal(&p0, &mid) || is_equal(&mid, &p3) ||
+			fabs(get_point_angle(&p3, &mid) -
+					get_point_angle(&mid, &p0)) < tlr) {
+		if (append_point(list, &mid) < 0) return -1;
+		if (end_obj) return append_copy(list, end_obj);
+		return append_point(list, &p3);
+	}
+	if (flat_segment(list, p0, p0_1, p01_12, mid, NULL, tlr, depth + 1) < 0)
+		return -1;
+	return flat_segment(list, mid, p12_23, p2_3, p3, end_obj, tlr, depth + 1);
+}
+
+static PyObject *
+flat_path_points(PyObject *path, double tlr, PyObject **start_obj,
+		PyObject **closed) {
+
+	PyObject *path_seq, *points_seq, *point_seq, *ret, *end_obj;
+	Py_ssize_t i, size;
+	Point start, c1, c2, end;
+	int failed = 0;
+
+	path_seq = PySequence_Fast(path, "path should be a sequence");
+	if (path_seq == NULL) return NULL;
+	if (PySequence_Fast_GET_SIZE(path_seq) < 3) {
+		Py_DECREF(path_seq);
+		PyErr_SetString(PyExc_ValueError, "path should have three members");
+		return NULL;
+	}
+	*start_obj = PySequence_Fast_GET_ITEM(path_seq, 0);
+	*closed = PySequence_Fast_GET_ITEM(path_seq, 2);
+	Py_INCREF(*start_obj);
+	Py_INCREF(*closed);
+
+	ret = PyList_New(0);
+	points_seq = PySequence_Fast(PySequence_Fast_GET_ITEM(path_seq, 1),
+			"path points should be a sequence");
+	Py_DECREF(path_seq);
+	if (ret == NULL || points_seq == NULL || !get_point(*start_obj, &start)) {
+		Py_XDECREF(ret);
+		Py_XDECREF(points_seq);
+		Py_DECREF(*start_obj);
+		Py_DECREF(*closed);
+		return NULL;
+	}
+
+	size = PySequence_Fast_GET_SIZE(points_seq);
+	for (i = 0; i < size && !failed; i++) {
+		point_seq = PySequence_Fast(PySequence_Fast_GET_ITEM(points_seq, i),
+				"path point should be a sequence");
+		if (point_seq == NULL) {
+			failed = 1;
+			break;
+		}
+		if (PySequence_Fast_GET_SIZE(point_seq) == 2) {
+			failed = !get_point(point_seq, &end) ||
+					append_copy(ret, point_seq) < 0;
+		} else if (PySequence_Fast_GET_SIZE(point_seq) < 3) {
+			PyErr_SetString(PyExc_ValueError, "wrong curve point");
+			failed = 1;
+		} else {
+			end_obj = PySequence_Fast_GET_ITEM(point_seq, 2);
+			failed = !get_point(PySequence_Fast_GET_ITEM(point_seq, 0), &c1) ||
+					!get_point(PySequence_Fast_GET_ITEM(point_seq, 1), &c2) ||
+					!get_point(end_obj, &end) ||
+					flat_segment(ret, start, c1, c2, end, end_obj, tlr, 0) < 0;
+		}
+		Py_DECREF(point_seq);
+		start = end;
+	}
+	Py_DECREF(points_seq);
+	if (failed) {
+		Py_DECREF(ret);
+		Py_DECREF(*start_obj);
+		Py_DECREF(*closed);
+		return NULL;
+	}
+	return ret;
+}
+
+/* libgeom.flattering.flat_path() */
+static PyObject *
+libgeom_FlatPath(PyObject *self, PyObject *args) {
+
+	PyObject *path, *points, *start_obj, *closed, *start, *last, *ret;
+	double tlr = 0.1;
+	int is_closed, not_equal;
+
+	if (!PyArg_ParseTuple(args, "O|d", &path, &tlr)) return NULL;
+
+	points = flat_path_points(path, tlr, &start_obj, &closed);
+	if (points == NULL) return NULL;
+
+	ret = NULL;
+	start = NULL;
+	is_closed = PyObject_IsTrue(closed);
+	if (is_closed < 0) goto finally;
+	if (is_closed) {
+		if (!PyList_GET_SIZE(points)) {
+			PyErr_SetString(PyExc_IndexError, "list index out of range");
+			goto finally;
+		}
+		last = PyList_GET_ITEM(points, PyList_GET_SIZE(points) - 1);
+		not_equal = PyObject_RichCompareBool(start_obj, last, Py_NE);
+		if (not_equal < 0 || (not_equal && append_copy(points, start_obj) < 0))
+			goto finally;
+	}
+	start = PySequence_List(start_obj);
+	if (start == NULL) goto finally;
+	ret = Py_BuildValue("[OOO]", start, points, closed);
+
+finally:
+	Py_XDECREF(start);
+	Py_DECREF(points);
+	Py_DECREF(start_obj);
+	Py_DECREF(closed);
+	return ret;
+}
+
+/* libgeom.bezier_ops.get_path_length() */
+static PyObject *
+libgeom_GetPathLength(PyObject *self, PyObject *args) {
+
+	PyObject *path, *points, *start_obj, *closed;
+	Point start, point;
+	Py_ssize_t i, size;
+	double tlr = 0.5, length = 0.0;
+
+	if (!PyArg_ParseTuple(args, "O|d", &path, &tlr)) return NULL;
+
+	points = flat_path_points(path, tlr, &start_obj, &closed);
+	if (points == NULL) return NULL;
+
+	size = PyList_GET_SIZE(points);
+	if (get_point(start_obj, &start)) {
+		for (i = 0; i < size; i++) {
+			if (!get_point(PyList_GET_ITEM(points, i), &point)) break;
+			length += sqrt(pow(start.x - point.x, 2) +
+					pow(start.y - point.y, 2));
+			start = point;
+		}
+		/* closing segment */
+		if (!PyErr_Occurred() && size && PyObject_IsTrue(closed)) {
+			get_point(start_obj, &point);
+			length += sqrt(pow(start.x - point.x, 2) +
+					pow(start.y - point.y, 2));
+		}
+	}
+	Py_DECREF(points);
+	Py_DECREF(start_obj);
+	Py_DECREF(closed);
+	if (PyErr_Occurred()) return NULL;
+	return PyFloat_FromDouble(length);
+}
+
+static
+PyMethodDef libgeom_methods[] = {
+	{"flat_path", libgeom_FlatPath, METH_VARARGS},
+	{"get_path_length", libgeom_GetPathLength, METH_VARARGS},
+	{NULL, NULL}
+};
+
+#if PY_MAJOR_VERSION >= 3
+
+static struct PyModuleDef libgeom_module = {
+	PyModuleDef_HEAD_INIT, "_libgeom", NULL, -1, libgeom_methods
+};
+
+PyMODINIT_FUNC
+PyInit__libgeom(void)
+{
+	return PyModule_Create(&libgeom_module);
+}
+
+#else
+
+void
+init_libgeom(void)
+{
+	Py_InitModule("_libgeom", libgeom_methods);
+}
+
+#endif
@@ -19,7 +19,7 @@ from copy import deepcopy
 
 from uc2 import sk2const
 
-from flattering import flat_path
+from flattering import flat_path, _libgeom
 from points import distance, mult_point, add_points
 from cwrap import get_cpath_bbox, create_cpath
 
@@ -33,6 +33,8 @@ def bezier_base_point(point):
 
 
 def get_path_length(path, tolerance=0.5):
+    if _libgeom is not None:
+        return _libgeom.get_path_length(path, tolerance)
     fpath = flat_path(path, tolerance)
     ret = 0
     start = fpath[0]
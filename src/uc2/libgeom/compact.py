@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compact path representation.
+
+CompactPath stores all path coordinates in single array('d') and node
+types in parallel array('b') (sk2const.NODE_LINE for line points,
+curve point marker for curve points):
+
+coords - [x, y, x1, y1, x2, y2, x3, y3, x, y, ...]
+nodes  - [curve marker, NODE_LINE, ...]
+
+The object mimics [start_point, points, end_marker] list, i.e. path[0],
+path[1][i] and path[2] return regular list points, so code written for
+list paths works unchanged. Copying is a plain array copy.
+
+Points container path[1] supports list operations (append, insert,
+item assignment, deletion, concatenation), changes are written into
+path arrays. Returned points are copies, so modified point should be
+assigned back: points[i] = point.
+"""
+
+from array import array
+
+from uc2.sk2const import NODE_LINE
+
+
+def _point_to_list(coords, node, index):
+    if node == NODE_LINE:
+        return [coords[index], coords[index + 1]]
+    return [[coords[index], coords[index + 1]],
+            [coords[index + 2], coords[index + 3]],
+            [coords[index + 4], coords[index + 5]], node]
+
+
+def _node_size(node):
+    return 2 if node == NODE_LINE else 6
+
+
+def _point_to_array(point):
+    if len(point) == 2:
+        return array('d', point), NODE_LINE
+    node = point[3] if len(point) > 3 else 0
+    return array('d', point[0] + point[1] + point[2]), node
+
+
+class CompactPoints(object):
+    """
+    List-like view on CompactPath points.
+    """
+    __slots__ = ('path',)
+
+    def __init__(self, path):
+        self.path = path
+
+    def __len__(self):
+        return len(self.path.nodes)
+
+    def __iter__(self):
+        coords = self.path.coords
+        index = 2
+        for node in self.path.nodes:
+            yield _point_to_list(coords, node, index)
+            index += _node_size(node)
+
+    def _get_index(self, index):
+        size = len(self.path.nodes)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('list index out of range')
+        return index
+
+    def _replace(self, points):
+        self.path[1] = points
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        index = self._get_index(index)
+        offset = self.path.get_offsets()[index]
+        return _point_to_list(self.path.coords, self.path.nodes[index],
+                              offset)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            points = list(self)
+            points[index] = value
+            self._replace(points)
+            return
+        index = self._get_index(index)
+        path = self.path
+        offset = path.get_offsets()[index]
+        size = _node_size(path.nodes[index])
+        coords, node = _point_to_array(value)
+        path.coords[offset:offset + size] = coords
+        path.nodes[index] = node
+        if len(coords) != size:
+            path._offsets = None
+
+    def __delitem__(self, index):
+        points = list(self)
+        del points[index]
+        self._replace(points)
+
+    def append(self, point):
+        path = self.path
+        coords, node = _point_to_array(point)
+        offsets = path.get_offsets()
+        offsets.append(len(path.coords))
+        path.coords.extend(coords)
+        path.nodes.append(node)
+
+    def extend(self, points):
+        for point in list(points):
+            self.append(point)
+
+    def insert(self, index, point):
+        points = list(self)
+        points.insert(index, point)
+        self._replace(points)
+
+    def pop(self, index=-1):
+        points = list(self)
+        point = points.pop(index)
+        self._replace(points)
+        return point
+
+    def remove(self, point):
+        points = list(self)
+        points.remove(point)
+        self._replace(points)
+
+    def reverse(self):
+        self._replace(list(self)[::-1])
+
+    def index(self, point):
+        return list(self).index(point)
+
+    def count(self, point):
+        return list(self).count(point)
+
+    def __contains__(self, point):
+        return point in list(self)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class CompactPath(object):
+    """
+    Array backed SK2 path. See module docstring for details.
+    """
+    __slots__ = ('coords', 'nodes', 'closed', '_offsets')
+
+    def __init__(self, coords=None, nodes=None, closed=0):
+        self.coords = coords if coords is not None else array('d', [0.0, 0.0])
+        self.nodes = nodes if nodes is not None else array('b')
+        self.closed = closed
+        self._offsets = None
+
+    @classmethod
+    def from_path(cls, path):
+        if isinstance(path, CompactPath):
+            return path.copy()
+        coords = array('d', path[0][:2])
+        nodes = array('b')
+        for point in path[1]:
+            if len(point) == 2:
+                coords.extend(point)
+                nodes.append(NODE_LINE)
+            else:
+                coords.extend(point[0] + point[1] + point[2])
+                nodes.append(point[3] if len(point) > 3 else 0)
+        return cls(coords, nodes, path[2])
+
+    def to_list(self):
+        return [self[0], list(self[1]), self.closed]
+
+    def copy(self):
+        return CompactPath(self.coords[:], self.nodes[:], self.closed)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def get_offsets(self):
+        if self._offsets is None or len(self._offsets) != len(self.nodes):
+            offsets = array('l')
+            index = 2
+            for node in self.nodes:
+                offsets.append(index)
+                index += _node_size(node)
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter((self[0], self[1], self.closed))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[0], self[1], self.closed][index]
+        if index < 0:
+            index += 3
+        if index == 0:
+            return [self.coords[0], self.coords[1]]
+        elif index == 1:
+            return CompactPoints(self)
+        elif index == 2:
+            return self.closed
+        raise IndexError('list index out of range')
+
+    def __setitem__(self, index, value):
+        if index < 0:
+            index += 3
+        if index == 0:
+            self.coords[0], self.coords[1] = value[:2]
+        elif index == 1:
+            path = CompactPath.from_path([self[0], value, self.closed])
+            self.coords, self.nodes = path.coords, path.nodes
+            self._offsets = None
+        elif index == 2:
+            self.closed = value
+        else:
+            raise IndexError('list assignment index out of range')
+
+    def __add__(self, other):
+        return self.to_list() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self.to_list()
+
+    def __eq__(self, other):
+        if isinstance(other, CompactPath):
+            return self.closed == other.closed and \
+                   self.nodes == other.nodes and self.coords == other.coords
+        return self.to_list() == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return repr(self.to_list())
+
+    def __getstate__(self):
+        return self.coords, self.nodes, self.closed
+
+    def __setstate__(self, state):
+        self.coords, self.nodes, self.closed = state
+        self._offsets = None
+
+    def transformed(self, trafo):
+        """
+        Returns new path with applied affine transformation.
+        """
+        m11, m21, m12, m22, dx, dy = trafo
+        coords = self.coords
+        xs = coords[0::2]
+        ys = coords[1::2]
+        ret = array('d', coords)
+        ret[0::2] = array('d', [m11 * x + m12 * y + dx
+                                for x, y in zip(xs, ys)])
+        ret[1::2] = array('d', [m21 * x + m22 * y + dy
+                                for x, y in zip(xs, ys)])
+        return CompactPath(ret, self.nodes[:], self.closed)
+
+    def get_bbox(self):
+        """
+        Returns control points bbox as [x0, y0, x1, y1].
+        """
+        xs = self.coords[0::2]
+        ys = self.coords[1::2]
+        return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def is_compact(path):
+    return isinstance(path, CompactPath)
+
+
+def pack_path(path):
+    return CompactPath.from_path(path)
+
+
+def pack_paths(paths):
+    return [path if isinstance(path, CompactPath)
+            else CompactPath.from_path(path) for path in paths]
+
+
+def unpack_path(path):
+    return path.to_list() if isinstance(path, CompactPath) else path
+
+
+def unpack_paths(paths):
+    return [unpack_path(path) for path in paths]
@@ -17,9 +17,15 @@
 
 from copy import deepcopy
 
+from compact import is_compact
 from points import add_points, mult_point, get_point_angle
 from trafo import apply_trafo_to_paths, NORMAL_TRAFO
 
+try:
+    import _libgeom
+except ImportError:
+    _libgeom = None
+
 
 # ------------- Flattering -------------
 
@@ -64,8 +70,9 @@ def flat_segment(start_point, end_point, tlr=0.5):
     return ret
 
 
-def flat_path(path, tlr=0.1):
-    path = deepcopy(path)
+def py_flat_path(path, tlr=0.1):
+    if not is_compact(path):
+        path = deepcopy(path)
     ret_points = []
     start = path[0]
     for point in path[1]:
@@ -79,6 +86,16 @@ def flat_path(path, tlr=0.1):
     return [path[0], ret_points, path[2]]
 
 
+def flat_path(path, tlr=0.1):
+    """
+    Returns flattened copy of the path. Native implementation is used
+    when _libgeom extension is built.
+    """
+    if _libgeom is None:
+        return py_flat_path(path, tlr)
+    return _libgeom.flat_path(path, tlr)
+
+
 def flat_paths(paths, tlr=0.1):
     return [flat_path(path, tlr) for path in paths if path[1]]
 
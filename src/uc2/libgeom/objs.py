@@ -20,7 +20,7 @@ from copy import deepcopy
 
 from bezier_ops import split_bezier_curve, bezier_base_point
 from points import rotate_point
-from uc2 import libpango, libcairo, sk2const
+from uc2 import libcairo, sk2const
 
 
 # ------------- Object specific routines -------------
@@ -277,6 +277,8 @@ def get_polygon_paths(corners_num, angle1, angle2, coef1, coef2):
 # ------------- TEXT -------------
 
 def get_text_glyphs(text, width, text_style, markup):
+    # Pango is loaded on first text layout only
+    from uc2 import libpango
     return libpango.get_text_paths(text, width, text_style, markup)
 
 
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Static R-tree for bbox queries.
+
+The tree is bulk loaded by Sort-Tile-Recursive algorithm from
+(bbox, item) pairs and is rebuilt from scratch when model is changed.
+Query results keep insertion order, so for layer childs they are
+in z-order.
+"""
+
+import math
+
+NODE_SIZE = 16
+
+
+def _bbox_union(bboxes):
+    return [min(bbox[0] for bbox in bboxes),
+            min(bbox[1] for bbox in bboxes),
+            max(bbox[2] for bbox in bboxes),
+            max(bbox[3] for bbox in bboxes)]
+
+
+def _pack(nodes, node_size):
+    """
+    Groups nodes [bbox, childs] into parent nodes by STR tiling.
+    """
+    leaves_num = int(math.ceil(len(nodes) / float(node_size)))
+    slices_num = int(math.ceil(math.sqrt(leaves_num)))
+    slice_size = slices_num * node_size
+    nodes = sorted(nodes, key=lambda node: node[0][0] + node[0][2])
+    parents = []
+    for i in range(0, len(nodes), slice_size):
+        tile = sorted(nodes[i:i + slice_size],
+                      key=lambda node: node[0][1] + node[0][3])
+        for j in range(0, len(tile), node_size):
+            childs = tile[j:j + node_size]
+            parents.append([_bbox_union([child[0] for child in childs]),
+                            childs])
+    return parents
+
+
+class SpatialIndex(object):
+    """
+    Bbox index over items.
+
+    items - list of (bbox, item) pairs, item without bbox (empty list
+    or None) is returned by any query.
+    """
+
+    def __init__(self, items, node_size=NODE_SIZE):
+        self.items = []
+        self.unbound = []
+        leaves = []
+        for index, (bbox, item) in enumerate(items):
+            self.items.append(item)
+            if not bbox:
+                self.unbound.append(index)
+                continue
+            x0, y0, x1, y1 = bbox
+            leaves.append([[min(x0, x1), min(y0, y1), max(x0, x1),
+                            max(y0, y1)], index])
+        self.bbox = _bbox_union([leaf[0] for leaf in leaves]) \
+            if leaves else []
+        self.depth = 0
+        self.root = None
+        if leaves:
+            nodes = _pack(leaves, node_size)
+            self.depth = 1
+            while len(nodes) > 1:
+                nodes = _pack(nodes, node_size)
+                self.depth += 1
+            self.root = nodes[0]
+
+    def __len__(self):
+        return len(self.items)
+
+    def query_indexes(self, bbox):
+        """
+        Returns sorted indexes of items which bboxes intersect bbox.
+        """
+        ret = [] + self.unbound
+        if self.root is not None:
+            x0, y0, x1, y1 = bbox
+            x0, x1 = min(x0, x1), max(x0, x1)
+            y0, y1 = min(y0, y1), max(y0, y1)
+            stack = [(self.root, self.depth)]
+            while stack:
+                node, level = stack.pop()
+                for child in node[1]:
+                    cbbox = child[0]
+                    if cbbox[0] > x1 or cbbox[2] < x0 or \
+                            cbbox[1] > y1 or cbbox[3] < y0:
+                        continue
+                    if level == 1:
+                        ret.append(child[1])
+                    else:
+                        stack.append((child, level - 1))
+        ret.sort()
+        return ret
+
+    def query(self, bbox):
+        """
+        Returns items which bboxes intersect bbox in insertion order.
+        """
+        items = self.items
+        return [items[index] for index in self.query_indexes(bbox)]
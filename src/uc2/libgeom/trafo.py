@@ -18,6 +18,7 @@
 import math
 
 import cwrap
+from compact import CompactPath
 
 NORMAL_TRAFO = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
 
@@ -58,6 +59,8 @@ def apply_trafo_to_points(points, trafo):
 
 
 def apply_trafo_to_path(path, trafo):
+    if isinstance(path, CompactPath):
+        return path.transformed(trafo)
     return [apply_trafo_to_point(path[0], trafo),
             [apply_trafo_to_point(point, trafo) for point in path[1]],
             path[2]]
@@ -81,7 +81,7 @@ def generate_preview(presenter, renderer_cls, size=(100, 100),
         rend = renderer_cls(presenter.cms)
         rend.antialias_flag = True
         for item in layers:
-            rend.render(ctx, item.childs)
+            rend.render(ctx, index=mthds.get_layer_index(item))
     # ---rendering
     image_stream = StringIO()
     surface.write_to_png(image_stream)
@@ -27,7 +27,8 @@ from uc2 import uc2const
 from uc2.cms import val_255
 from uc2.libcairo import image_to_surface
 from uc2.utils import fsutils
-from . import magickwand
+from . import imgcache, magickwand
+from .imgcache import IMAGE_CACHE
 
 TIFF_FMT = 'TIFF'
 PNG_FMT = 'PNG'
@@ -36,9 +37,24 @@ LOG = logging.getLogger(__name__)
 
 
 class ImageHandler(object):
+    """
+    Keeps pixmap bitmap and alpha channel.
+
+    Each image is stored as decoded PIL image and/or as encoded
+    (PNG/TIFF) string. Encoded string is kept untouched as it was loaded
+    and image is decoded on first pixel access only. And vice versa,
+    decoded image is encoded on demand by saver only. So document
+    loading and saving does not decode/encode unchanged pixmaps.
+    Decoded images and surfaces are shared with other pixmaps of
+    the same content by process wide image cache (see imgcache).
+    """
     pixmap = None
-    bitmap = None
-    alpha = None
+    _bitmap = None
+    _alpha = None
+    bitmap_str = None
+    alpha_str = None
+    content_hash = None
+    _info = None
 
     cdata = None
     ps_cdata = None
@@ -47,14 +63,68 @@ class ImageHandler(object):
     def __init__(self, pixmap):
         self.pixmap = pixmap
 
+    @property
+    def bitmap(self):
+        if self._bitmap is None and self.bitmap_str:
+            self._bitmap = self._decode(self.bitmap_str,
+                                        self.get_content_hash()[0])
+        return self._bitmap
+
+    @bitmap.setter
+    def bitmap(self, image):
+        self._bitmap = image
+        self.bitmap_str = None
+        self.content_hash = None
+        self._info = None
+
+    @property
+    def alpha(self):
+        if self._alpha is None and self.alpha_str:
+            self._alpha = self._decode(self.alpha_str,
+                                       self.get_content_hash()[1])
+        return self._alpha
+
+    @alpha.setter
+    def alpha(self, image):
+        self._alpha = image
+        self.alpha_str = None
+        self.content_hash = None
+
+    def get_content_hash(self):
+        """
+        Returns (bitmap hash, alpha channel hash) tuple.
+        """
+        if self.content_hash is None:
+            self.content_hash = tuple(
+                imgcache.get_hash(image_str) if image_str
+                else imgcache.get_image_hash(image)
+                for image_str, image in ((self.bitmap_str, self._bitmap),
+                                         (self.alpha_str, self._alpha)))
+        return self.content_hash
+
+    def is_decoded(self):
+        return self._bitmap is not None or not self.bitmap_str
+
+    def _get_info(self):
+        if self._info is None:
+            if self._bitmap is not None:
+                self._info = (self._bitmap.size, self._bitmap.mode)
+            elif self.bitmap_str:
+                # reads image header only
+                image = Image.open(StringIO(self.bitmap_str))
+                self._info = (image.size, image.mode)
+            else:
+                self._info = ((0, 0), None)
+        return self._info
+
     def get_size(self):
-        return self.bitmap.size if self.bitmap else (0, 0)
+        return self._get_info()[0]
 
     def get_mode(self):
-        return self.bitmap.mode if self.bitmap else None
+        return self._get_info()[1]
 
     def has_alpha(self):
-        return self.alpha is not None
+        return self._alpha is not None or bool(self.alpha_str)
 
     def clear_cache(self):
         self.cdata = None
@@ -78,22 +148,50 @@ class ImageHandler(object):
         image.load()
         return image
 
+    def _decode(self, image_str, image_hash):
+        key = ('image', image_hash)
+        image = IMAGE_CACHE.get(key)
+        if image is None:
+            image = self._str2image(image_str)
+            IMAGE_CACHE.put(key, image, imgcache.get_image_size(image))
+        return image
+
+    def get_bitmap_str(self):
+        if self.bitmap_str is None and self._bitmap is not None:
+            self.bitmap_str = self._image2str(self._bitmap)
+        return self.bitmap_str
+
+    def get_alpha_str(self):
+        if self.alpha_str is None and self._alpha is not None:
+            self.alpha_str = self._image2str(self._alpha)
+        return self.alpha_str
+
     def get_bitmap_b64str(self):
-        bitmap_str = self._image2str(self.bitmap)
+        bitmap_str = self.get_bitmap_str()
         return b64encode(bitmap_str) if bitmap_str else None
 
     def get_alpha_b64str(self):
-        alpha_str = self._image2str(self.alpha)
+        alpha_str = self.get_alpha_str()
         return b64encode(alpha_str) if alpha_str else None
 
     def set_images(self, bitmap=None, alpha=None):
-        self.bitmap = bitmap if bitmap else self.bitmap
-        self.alpha = alpha if alpha else self.alpha
+        if bitmap:
+            self.bitmap = bitmap
+        if alpha:
+            self.alpha = alpha
         self.clear_cache()
 
     def set_images_from_str(self, bitmap_str=None, alpha_str=None):
-        self.set_images(self._str2image(bitmap_str),
-                        self._str2image(alpha_str))
+        if bitmap_str:
+            self._bitmap = None
+            self.bitmap_str = bitmap_str
+            self._info = None
+        if alpha_str:
+            self._alpha = None
+            self.alpha_str = alpha_str
+        if bitmap_str or alpha_str:
+            self.content_hash = None
+        self.clear_cache()
 
     def set_images_from_b64str(self, bitmap_str=None, alpha_str=None):
         bitmap_str = b64decode(bitmap_str) if bitmap_str else None
@@ -152,7 +250,14 @@ class ImageHandler(object):
 
     def _load_by_pil(self, cms, fileptr):
         fileptr.seek(0)
-        self.load_from_images(cms, Image.open(fileptr))
+        image = Image.open(fileptr)
+        self.load_from_images(cms, image)
+        if self._bitmap is image and not self.has_alpha() and \
+                image.format == self._get_saver_fmt(image):
+            # image is used as is, so original file content
+            # is saved instead of encoding image again
+            fileptr.seek(0)
+            self.bitmap_str = fileptr.read()
 
     def _load_by_magickwand(self, cms, fileptr):
         fileptr.seek(0)
@@ -176,6 +281,31 @@ class ImageHandler(object):
     def load_from_b64str(self, cms, b64str):
         self.load_from_fileptr(cms, StringIO(b64decode(b64str)))
 
+    def load_pattern(self, cms, b64str, flip=False):
+        """
+        Loads pattern image from base64 string. Loaded patterns are
+        shared by process wide image cache.
+        """
+        key = ('pattern', imgcache.get_hash(b64str), flip,
+               cms.get_state_key())
+        cached = IMAGE_CACHE.get(key)
+        if cached is None:
+            self.load_from_b64str(cms, b64str)
+            if flip:
+                self.set_images(self.bitmap.transpose(Image.FLIP_TOP_BOTTOM),
+                                self.alpha.transpose(Image.FLIP_TOP_BOTTOM)
+                                if self.alpha else None)
+            cached = (self.bitmap, self.alpha, deepcopy(self.pixmap.style),
+                      self.get_content_hash())
+            size = imgcache.get_image_size(self.bitmap) + \
+                imgcache.get_image_size(self.alpha)
+            IMAGE_CACHE.put(key, cached, size)
+        else:
+            bitmap, alpha, style, content_hash = cached
+            self.set_images(bitmap, alpha)
+            self.pixmap.style = deepcopy(style)
+            self.content_hash = content_hash
+
     def extract_bitmap(self, filepath):
         ext = '.tiff' if self.bitmap.mode == uc2const.IMAGE_CMYK else '.png'
         path, file_ext = os.path.splitext(filepath)
@@ -220,7 +350,8 @@ class DrawableImageHandler(ImageHandler):
         bg_img = Image.new(bg_cs, size, bg) if bg else None
 
         fg_alpha = ImageOps.invert(raw_image) if fg else None
-        bg_alpha = raw_image if bg else None
+        # bitmap can be shared by image cache, so it is not modified
+        bg_alpha = raw_image.copy() if bg else None
 
         if self.alpha and any((fg, bg)):
             alpha_chnl = ImageOps.invert(self.alpha)
@@ -290,18 +421,41 @@ class DrawableImageHandler(ImageHandler):
 
         return image_to_surface(rgb_image)
 
+    def _get_cached_surface(self, cms, proofing=False, stroke_mode=False):
+        """
+        Returns surface from process wide image cache, so surface
+        is created once for all pixmaps of the same content and style.
+        """
+        if stroke_mode:
+            key = (imgcache.SURFACE_STROKE, self.get_content_hash())
+        else:
+            mode = imgcache.SURFACE_PROOF if proofing \
+                else imgcache.SURFACE_NORMAL
+            style = self.pixmap.style[3] \
+                if self.get_mode() in uc2const.DUOTONES else None
+            key = (mode, self.get_content_hash(), repr(style),
+                   cms.get_state_key())
+        surface = IMAGE_CACHE.get(key)
+        if surface is None:
+            surface = self._get_surface(cms, proofing, stroke_mode)
+            if surface is not None:
+                IMAGE_CACHE.put(key, surface,
+                                imgcache.get_surface_size(surface))
+        return surface
+
     def get_surface(self, cms, proofing=False, stroke_mode=False):
         if stroke_mode:
             if not self.gray_cdata:
-                self.gray_cdata = self._get_surface(cms, stroke_mode=True)
+                self.gray_cdata = self._get_cached_surface(cms,
+                                                           stroke_mode=True)
             return self.gray_cdata
         elif proofing:
             if not self.ps_cdata:
-                self.ps_cdata = self._get_surface(cms, proofing=True)
+                self.ps_cdata = self._get_cached_surface(cms, proofing=True)
             return self.ps_cdata
         else:
             if not self.cdata:
-                self.cdata = self._get_surface(cms)
+                self.cdata = self._get_cached_surface(cms)
             return self.cdata
 
     def update_cache(self, cms):
@@ -313,8 +467,12 @@ class EditableImageHandler(DrawableImageHandler):
     def copy(self, pixmap=None):
         pixmap = pixmap or self.pixmap
         hdl = EditableImageHandler(pixmap)
-        hdl.set_images(self.bitmap.copy() if self.bitmap else None,
-                       self.alpha.copy() if self.alpha else None)
+        # encoded strings are immutable, so they are shared
+        hdl.set_images(self._bitmap.copy() if self._bitmap else None,
+                       self._alpha.copy() if self._alpha else None)
+        hdl.bitmap_str = self.bitmap_str
+        hdl.alpha_str = self.alpha_str
+        hdl.content_hash = self.content_hash
         return hdl
 
     def remove_alpha(self):
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Process wide cache of decoded images and Cairo surfaces.
+
+Values are keyed by content hash of image data (plus CMS state and
+rendering mode where it matters), so the same image used by many
+objects (repeated logos, patterns) is decoded and color converted once.
+Least recently used values are dropped when total size of cached
+values exceeds cache limit. Cached values are shared, so they must not
+be modified in place.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+CACHE_SIZE = 256 * 1024 * 1024
+
+SURFACE_NORMAL = 'normal'
+SURFACE_PROOF = 'proof'
+SURFACE_STROKE = 'stroke'
+
+
+def get_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def get_image_hash(image):
+    if image is None:
+        return None
+    sha1 = hashlib.sha1('%s %dx%d ' % ((image.mode,) + image.size))
+    sha1.update(image.tobytes())
+    return sha1.hexdigest()
+
+
+def get_image_size(image):
+    if image is None:
+        return 0
+    return image.size[0] * image.size[1] * len(image.getbands())
+
+
+def get_surface_size(surface):
+    if surface is None:
+        return 0
+    return surface.get_stride() * surface.get_height()
+
+
+class ImageCache(object):
+    """
+    Thread safe LRU cache limited by total size of values.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.items.pop(key, None)
+            if item is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.items[key] = item
+            return item[0]
+
+    def put(self, key, value, size):
+        """
+        Caches value. Value larger than whole cache is not cached.
+        """
+        if size > self.max_size:
+            return
+        with self.lock:
+            old = self.items.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self.items[key] = (value, size)
+            self.size += size
+            while self.size > self.max_size:
+                _key, (_value, item_size) = self.items.popitem(last=False)
+                self.size -= item_size
+
+    def clear(self):
+        with self.lock:
+            self.items = OrderedDict()
+            self.size = 0
+
+    def get_cache_info(self):
+        """
+        Returns cache statistics as (hits, misses, items number,
+        current size, maximum size) tuple.
+        """
+        return (self.hits, self.misses, len(self.items),
+                self.size, self.max_size)
+
+
+IMAGE_CACHE = ImageCache()
@@ -16,7 +16,8 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
-from core import get_version
+from core import get_version, get_glyph_cache_info, \
+    get_glyph_cache_hit_rate, configure_glyph_cache
 from fonts import get_fonts, get_sample_size, render_sample, find_font_family, \
     find_font_and_face
 from paths import get_text_paths
@@ -18,8 +18,8 @@
 import _libpango
 import cairo
 import os
-from copy import deepcopy
 
+from glyph_cache import GlyphCache, GLYPH_CACHE_SIZE
 from markup import apply_markup, apply_glyph_markup
 
 PANGO_UNITS = 1024
@@ -39,18 +39,39 @@ def get_version():
 
 # --- Glyph caching
 
-GLYPH_CACHE = {}
+GLYPH_CACHE = GlyphCache()
 
 
-def get_glyph_cache(font_name, char):
-    char = str(char)
-    if font_name in GLYPH_CACHE and char in GLYPH_CACHE[font_name]:
-        return deepcopy(GLYPH_CACHE[font_name][char])
+def get_glyph_cache(key):
+    """
+    Returns cached (paths, vpos) glyph tuple or None.
+    Cached glyph is shared and must not be modified.
+    """
+    return GLYPH_CACHE.get(key)
 
 
-def set_glyph_cache(font_name, char, glyph):
-    GLYPH_CACHE[font_name] = GLYPH_CACHE.get(font_name, {})
-    GLYPH_CACHE[font_name][str(char)] = deepcopy(glyph)
+def set_glyph_cache(key, paths, vpos=0.0):
+    return GLYPH_CACHE.put(key, paths, vpos)
+
+
+def get_glyph_cache_info():
+    return GLYPH_CACHE.get_cache_info()
+
+
+def get_glyph_cache_hit_rate():
+    return GLYPH_CACHE.get_hit_rate()
+
+
+def configure_glyph_cache(max_size=GLYPH_CACHE_SIZE, store_path=None):
+    """
+    Sets glyph cache size and on-disk store directory
+    (None disables the store).
+    """
+    GLYPH_CACHE.set_max_size(max_size)
+    if store_path:
+        GLYPH_CACHE.open_store(store_path)
+    else:
+        GLYPH_CACHE.close_store()
 
 
 # --- Pango context functionality
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Glyph outline cache.
+
+Glyph outlines are stored as (compact paths, vertical shift) tuples
+in LRU cache limited by glyphs number. Cached glyphs are shared, so
+callers must not modify them. Optionally glyphs are saved into
+on-disk store, so batch runs reuse outlines across processes.
+The store is a directory of pickled glyphs named by key hash. Files
+are written by atomic rename, so concurrent batch workers can share
+the same store without locking.
+"""
+
+import cPickle
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from uc2.libgeom.compact import pack_paths
+
+LOG = logging.getLogger(__name__)
+
+GLYPH_CACHE_SIZE = 4096
+# changing of stored glyph format requires new store version
+STORE_VERSION = 1
+
+
+def get_glyph_key(text, width, text_style, markup, check_nt=False):
+    """
+    Returns string key of glyph outline. Key includes font description,
+    layout width and alignment and glyph local markup.
+    """
+    return repr((STORE_VERSION, text_style[0], text_style[1], text_style[2],
+                 text_style[3], width, text, markup, check_nt))
+
+
+class GlyphCache(object):
+
+    def __init__(self, max_size=GLYPH_CACHE_SIZE):
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.store_path = None
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self.lock = threading.Lock()
+
+    def open_store(self, path):
+        """
+        Uses directory as on-disk glyph store.
+        """
+        if self.store_path == path:
+            return
+        try:
+            if not os.path.isdir(path):
+                os.makedirs(path)
+            self.store_path = path
+        except OSError as e:
+            LOG.warning('Cannot open glyph store %s: %s', path, e)
+            self.store_path = None
+
+    def close_store(self):
+        self.store_path = None
+
+    def _get_store_file(self, key):
+        return os.path.join(self.store_path,
+                            hashlib.sha1(key).hexdigest() + '.glyph')
+
+    def _read_store(self, key):
+        filepath = self._get_store_file(key)
+        if not os.path.exists(filepath):
+            return None
+        try:
+            with open(filepath, 'rb') as fileptr:
+                stored_key, glyph = cPickle.load(fileptr)
+            return glyph if stored_key == key else None
+        except Exception as e:
+            LOG.warning('Cannot read glyph store file %s: %s', filepath, e)
+            return None
+
+    def _write_store(self, key, glyph):
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.store_path)
+            with os.fdopen(fd, 'wb') as fileptr:
+                cPickle.dump((key, glyph), fileptr, 2)
+            os.rename(tmp_path, self._get_store_file(key))
+        except Exception as e:
+            LOG.warning('Cannot write glyph store: %s', e)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _put_item(self, key, glyph):
+        self.items[key] = glyph
+        if len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+
+    def get(self, key):
+        with self.lock:
+            glyph = self.items.pop(key, None)
+            if glyph is not None:
+                self.hits += 1
+                self.items[key] = glyph
+                return glyph
+            if self.store_path is not None:
+                glyph = self._read_store(key)
+                if glyph is not None:
+                    self.store_hits += 1
+                    self._put_item(key, glyph)
+                    return glyph
+            self.misses += 1
+            return None
+
+    def put(self, key, paths, vpos=0.0):
+        """
+        Caches glyph paths and returns cached glyph.
+        """
+        glyph = (pack_paths(paths), vpos)
+        with self.lock:
+            self._put_item(key, glyph)
+            if self.store_path is not None:
+                self._write_store(key, glyph)
+        return glyph
+
+    def set_max_size(self, max_size):
+        with self.lock:
+            self.max_size = max_size
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items = OrderedDict()
+
+    def get_cache_info(self):
+        """
+        Returns glyph cache statistics as (hits, store hits, misses,
+        current size, maximum size) tuple.
+        """
+        return (self.hits, self.store_hits, self.misses,
+                len(self.items), self.max_size)
+
+    def get_hit_rate(self):
+        requests = self.hits + self.store_hits + self.misses
+        if not requests:
+            return 0.0
+        return (self.hits + self.store_hits) / float(requests)
@@ -24,7 +24,9 @@ from uc2 import libcairo
 
 import core
 from core import NONPRINTING_CHARS
+from glyph_cache import get_glyph_key
 from langs import check_maynmar, check_arabic
+from markup import intersect_ranges
 
 
 def cluster_text(text, clusters):
@@ -201,6 +203,35 @@ def get_log_layout_data(layout_data, byte_dict, rtl_regs):
     return log_layout_data
 
 
+def get_glyph(ctx, text, width, text_style, markup, text_range):
+    """
+    Returns glyph outline at layout origin as (paths, vpos) tuple.
+    Outlines are taken from glyph cache when possible.
+    """
+    local_markup = intersect_ranges(text_range, markup) if markup else []
+    key = get_glyph_key(text, width, text_style, local_markup, True)
+    glyph = core.get_glyph_cache(key)
+    if glyph is None:
+        ctx.new_path()
+        ctx.move_to(0, 0)
+        layout = core.create_layout(ctx)
+        vpos = core.set_glyph_layout(text, width, text_style, markup,
+                                     text_range, True, layout)
+        core.layout_path(ctx, layout)
+        paths = libcairo.get_path_from_cpath(ctx.copy_path())
+        glyph = core.set_glyph_cache(key, paths, vpos)
+    return glyph
+
+
+def get_glyph_matrix(x, y):
+    m00 = 1.0
+    m11 = -1.0
+    if os.name == 'nt':
+        m00 *= 0.1
+        m11 *= 0.1
+    return cairo.Matrix(m00, 0.0, 0.0, m11, x, y)
+
+
 def get_glyphs(ctx, layout_data, text, width, text_style, markup):
     glyphs = []
     i = -1
@@ -219,29 +250,17 @@ def get_glyphs(ctx, layout_data, text, width, text_style, markup):
                 glyphs.append(None)
                 continue
 
-        ctx.new_path()
-        ctx.move_to(0, 0)
-        layout = core.create_layout(ctx)
         text_range = [i, i + len(item)]
-        vpos = core.set_glyph_layout(item, width, text_style, markup,
-                                     text_range, True, layout)
+        paths, vpos = get_glyph(ctx, item, width, text_style, markup,
+                                text_range)
         if vpos:
             for index in range(*text_range):
                 x, y, w, h, base_line, byte_index = layout_data[index]
                 dh = (y - base_line) * vpos
                 layout_data[index] = (x, y + dh, w, h,
                                       base_line + dh, byte_index)
-        core.layout_path(ctx, layout)
-        cpath = ctx.copy_path()
-        m00 = 1.0
-        m11 = -1.0
-        if os.name == 'nt':
-            m00 *= 0.1
-            m11 *= 0.1
-        matrix = cairo.Matrix(m00, 0.0, 0.0, m11,
-                              layout_data[i][0], layout_data[i][1])
-        libcairo.apply_cmatrix(cpath, matrix)
-        glyphs.append(cpath)
+        matrix = get_glyph_matrix(layout_data[i][0], layout_data[i][1])
+        glyphs.append(libcairo.create_cpath(paths, matrix))
     return glyphs
 
 
@@ -264,27 +283,16 @@ def get_rtl_glyphs(ctx, layout_data, log_layout_data, byte_dict, rtl_regs,
             glyphs.append(None)
             continue
 
-        ctx.new_path()
-        ctx.move_to(0, 0)
-        layout = core.create_layout(ctx)
-        vpos = core.set_glyph_layout(txt, width, text_style,
-                                     markup, text_range, True, layout)
+        paths, vpos = get_glyph(ctx, txt, width, text_style, markup,
+                                text_range)
         if vpos:
             for index in range(*text_range):
                 x, y, w, h, base_line, byte_index = log_layout_data[index]
                 dh = (y - base_line) * vpos
                 log_layout_data[index] = (x, y + dh, w, h,
                                           base_line + dh, byte_index)
-        core.layout_path(ctx, layout)
-        cpath = ctx.copy_path()
-        m00 = 1.0
-        m11 = -1.0
-        if os.name == 'nt':
-            m00 *= 0.1
-            m11 *= 0.1
-        matrix = cairo.Matrix(m00, 0.0, 0.0, m11, item[0], item[1])
-        libcairo.apply_cmatrix(cpath, matrix)
-        glyphs.append(cpath)
+        matrix = get_glyph_matrix(item[0], item[1])
+        glyphs.append(libcairo.create_cpath(paths, matrix))
     return glyphs
 
 
@@ -52,6 +52,7 @@ NODE_SMOOTH_BOTH = 3  # 0011
 NODE_SYMMETRICAL = 4  # 0100
 NODE_NOT_SMOOTH_OPP = 5  # 0101
 NODE_SYMM_SMOOTH = 6  # 0110
+NODE_LINE = -1  # line point marker in libgeom.CompactPath
 
 ARC_ARC = 0
 ARC_CHORD = 1
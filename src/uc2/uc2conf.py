@@ -59,13 +59,22 @@ class UCData:
         if not fsutils.exists(self.app_color_profile_dir):
             fsutils.makedirs(self.app_color_profile_dir)
 
-        from uc2.cms import libcms
-
+    def check_color_profiles(self):
+        """
+        Saves missing built-in color profiles. Called by color manager
+        on profiles loading, so lcms is not imported on launch.
+        """
+        if not self.app_color_profile_dir:
+            return
+        missing = []
         for item in uc2const.COLORSPACES + [uc2const.COLOR_DISPLAY, ]:
             filename = 'built-in_%s.icm' % item
             path = os.path.join(self.app_color_profile_dir, filename)
             if not fsutils.exists(path):
-                path = fsutils.upath(path)
+                missing.append((fsutils.upath(path), item))
+        if missing:
+            from uc2.cms import libcms
+            for path, item in missing:
                 libcms.cms_save_default_profile(path, item)
 
 
@@ -102,6 +111,10 @@ class UCConfig(SerializedConfig):
     cms_bpc_flag = False
     cms_bpt_flag = False
 
+    # ============== TEXT SECTION ===================
+    glyph_cache_size = 4096  # glyph outlines kept in memory
+    glyph_cache_store = False  # keep glyph outlines on disk between runs
+
     def __init__(self): pass
 
     def get_defaults(self):
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Memory mapped reader for binary loaders.
+
+File content is mapped into memory and read through in-memory stream
+over the mapping, so reading of records does not involve system calls
+and file buffering, and values are unpacked by precompiled structs.
+Streams which cannot be mapped (empty files, in-memory streams) are
+read into string. Reader keeps file object interface (read, seek, tell,
+readline, close), so existing parsers work without changes.
+"""
+
+import io
+import mmap
+import os
+import struct
+
+try:
+    # cStringIO reads from mapping without copying
+    from cStringIO import StringIO
+except ImportError:
+    from io import BytesIO as StringIO
+
+BYTE = struct.Struct('<B')
+WORD = struct.Struct('<H')
+DWORD = struct.Struct('<I')
+PAIR_DWORD = struct.Struct('<2L')
+WORD_BE = struct.Struct('>H')
+DWORD_BE = struct.Struct('>I')
+
+
+def _map_file(fileptr):
+    try:
+        fileno = fileptr.fileno()
+        if not os.fstat(fileno).st_size:
+            return None
+        return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (AttributeError, ValueError, EnvironmentError,
+            io.UnsupportedOperation):
+        return None
+
+
+def _read_file(fileptr):
+    try:
+        pos = fileptr.tell()
+        fileptr.seek(0)
+    except (AttributeError, EnvironmentError, io.UnsupportedOperation):
+        return fileptr.read(), 0
+    return fileptr.read(), pos
+
+
+class BinaryReader(object):
+    """
+    Read only file object over memory mapped file content.
+
+    Reading starts from current position of fileptr. Closing of reader
+    closes fileptr too.
+    """
+
+    def __init__(self, fileptr):
+        self.fileptr = fileptr
+        self.mmap = _map_file(fileptr)
+        if self.mmap is None:
+            self.buf, pos = _read_file(fileptr)
+        else:
+            self.buf, pos = self.mmap, fileptr.tell()
+        self.size = len(self.buf)
+        self.stream = StringIO(self.buf)
+        self.stream.seek(pos)
+        # file interface is bound to stream methods directly
+        self.read = self.stream.read
+        self.readline = self.stream.readline
+        self.seek = self.stream.seek
+        self.tell = self.stream.tell
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        self.stream.close()
+        self.buf = b''
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+        self.fileptr.close()
+
+    def unpack_at(self, fmt, offset):
+        """
+        Unpacks precompiled struct at offset without moving position.
+        """
+        return fmt.unpack_from(self.buf, offset)
+
+    def unpack(self, fmt):
+        """
+        Unpacks precompiled struct at current position and moves
+        position to the end of struct.
+        """
+        return fmt.unpack(self.read(fmt.size))
+
+    def read_byte(self):
+        return BYTE.unpack(self.read(1))[0]
+
+    def read_word(self, be=False):
+        return (WORD_BE if be else WORD).unpack(self.read(2))[0]
+
+    def read_dword(self, be=False):
+        return (DWORD_BE if be else DWORD).unpack(self.read(4))[0]
+
+    def read_pair_dword(self):
+        return PAIR_DWORD.unpack(self.read(8))
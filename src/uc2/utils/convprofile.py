@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Conversion profiler behind --profile option.
+
+Profile records wall time, CPU time and peak RSS of conversion stages
+(detection, parsing, model update, translation, saving). Nested stages
+are named by path like 'load/parse'. Translator methods and subsystems
+(text shaping, CMS, images) are timed by cProfile which runs only while
+profile is active. Report is JSON serializable dict, reports of batch
+translation are summed by aggregate().
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+OPTION = '--profile'
+REPORT_EXTENSION = '.profile.json'
+BATCH_REPORT_NAME = 'uniconvertor-profile.json'
+
+# modules which functions are reported as translator methods
+TRANSLATOR_SUFFIXES = ('_translators.py', '_to_sk2.py', '_from_sk2.py',
+                       'pdfgen.py', 'crenderer.py')
+# self time of functions from these packages is summed per subsystem
+SUBSYSTEMS = (('text', os.sep + 'libpango' + os.sep),
+              ('cms', os.sep + 'cms' + os.sep),
+              ('images', os.sep + 'libimg' + os.sep),
+              ('geometry', os.sep + 'libgeom' + os.sep))
+TOP_METHODS = 50
+
+CURRENT = [None]
+
+
+def get_peak_rss():
+    """
+    Returns peak resident set size of process in Kb.
+    """
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def get_cpu_time():
+    times = os.times()
+    return times[0] + times[1]
+
+
+def count_objects(model, counts=None):
+    """
+    Counts model objects by class name and cid.
+    """
+    counts = {} if counts is None else counts
+    stack = [model]
+    while stack:
+        obj = stack.pop()
+        if obj is None:
+            continue
+        key = '%s(%s)' % (obj.__class__.__name__, getattr(obj, 'cid', ''))
+        counts[key] = counts.get(key, 0) + 1
+        stack.extend(getattr(obj, 'childs', None) or [])
+    return counts
+
+
+class ConversionProfile(object):
+
+    def __init__(self, name=''):
+        self.name = name
+        self.stages = []
+        self.path = []
+        self.objects = {}
+        self.profiler = cProfile.Profile()
+        self.start_time = self.start_cpu = 0.0
+        self.elapsed = self.cpu = 0.0
+
+    def start(self):
+        self.start_time = time.time()
+        self.start_cpu = get_cpu_time()
+        CURRENT[0] = self
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        if CURRENT[0] is self:
+            CURRENT[0] = None
+        self.elapsed = time.time() - self.start_time
+        self.cpu = get_cpu_time() - self.start_cpu
+
+    @contextmanager
+    def stage(self, name):
+        self.path.append(name)
+        record = {'stage': '/'.join(self.path), 'rss_before': get_peak_rss()}
+        self.stages.append(record)
+        start, start_cpu = time.time(), get_cpu_time()
+        try:
+            yield
+        finally:
+            record['wall'] = time.time() - start
+            record['cpu'] = get_cpu_time() - start_cpu
+            record['peak_rss'] = get_peak_rss()
+            self.path.pop()
+
+    def add_objects(self, model):
+        count_objects(model, self.objects)
+
+    def get_function_stats(self):
+        """
+        Returns translator method records and subsystem self times.
+        """
+        methods = []
+        subsystems = dict((name, 0.0) for name, _path in SUBSYSTEMS)
+        stats = pstats.Stats(self.profiler).stats
+        for (filename, line, func), item in stats.items():
+            calls, total, cumulative = item[1], item[2], item[3]
+            if filename.endswith(TRANSLATOR_SUFFIXES):
+                methods.append({'method': '%s:%d(%s)' % (
+                    os.path.basename(filename), line, func),
+                    'calls': calls, 'self': total,
+                    'cumulative': cumulative})
+            for name, path in SUBSYSTEMS:
+                if path in filename:
+                    subsystems[name] += total
+                    break
+        methods.sort(key=lambda rec: rec['cumulative'], reverse=True)
+        return methods[:TOP_METHODS], subsystems
+
+    def get_report(self):
+        methods, subsystems = self.get_function_stats()
+        return {
+            'file': self.name,
+            'wall': self.elapsed,
+            'cpu': self.cpu,
+            'peak_rss': get_peak_rss(),
+            'stages': self.stages,
+            'methods': methods,
+            'subsystems': subsystems,
+            'objects': self.objects,
+        }
+
+
+def get_profile():
+    return CURRENT[0]
+
+
+@contextmanager
+def stage(name):
+    """
+    Records stage of active profile, does nothing without profile.
+    """
+    profile = CURRENT[0]
+    if profile is None:
+        yield
+    else:
+        with profile.stage(name):
+            yield
+
+
+def add_objects(model):
+    if CURRENT[0] is not None:
+        CURRENT[0].add_objects(model)
+
+
+def aggregate(reports):
+    """
+    Sums reports of batch translation. Stages, methods and subsystems
+    are summed by name, peak RSS is maximal one.
+    """
+    stages = OrderedDict()
+    methods = {}
+    subsystems = {}
+    objects = {}
+    for report in reports:
+        for item in report['stages']:
+            rec = stages.setdefault(item['stage'], {
+                'stage': item['stage'], 'wall': 0.0, 'cpu': 0.0,
+                'peak_rss': 0, 'count': 0})
+            rec['wall'] += item['wall']
+            rec['cpu'] += item['cpu']
+            rec['peak_rss'] = max(rec['peak_rss'], item['peak_rss'])
+            rec['count'] += 1
+        for item in report['methods']:
+            rec = methods.setdefault(item['method'], {
+                'method': item['method'], 'calls': 0, 'self': 0.0,
+                'cumulative': 0.0})
+            for key in ('calls', 'self', 'cumulative'):
+                rec[key] += item[key]
+        for name, value in report['subsystems'].items():
+            subsystems[name] = subsystems.get(name, 0.0) + value
+        for name, value in report['objects'].items():
+            objects[name] = objects.get(name, 0) + value
+    return {
+        'files': len(reports),
+        'wall': sum(report['wall'] for report in reports),
+        'cpu': sum(report['cpu'] for report in reports),
+        'peak_rss': max([report['peak_rss'] for report in reports] or [0]),
+        'stages': list(stages.values()),
+        'methods': sorted(methods.values(), key=lambda rec: rec['cumulative'],
+                          reverse=True)[:TOP_METHODS],
+        'subsystems': subsystems,
+        'objects': objects,
+        'reports': reports,
+    }
+
+
+def save_report(report, path):
+    with open(path, 'w') as fileptr:
+        json.dump(report, fileptr, indent=2, sort_keys=True)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Import time profiler behind --import-profile option.
+
+The profiler wraps builtin __import__ and records every import statement
+which brings new modules into sys.modules. Report lists self and
+cumulative import time per module (like python -X importtime does)
+and marks heavy native dependencies so startup regressions are visible.
+With --import-profile=FILE the report is saved as JSON.
+"""
+
+import atexit
+import json
+import sys
+import time
+
+try:
+    import __builtin__ as builtins
+except ImportError:
+    import builtins
+
+from uc2.utils.mixutils import echo
+
+OPTION = '--import-profile'
+
+HEAVY_MODULES = ('cairo', 'PIL', '_libcairo', '_libpango', '_libimg',
+                 '_cms', '_libtrace', 'reportlab')
+
+RECORDS = []
+STACK = []
+START = [0.0]
+ORIGINAL_IMPORT = [None]
+
+
+def get_option(argv=None):
+    """Returns None if profiling is not requested, True for report
+    on stdout or report file path.
+    """
+    for item in (argv or sys.argv)[1:]:
+        if item == OPTION:
+            return True
+        if item.startswith(OPTION + '='):
+            return item.split('=', 1)[1] or True
+    return None
+
+
+def _profiled_import(name, *args, **kwargs):
+    modules_num = len(sys.modules)
+    STACK.append(0.0)
+    start = time.time()
+    try:
+        return ORIGINAL_IMPORT[0](name, *args, **kwargs)
+    finally:
+        total = time.time() - start
+        children = STACK.pop()
+        if STACK:
+            STACK[-1] += total
+        if len(sys.modules) > modules_num:
+            RECORDS.append((name, total - children, total, len(STACK)))
+
+
+def install(output=True):
+    """Replaces builtin __import__ and registers report at exit."""
+    if ORIGINAL_IMPORT[0] is not None:
+        return
+    ORIGINAL_IMPORT[0] = builtins.__import__
+    START[0] = time.time()
+    builtins.__import__ = _profiled_import
+    if output:
+        atexit.register(report, output)
+
+
+def uninstall():
+    if ORIGINAL_IMPORT[0] is not None:
+        builtins.__import__ = ORIGINAL_IMPORT[0]
+        ORIGINAL_IMPORT[0] = None
+
+
+def get_report():
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+    return {
+        'elapsed': time.time() - START[0],
+        'imports_time': sum(item[1] for item in RECORDS),
+        'modules': len(sys.modules),
+        'heavy_modules': heavy,
+        'records': [{'module': name, 'self': self_time,
+                     'cumulative': total, 'depth': depth}
+                    for name, self_time, total, depth in RECORDS],
+    }
+
+
+def report(output=True):
+    uninstall()
+    data = get_report()
+    if output is not True:
+        with open(output, 'w') as fileptr:
+            json.dump(data, fileptr, indent=2)
+        return
+    echo('\nimport time: self [us] | cumulative | imported module')
+    for item in data['records']:
+        echo('import time: %9d | %10d | %s%s' % (
+            item['self'] * 1e6, item['cumulative'] * 1e6,
+            '  ' * item['depth'], item['module']))
+    echo('Imports time: %.3f s, elapsed since profiling start: %.3f s' %
+         (data['imports_time'], data['elapsed']))
+    echo('Loaded modules: %d' % data['modules'])
+    echo('Heavy native modules: %s' % (', '.join(data['heavy_modules'])
+                                       or 'none'))
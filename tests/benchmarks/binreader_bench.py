@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compares WMF loading by memory mapped BinaryReader with loading by
+plain file reads and per call struct.unpack (as it was before).
+Both loaders must produce identical records.
+
+Usage: python binreader_bench.py [RECORDS_NUMBER]
+"""
+
+import os
+import struct
+import sys
+import tempfile
+import time
+
+from uc2 import utils
+from uc2.formats.generic_filters import AbstractLoader
+from uc2.formats.wmf.wmf_config import WMF_Config
+from uc2.formats.wmf.wmf_const import META_EOF, META_LINETO
+from uc2.formats.wmf.wmf_filters import WMF_Loader
+
+RECORDS_NUMBER = 500000
+
+
+class BenchPresenter(object):
+    model = None
+
+    def __init__(self):
+        self.config = WMF_Config()
+
+
+class FileWMF_Loader(WMF_Loader):
+    """
+    WMF loader reading values from file object directly.
+    """
+
+    def init_load(self):
+        AbstractLoader.init_load(self)
+
+    def readword(self):
+        return utils.word2py_int(self.fileptr.read(2))
+
+    def readdword(self):
+        return utils.dword2py_int(self.fileptr.read(4))
+
+
+def write_wmf(path, number):
+    fileptr = open(path, 'wb')
+    # standard header: type, header size, version, file size,
+    # objects number, max record size, unused
+    size = 9 + number * 5 + 3
+    fileptr.write(struct.pack('<HHHIHIH', 1, 9, 0x300, size, 0, 5, 0))
+    for i in range(number):
+        fileptr.write(struct.pack('<IHhh', 5, META_LINETO,
+                                  i % 1000, i % 777))
+    fileptr.write(struct.pack('<IH', 3, META_EOF))
+    fileptr.close()
+
+
+def measure(loader, path):
+    presenter = BenchPresenter()
+    start = time.time()
+    model = loader.load(presenter, path)
+    return time.time() - start, [rec.chunk for rec in model.childs]
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else RECORDS_NUMBER
+    fd, path = tempfile.mkstemp(suffix='.wmf')
+    os.close(fd)
+    try:
+        write_wmf(path, number)
+        file_time, file_records = measure(FileWMF_Loader(), path)
+        mmap_time, mmap_records = measure(WMF_Loader(), path)
+    finally:
+        os.remove(path)
+
+    print('%d WMF records' % number)
+    print('file reads: loading %.2fs' % file_time)
+    print('memory mapped reader: loading %.2fs' % mmap_time)
+    if file_records != mmap_records:
+        print('Loaded records are not identical!')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
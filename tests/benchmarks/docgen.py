@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Synthetic SK2 document generator for benchmarks.
+
+Documents are built through SK2_Methods of new SK2 presenter and
+contain configurable number of curves, texts, gradient filled shapes,
+pixmaps, image pattern filled shapes and groups/containers on every
+page. Generation is seeded, so the same parameters always produce
+the same document.
+"""
+
+import base64
+import random
+from cStringIO import StringIO
+
+from PIL import Image
+
+from uc2 import sk2const, uc2const
+from uc2.formats.sk2 import sk2_model
+
+DEFAULT_COUNTS = {'paths': 1000, 'texts': 100, 'gradients': 100,
+                  'pixmaps': 10, 'patterns': 0, 'groups': 50}
+KINDS = ('paths', 'texts', 'gradients', 'pixmaps', 'patterns', 'groups')
+PIXMAP_SIZE = 256
+PATTERN_SIZE = 32
+TEXT = u'The quick brown fox jumps over the lazy dog. ' \
+       u'Съешь же ещё этих мягких французских булок.'
+
+BLACK = [uc2const.COLOR_CMYK, [0.0, 0.0, 0.0, 1.0], 1.0, u'Black']
+
+
+def get_color(rnd):
+    return [uc2const.COLOR_RGB, [rnd.random(), rnd.random(), rnd.random()],
+            1.0, '']
+
+
+def get_style(rnd, fill=None, stroke=True):
+    fill = fill or [sk2const.FILL_EVENODD, sk2const.FILL_SOLID,
+                    get_color(rnd)]
+    stroke = [sk2const.STROKE_MIDDLE, 0.5 + rnd.random(), BLACK, [], 0, 0,
+              10.433, 0, 0, []] if stroke else []
+    return [fill, stroke, [u'Sans', u'Regular', 12.0, 0, [], True],
+            [[], [], [], []]]
+
+
+def get_gradient_fill(rnd, bbox):
+    x0, y0, x1, y1 = bbox
+    stops = [[0.0, get_color(rnd)], [0.5, get_color(rnd)],
+             [1.0, get_color(rnd)]]
+    if rnd.random() < 0.5:
+        return [sk2const.FILL_EVENODD, sk2const.FILL_GRADIENT,
+                [sk2const.GRADIENT_LINEAR, [[x0, y0], [x1, y1]], stops]]
+    cx, cy = (x0 + x1) / 2.0, (y0 + y1) / 2.0
+    return [sk2const.FILL_EVENODD, sk2const.FILL_GRADIENT,
+            [sk2const.GRADIENT_RADIAL, [[cx, cy], [x1, cy]], stops]]
+
+
+def get_paths(rnd, x, y, size, nodes=12):
+    def point():
+        return [x + rnd.random() * size, y + rnd.random() * size]
+
+    points = []
+    for _i in range(rnd.randint(2, nodes)):
+        if rnd.random() < 0.3:
+            points.append(point())
+        else:
+            points.append([point(), point(), point(), sk2const.NODE_CUSP])
+    return [[point(), points, sk2const.CURVE_CLOSED]]
+
+
+def get_png(size, seed):
+    """
+    Returns photo like RGB image (gradients with noise) as PNG string.
+    """
+    bands = [Image.linear_gradient('L').resize(size).rotate(seed * 30),
+             Image.effect_noise(size, 16 + seed % 32),
+             Image.radial_gradient('L').resize(size)]
+    fileptr = StringIO()
+    Image.merge('RGB', bands).save(fileptr, format='PNG')
+    return fileptr.getvalue()
+
+
+class DocumentGenerator(object):
+
+    def __init__(self, doc, seed=1):
+        self.doc = doc
+        self.config = doc.config
+        self.rnd = random.Random(seed)
+        self.images = []
+        self.patterns = []
+
+    def get_position(self, page, size):
+        w, h = self.doc.methods.get_page_size(page)
+        rnd = self.rnd
+        return (rnd.random() * (w - size) - w / 2.0,
+                rnd.random() * (h - size) - h / 2.0)
+
+    def get_trafo(self, x=0.0, y=0.0):
+        return [1.0, 0.0, 0.0, 1.0, x, y]
+
+    def make_curve(self, page, size=50.0):
+        x, y = self.get_position(page, size)
+        return sk2_model.Curve(self.config, None,
+                               get_paths(self.rnd, x, y, size),
+                               self.get_trafo(), get_style(self.rnd))
+
+    def make_text(self, page):
+        x, y = self.get_position(page, 100.0)
+        start = self.rnd.randint(0, len(TEXT) // 2)
+        text = TEXT[start:start + self.rnd.randint(10, len(TEXT) // 2)]
+        style = get_style(self.rnd, stroke=False)
+        return sk2_model.Text(self.config, None, [x, y], text.encode('utf-8'),
+                              style=style)
+
+    def make_gradient(self, page, size=100.0):
+        x, y = self.get_position(page, size)
+        fill = get_gradient_fill(self.rnd, [x, y, x + size, y + size])
+        style = get_style(self.rnd, fill, stroke=False)
+        if self.rnd.random() < 0.5:
+            return sk2_model.Rectangle(self.config, None,
+                                       [x, y, size, size],
+                                       self.get_trafo(), style)
+        return sk2_model.Curve(self.config, None,
+                               get_paths(self.rnd, x, y, size),
+                               self.get_trafo(), style)
+
+    def make_pixmap(self, page, size=PIXMAP_SIZE):
+        if len(self.images) < 4:
+            self.images.append(get_png((size, size), len(self.images)))
+        x, y = self.get_position(page, size)
+        bitmap = self.images[self.rnd.randint(0, len(self.images) - 1)]
+        return sk2_model.Pixmap(self.config, None, bitmap,
+                                trafo=self.get_trafo(x, y))
+
+    def make_pattern(self, page, size=200.0):
+        if not self.patterns:
+            png = get_png((PATTERN_SIZE, PATTERN_SIZE), 0)
+            self.patterns.append(base64.b64encode(png))
+        x, y = self.get_position(page, size)
+        pattern = [sk2const.PATTERN_TRUECOLOR, self.patterns[0], [],
+                   [] + sk2const.NORMAL_TRAFO,
+                   [] + sk2const.PATTERN_TRANSFORMS]
+        fill = [sk2const.FILL_EVENODD, sk2const.FILL_PATTERN, pattern]
+        return sk2_model.Rectangle(self.config, None, [x, y, size, size],
+                                   self.get_trafo(),
+                                   get_style(self.rnd, fill, stroke=False))
+
+    def make_group(self, page, size=150.0):
+        childs = [self.make_curve(page, 30.0)
+                  for _i in range(self.rnd.randint(2, 6))]
+        if self.rnd.random() < 0.5:
+            group = sk2_model.Group(self.config, None, childs)
+        else:
+            # container: first child is clipping path
+            x, y = self.get_position(page, size)
+            clip = sk2_model.Rectangle(self.config, None, [x, y, size, size],
+                                       self.get_trafo(),
+                                       get_style(self.rnd))
+            group = sk2_model.Container(self.config, None, [clip] + childs)
+        for child in group.childs:
+            child.parent = group
+        return group
+
+    def fill_page(self, page, counts):
+        makers = {'paths': self.make_curve, 'texts': self.make_text,
+                  'gradients': self.make_gradient,
+                  'pixmaps': self.make_pixmap, 'patterns': self.make_pattern,
+                  'groups': self.make_group}
+        objs = []
+        for kind in KINDS:
+            objs += [makers[kind](page) for _i in range(counts.get(kind, 0))]
+        self.rnd.shuffle(objs)
+        methods = self.doc.methods
+        methods.append_objects(objs, methods.get_layer(page))
+
+
+def generate_document(doc, counts=None, pages=1, seed=1):
+    """
+    Fills new SK2 presenter by synthetic content. Counts is a dict
+    of objects number per kind (see KINDS) on every page.
+    """
+    counts = counts or DEFAULT_COUNTS
+    generator = DocumentGenerator(doc, seed)
+    methods = doc.methods
+    while len(methods.get_pages()) < pages:
+        methods.add_layer(methods.add_page())
+    for page in methods.get_pages():
+        generator.fill_page(page, counts)
+    doc.update()
+    return doc
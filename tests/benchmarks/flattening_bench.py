@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compares Bezier path flattening by pure Python implementation
+and by native _libgeom extension.
+
+Usage: python flattening_bench.py [PATHS_NUMBER]
+"""
+
+import gc
+import random
+import sys
+import time
+
+from uc2.libgeom import flattering
+
+PATHS_NUMBER = 2000
+TOLERANCES = (0.5, 0.1, 0.01)
+REQUIRED_SPEEDUP = 10.0
+
+
+def generate_paths(number):
+    rnd = random.Random(1)
+
+    def point():
+        return [rnd.random() * 500.0, rnd.random() * 500.0]
+
+    paths = []
+    for _i in range(number):
+        points = []
+        for _j in range(rnd.randint(1, 12)):
+            if rnd.random() < 0.2:
+                points.append(point())
+            else:
+                points.append([point(), point(), point(), 0])
+        paths.append([point(), points, rnd.randint(0, 1)])
+    return paths
+
+
+def measure(func, paths, tlr):
+    gc.disable()
+    start = time.time()
+    result = [func(path, tlr) for path in paths]
+    elapsed = time.time() - start
+    gc.enable()
+    return elapsed, result
+
+
+def main():
+    if flattering._libgeom is None:
+        print('_libgeom extension is not built!')
+        return 1
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else PATHS_NUMBER
+    paths = generate_paths(number)
+
+    ret = 0
+    for tlr in TOLERANCES:
+        py_time, py_paths = measure(flattering.py_flat_path, paths, tlr)
+        c_time, c_paths = measure(flattering.flat_path, paths, tlr)
+        if py_paths != c_paths:
+            print('Flattened paths are different!')
+            return 1
+        points = sum(len(path[1]) for path in c_paths)
+        speedup = py_time / c_time
+        print('%d paths, tolerance %s, %d points: python %.3fs, '
+              'native %.3fs, speedup %.1fx'
+              % (number, tlr, points, py_time, c_time, speedup))
+        if speedup < REQUIRED_SPEEDUP:
+            ret = 1
+    return ret
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Cross-format conversion benchmark.
+
+Synthetic SK2 document (see docgen.py) is saved into every model and
+bitmap saver format and saved files are loaded back where loader for
+the format exists. Every format runs in fresh worker process, so wall
+time, CPU time and peak RSS growth of stages (sk2 loading, saving,
+loading) are not affected by other formats.
+
+Results are appended as JSON line into history file and compared with
+the latest previous run of the same document and Python version. Stage
+which is slower than previous one by more than threshold, stage which
+is missing now and new translation error are reported as regressions
+and script exits with status 1.
+
+Usage: python formats_bench.py [--paths=N] [--texts=N] [--gradients=N]
+       [--pixmaps=N] [--groups=N] [--pages=N] [--formats=svg,pdf,...]
+       [--history=FILE] [--threshold=0.2]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import uc2
+from uc2 import uc2const
+from uc2.formats import get_loader_by_id, get_saver_by_id
+from uc2.formats.sk2.sk2_presenter import SK2_Presenter
+from uc2.utils.convprofile import count_objects, get_cpu_time, get_peak_rss
+
+from docgen import DEFAULT_COUNTS, KINDS, generate_document
+
+FORMATS = uc2const.MODEL_SAVERS + uc2const.BITMAP_SAVERS
+HISTORY_FILE = 'formats_bench_history.jsonl'
+THRESHOLD = 0.2
+# stages faster than this (in seconds) are not checked for regressions
+MIN_TIME = 0.05
+
+WORKER_APP = None
+
+
+def _init_worker():
+    global WORKER_APP
+    WORKER_APP = uc2.uc2_init()
+    WORKER_APP.init_mngrs()
+
+
+class Stage(object):
+
+    def __init__(self, stages, name):
+        self.stages = stages
+        self.name = name
+
+    def __enter__(self):
+        self.rss = get_peak_rss()
+        self.cpu = get_cpu_time()
+        self.start = time.time()
+
+    def __exit__(self, *args):
+        self.stages[self.name] = {
+            'wall': time.time() - self.start,
+            'cpu': get_cpu_time() - self.cpu,
+            'rss': get_peak_rss() - self.rss,
+        }
+
+
+def run_format(task):
+    """
+    Saves SK2 document into format and loads it back.
+    """
+    sk2_path, fid, out_dir = task
+    appdata = WORKER_APP.appdata
+    out_path = os.path.join(out_dir, 'bench.%s' %
+                            uc2const.FORMAT_EXTENSION[fid][0])
+    result = {'format': uc2const.FORMAT_NAMES[fid], 'stages': {}}
+    stages = result['stages']
+    try:
+        with Stage(stages, 'sk2_load'):
+            doc = get_loader_by_id(uc2const.SK2)(appdata, sk2_path)
+        with Stage(stages, 'save'):
+            get_saver_by_id(fid)(doc, out_path)
+        doc.close()
+        result['file_size'] = os.path.getsize(out_path)
+        loader = get_loader_by_id(fid) \
+            if fid in uc2const.LOADER_FORMATS else None
+        if loader is not None:
+            with Stage(stages, 'load'):
+                doc = loader(appdata, out_path)
+            result['objects'] = sum(count_objects(doc.model).values())
+            doc.close()
+    except Exception as e:
+        result['error'] = '%s: %s' % (e.__class__.__name__, e)
+    return result
+
+
+def get_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.STDOUT).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def read_history(path):
+    records = []
+    if os.path.exists(path):
+        with open(path) as fileptr:
+            for line in fileptr:
+                if line.strip():
+                    records.append(json.loads(line))
+    return records
+
+
+def find_regressions(record, history, threshold):
+    """
+    Returns (format, stage, previous time, current time) tuples
+    for stages slower than in the latest comparable record. Stage
+    which is missing now has None current time, new translation
+    error is reported with None stage.
+    """
+    previous = None
+    for item in reversed(history):
+        if item['document'] == record['document'] and \
+                item['python'] == record['python']:
+            previous = item
+            break
+    prev_results = previous['results'] if previous is not None else {}
+    ret = []
+    for name, result in sorted(record['results'].items()):
+        prev_result = prev_results.get(name) or {}
+        if result.get('error') and not prev_result.get('error'):
+            ret.append((name, None, None, None))
+        prev_stages = prev_result.get('stages', {})
+        for stage in sorted(prev_stages):
+            prev_data = prev_stages[stage]
+            data = result['stages'].get(stage)
+            if data is None:
+                ret.append((name, stage, prev_data['wall'], None))
+            elif data['wall'] < MIN_TIME:
+                continue
+            elif data['wall'] > prev_data['wall'] * (1.0 + threshold):
+                ret.append((name, stage, prev_data['wall'], data['wall']))
+    return ret
+
+
+def get_formats(value):
+    if not value:
+        return FORMATS
+    ret = []
+    for ext in value.lower().split(','):
+        for fid in FORMATS:
+            if ext == uc2const.FORMAT_EXTENSION[fid][0]:
+                ret.append(fid)
+                break
+        else:
+            raise ValueError('Unsupported format "%s"' % ext)
+    return ret
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Cross-format conversion benchmark')
+    for kind in KINDS:
+        parser.add_argument('--' + kind, type=int,
+                            default=DEFAULT_COUNTS[kind],
+                            help='%s per page' % kind)
+    parser.add_argument('--pages', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--formats', default='',
+                        help='comma separated extensions, all by default')
+    parser.add_argument('--history', default=HISTORY_FILE)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    formats = get_formats(args.formats)
+    counts = dict((kind, getattr(args, kind)) for kind in KINDS)
+    document = dict(counts, pages=args.pages, seed=args.seed)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app = uc2.uc2_init()
+        doc = SK2_Presenter(app.appdata)
+        start = time.time()
+        generate_document(doc, counts, args.pages, args.seed)
+        generation_time = time.time() - start
+        sk2_path = os.path.join(tmp_dir, 'bench.sk2')
+        doc.save(sk2_path)
+        doc.close()
+
+        results = {}
+        for fid in formats:
+            out_dir = os.path.join(tmp_dir, fid)
+            os.mkdir(out_dir)
+            pool = multiprocessing.Pool(1, _init_worker)
+            try:
+                result = pool.apply(run_format, ((sk2_path, fid, out_dir),))
+            finally:
+                pool.close()
+                pool.join()
+            results[result['format']] = result
+            shutil.rmtree(out_dir)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': get_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'document': document,
+        'generation': generation_time,
+        'results': results,
+    }
+    history = read_history(args.history)
+    regressions = find_regressions(record, history, args.threshold)
+    with open(args.history, 'a') as fileptr:
+        fileptr.write(json.dumps(record, sort_keys=True) + '\n')
+
+    print('Document: %s, generated in %.2fs' % (
+        ', '.join('%s=%s' % item for item in sorted(document.items())),
+        generation_time))
+    print('%-28s %10s %10s %10s %10s %s' % (
+        'format', 'sk2 load', 'save', 'load', 'rss, Mb', 'file size'))
+    for result in sorted(results.values(), key=lambda item: item['format']):
+        stages = result['stages']
+        times = ['%10.3f' % stages[name]['wall'] if name in stages
+                 else '%10s' % '-' for name in ('sk2_load', 'save', 'load')]
+        rss = max([data['rss'] for data in stages.values()] or [0])
+        print('%-28s %s %10.1f %s' % (
+            result['format'][:28], ' '.join(times), rss / 1024.0,
+            result.get('error') or result.get('file_size', '')))
+    for name, stage, prev_time, cur_time in regressions:
+        if stage is None:
+            print('REGRESSION: %s failed: %s' % (
+                name, results[name]['error']))
+        elif cur_time is None:
+            print('REGRESSION: %s %s %.3fs -> missing' % (
+                name, stage, prev_time))
+        else:
+            print('REGRESSION: %s %s %.3fs -> %.3fs' % (
+                name, stage, prev_time, cur_time))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
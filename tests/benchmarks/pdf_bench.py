@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+PDF export benchmark.
+
+Synthetic SK2 document (see docgen.py) with repeated pixmaps, image
+pattern fills and gradients is saved into PDF several times. Best save
+time, file size and peak RSS growth are appended into history file.
+
+To get before/after report run the script on both revisions and pass
+revision of the first run as --baseline. Latest record of baseline
+revision for the same document is compared with current run.
+
+Run with --pdf-streaming is compared with latest run of the same
+revision and document without it, if there is no --baseline. Peak RSS
+of process does not decrease, so modes are measured by separate runs.
+
+Usage: python pdf_bench.py [--paths=N] [--texts=N] [--gradients=N]
+       [--pixmaps=N] [--patterns=N] [--groups=N] [--pages=N]
+       [--repeat=N] [--pdf-gradients=shading|stripes] [--pdf-jobs=N]
+       [--pdf-streaming] [--history=FILE] [--baseline=REVISION]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import uc2
+from uc2.formats.pdf import pdf_saver
+from uc2.formats.sk2.sk2_presenter import SK2_Presenter
+from uc2.utils.convprofile import get_peak_rss
+
+from docgen import KINDS, generate_document
+from formats_bench import get_revision, read_history
+
+HISTORY_FILE = 'pdf_bench_history.jsonl'
+COUNTS = {'paths': 200, 'texts': 0, 'gradients': 200, 'pixmaps': 100,
+          'patterns': 100, 'groups': 20}
+
+
+def run(doc, path, repeat, cnf):
+    times = []
+    rss = get_peak_rss()
+    for _i in range(repeat):
+        start = time.time()
+        pdf_saver(doc, path, cnf=dict(cnf))
+        times.append(time.time() - start)
+    return {
+        'save': min(times),
+        'file_size': os.path.getsize(path),
+        'rss': get_peak_rss() - rss,
+    }
+
+
+def find_baseline(record, history, revision, document=None):
+    document = record['document'] if document is None else document
+    for item in reversed(history):
+        if item['revision'] == revision and \
+                item['document'] == document and \
+                item['python'] == record['python']:
+            return item
+    return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='PDF export benchmark')
+    for kind in KINDS:
+        parser.add_argument('--' + kind, type=int, default=COUNTS[kind],
+                            help='%s per page' % kind)
+    parser.add_argument('--pages', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--pdf-gradients', default='')
+    parser.add_argument('--pdf-jobs', type=int, default=0,
+                        help='page rendering processes')
+    parser.add_argument('--pdf-streaming', action='store_true')
+    parser.add_argument('--history', default=HISTORY_FILE)
+    parser.add_argument('--baseline', default='',
+                        help='revision to compare with')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    counts = dict((kind, getattr(args, kind)) for kind in KINDS)
+    document = dict(counts, pages=args.pages, seed=args.seed)
+    cnf = {}
+    if args.pdf_gradients:
+        cnf['pdf_gradients'] = args.pdf_gradients
+        document['pdf_gradients'] = args.pdf_gradients
+    if args.pdf_jobs:
+        cnf['pdf_jobs'] = args.pdf_jobs
+        document['pdf_jobs'] = args.pdf_jobs
+    if args.pdf_streaming:
+        cnf['pdf_streaming'] = True
+        document['pdf_streaming'] = True
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app = uc2.uc2_init()
+        app.init_mngrs()
+        doc = SK2_Presenter(app.appdata)
+        generate_document(doc, counts, args.pages, args.seed)
+        result = run(doc, os.path.join(tmp_dir, 'bench.pdf'),
+                     args.repeat, cnf)
+        doc.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': get_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'document': document,
+        'result': result,
+    }
+    history = read_history(args.history)
+    with open(args.history, 'a') as fileptr:
+        fileptr.write(json.dumps(record, sort_keys=True) + '\n')
+
+    print('Document: %s' % ', '.join(
+        '%s=%s' % item for item in sorted(document.items())))
+    print('%-12s %10s %12s %10s' % ('revision', 'save, s', 'file size',
+                                    'rss, Mb'))
+    rows = [record]
+    if args.baseline:
+        baseline = find_baseline(record, history, args.baseline)
+        if baseline is None:
+            print('No baseline record for revision %s' % args.baseline)
+        else:
+            rows.insert(0, baseline)
+    elif args.pdf_streaming:
+        in_memory = dict(document)
+        in_memory.pop('pdf_streaming')
+        baseline = find_baseline(record, history, record['revision'],
+                                 in_memory)
+        if baseline is None:
+            print('No record without --pdf-streaming for comparison')
+        else:
+            rows.insert(0, baseline)
+    for item in rows:
+        res = item['result']
+        print('%-12s %10.3f %12d %10.1f' % (
+            item['revision'] or '-', res['save'], res['file_size'],
+            res['rss'] / 1024.0))
+    if len(rows) == 2:
+        before, after = rows[0]['result'], rows[1]['result']
+        print('%-12s %9.2fx %11.2fx %9.2fx' % (
+            'ratio', before['save'] / max(after['save'], 1e-6),
+            before['file_size'] / float(max(after['file_size'], 1)),
+            before['rss'] / float(max(after['rss'], 1))))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compares SK2 load/save of image heavy document with lazy pixmap
+storage (encoded strings are kept untouched) and with eager one
+(every pixmap is decoded on loading and encoded again on saving,
+as it was before).
+
+Usage: python pixmap_bench.py [PIXMAPS_NUMBER] [IMAGE_SIZE]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from base64 import b64encode
+from cStringIO import StringIO
+
+from PIL import Image
+
+from uc2.formats.sk2.sk2_config import SK2_Config
+from uc2.formats.sk2.sk2_filters import SK2_Loader, SK2_Saver
+from uc2.sk2const import SK2DOC_ID, SK2VER
+
+PIXMAPS_NUMBER = 20
+IMAGE_SIZE = 1000
+
+
+class BenchPresenter(object):
+    model = None
+
+    def __init__(self):
+        self.config = SK2_Config()
+        self.config.preview = False
+
+    def update(self, *args, **kwargs):
+        pass
+
+
+def get_photo(size, seed):
+    """
+    Returns photo like image (gradients with noise) as PNG string.
+    """
+    bands = [Image.linear_gradient('L').resize(size),
+             Image.effect_noise(size, 16 + seed % 32),
+             Image.radial_gradient('L').resize(size)]
+    image = Image.merge('RGB', bands)
+    alpha = Image.linear_gradient('L').resize(size).rotate(seed * 15)
+    fobj = StringIO()
+    image.save(fobj, format='PNG')
+    alpha_fobj = StringIO()
+    alpha.save(alpha_fobj, format='PNG')
+    return fobj.getvalue(), alpha_fobj.getvalue()
+
+
+def write_document(path, number, size):
+    style = [[], [], [], SK2_Config.default_image_style[3]]
+    strings = []
+    fileptr = open(path, 'wb')
+    fileptr.write(SK2DOC_ID + SK2VER + '\n')
+    for tag in ('Document', 'Pages', 'Page', 'Layer'):
+        fileptr.write("obj('%s')\n" % tag)
+    for i in range(number):
+        bitmap, alpha = get_photo((size, size), i)
+        strings += [b64encode(bitmap), b64encode(alpha)]
+        trafo = [1.0, 0.0, 0.0, 1.0, 10.0 * i, 10.0 * i]
+        fileptr.write("obj('Pixmap')\n")
+        fileptr.write("set('bitmap','%s')\n" % strings[-2])
+        fileptr.write("set('alpha_channel','%s')\n" % strings[-1])
+        fileptr.write("set('trafo',%s)\n" % trafo)
+        fileptr.write("set('style',%s)\n" % style)
+        fileptr.write("end()\n")
+    fileptr.write('end()\n' * 4)
+    fileptr.close()
+    return strings
+
+
+def get_pixmaps(model):
+    return model.childs[0].childs[0].childs[0].childs
+
+
+def get_memory_size(pixmaps):
+    """
+    Returns memory size of pixmap data (encoded strings and
+    decoded image buffers).
+    """
+    ret = 0
+    for pixmap in pixmaps:
+        hdl = pixmap.handler
+        for image_str in (hdl.bitmap_str, hdl.alpha_str):
+            ret += len(image_str or '')
+        for image in (hdl._bitmap, hdl._alpha):
+            if image is not None:
+                ret += image.size[0] * image.size[1] * len(image.getbands())
+    return ret
+
+
+def measure(path, out_path, eager):
+    presenter = BenchPresenter()
+    start = time.time()
+    presenter.model = SK2_Loader().load(presenter, path)
+    pixmaps = get_pixmaps(presenter.model)
+    if eager:
+        for pixmap in pixmaps:
+            hdl = pixmap.handler
+            hdl.set_images(hdl.bitmap, hdl.alpha)
+    load_time = time.time() - start
+    memory = get_memory_size(pixmaps)
+    start = time.time()
+    SK2_Saver().save(presenter, out_path)
+    return load_time, time.time() - start, memory
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else PIXMAPS_NUMBER
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else IMAGE_SIZE
+    paths = []
+    for _i in range(3):
+        fd, path = tempfile.mkstemp(suffix='.sk2')
+        os.close(fd)
+        paths.append(path)
+    try:
+        strings = write_document(paths[0], number, size)
+        eager = measure(paths[0], paths[1], True)
+        lazy = measure(paths[0], paths[2], False)
+        content = open(paths[2], 'rb').read()
+        untouched = all("'%s'" % item in content for item in strings)
+    finally:
+        for path in paths:
+            os.remove(path)
+
+    print('%d pixmaps %dx%d' % (number, size, size))
+    for name, (load_time, save_time, memory) in (('eager', eager),
+                                                 ('lazy', lazy)):
+        print('%s storage: loading %.2fs, saving %.2fs, pixmap data %.1fMb'
+              % (name, load_time, save_time, memory / 1048576.0))
+    if not untouched:
+        print('Saved pixmaps are not identical to loaded ones!')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
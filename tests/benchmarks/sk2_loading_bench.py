@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2021 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compares SK2 document loading by legacy compile/exec loader
+and by sk2_parser based loader.
+
+Usage: python sk2_loading_bench.py [OBJECTS_NUMBER]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from uc2.formats.sk2.sk2_config import SK2_Config
+from uc2.formats.sk2.sk2_filters import SK2_Loader
+from uc2.sk2const import SK2DOC_ID, SK2VER
+
+OBJECTS_NUMBER = 100000
+REQUIRED_SPEEDUP = 5.0
+
+STYLES = [
+    [[1, 0, [u'CMYK', [0.0, 0.0, 0.0, 1.0], 1.0, u'Black'], []],
+     [0, 0.283, [u'CMYK', [0.0, 0.0, 0.0, 1.0], 1.0, u'Black'], [], 0, 0,
+      10.433, 0, 0, []],
+     [u'Sans', u'Regular', 12.0, 0, [], True], [[], [], [], []]],
+    [[1, 0, [u'RGB', [1.0, 0.0, 0.0], 1.0, ''], []], [],
+     [u'Sans', u'Regular', 12.0, 0, [], True], [[], [], [], []]],
+]
+
+
+class BenchPresenter(object):
+    model = None
+
+    def __init__(self, legacy):
+        self.config = SK2_Config()
+        self.config.legacy_loader = legacy
+
+
+def write_document(path, number):
+    rnd = random.Random(1)
+    fileptr = open(path, 'wb')
+    fileptr.write(SK2DOC_ID + SK2VER + '\n')
+    for tag in ('Document', 'Pages', 'Page', 'Layer'):
+        fileptr.write("obj('%s')\n" % tag)
+    for _i in range(number):
+        points = [[rnd.random() * 500.0, rnd.random() * 500.0]
+                  for _j in range(rnd.randint(1, 8))]
+        paths = [[[rnd.random() * 500.0, rnd.random() * 500.0], points, 1]]
+        trafo = [1.0, 0.0, 0.0, 1.0, rnd.random(), rnd.random()]
+        fileptr.write("obj('Curve')\n")
+        fileptr.write("set('paths',%s)\n" % paths)
+        fileptr.write("set('trafo',%s)\n" % trafo)
+        fileptr.write("set('style',%s)\n" % STYLES[rnd.randint(0, 1)])
+        fileptr.write("end()\n")
+    fileptr.write('end()\n' * 4)
+    fileptr.close()
+
+
+def measure(path, legacy):
+    presenter = BenchPresenter(legacy)
+    start = time.time()
+    model = SK2_Loader().load(presenter, path)
+    return time.time() - start, model
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else OBJECTS_NUMBER
+    fd, path = tempfile.mkstemp(suffix='.sk2')
+    os.close(fd)
+    try:
+        write_document(path, number)
+        legacy_time, legacy_model = measure(path, True)
+        parser_time, model = measure(path, False)
+    finally:
+        os.remove(path)
+
+    layer = model.childs[0].childs[0].childs[0]
+    legacy_layer = legacy_model.childs[0].childs[0].childs[0]
+    for obj, legacy_obj in zip(layer.childs, legacy_layer.childs):
+        if (obj.paths, obj.trafo, obj.style) != \
+                (legacy_obj.paths, legacy_obj.trafo, legacy_obj.style):
+            print('Loaded models are different!')
+            return 1
+
+    speedup = legacy_time / parser_time
+    print('%d objects: exec loader %.2fs, parser loader %.2fs, speedup %.1fx'
+          % (number, legacy_time, parser_time, speedup))
+    return 0 if speedup >= REQUIRED_SPEEDUP else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -16,13 +16,45 @@
 #	along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import unittest
+import binreader_testsuite
 import cms_testsuite
+import compact_testsuite
+import convprofile_testsuite
+import glyph_cache_testsuite
 import _libimg_testsuite
 import image_testsuite
+import line_parser_testsuite
+import model_update_testsuite
+import pdfcontent_testsuite
+import pdfgen_testsuite
+import pdfpages_testsuite
+import pdfshading_testsuite
+import pdfstream_testsuite
+import pixmap_testsuite
+import png_tiles_testsuite
+import progress_testsuite
+import serve_testsuite
+import spatial_index_testsuite
 
 suite = unittest.TestSuite()
+suite.addTest(binreader_testsuite.get_suite())
 suite.addTest(cms_testsuite.get_suite())
+suite.addTest(compact_testsuite.get_suite())
+suite.addTest(convprofile_testsuite.get_suite())
+suite.addTest(glyph_cache_testsuite.get_suite())
 suite.addTest(_libimg_testsuite.get_suite())
 suite.addTest(image_testsuite.get_suite())
+suite.addTest(line_parser_testsuite.get_suite())
+suite.addTest(model_update_testsuite.get_suite())
+suite.addTest(pdfcontent_testsuite.get_suite())
+suite.addTest(pdfgen_testsuite.get_suite())
+suite.addTest(pdfpages_testsuite.get_suite())
+suite.addTest(pdfshading_testsuite.get_suite())
+suite.addTest(pdfstream_testsuite.get_suite())
+suite.addTest(pixmap_testsuite.get_suite())
+suite.addTest(png_tiles_testsuite.get_suite())
+suite.addTest(progress_testsuite.get_suite())
+suite.addTest(serve_testsuite.get_suite())
+suite.addTest(spatial_index_testsuite.get_suite())
 
 unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from uc2.utils import binreader
+from uc2.utils.binreader import BinaryReader
+
+DATA = struct.pack('<BHI2L', 7, 0x1234, 0xdeadbeef, 1, 2) + \
+	b'line one\nline two\n' + b'\x00\xff' * 8
+
+
+class TestBinaryReader(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp_dir = tempfile.mkdtemp()
+		self.path = os.path.join(self.tmp_dir, 'data.bin')
+		with open(self.path, 'wb') as fileptr:
+			fileptr.write(DATA)
+
+	def tearDown(self):
+		shutil.rmtree(self.tmp_dir)
+
+	def get_readers(self):
+		return [BinaryReader(open(self.path, 'rb')),
+				BinaryReader(StringIO(DATA))]
+
+	def test01_mapping(self):
+		reader = BinaryReader(open(self.path, 'rb'))
+		self.assertTrue(reader.mmap is not None)
+		reader.close()
+		reader = BinaryReader(StringIO(DATA))
+		self.assertTrue(reader.mmap is None)
+		self.assertEqual(len(reader), len(DATA))
+
+	def test02_values(self):
+		for reader in self.get_readers():
+			self.assertEqual(reader.read_byte(), 7)
+			self.assertEqual(reader.read_word(), 0x1234)
+			self.assertEqual(reader.read_dword(), 0xdeadbeef)
+			self.assertEqual(reader.read_pair_dword(), (1, 2))
+			self.assertEqual(reader.tell(), 15)
+			self.assertEqual(reader.unpack_at(binreader.WORD_BE, 1),
+							 (0x3412,))
+			self.assertEqual(reader.tell(), 15)
+			reader.close()
+
+	def test03_file_interface(self):
+		for reader in self.get_readers():
+			fileptr = open(self.path, 'rb')
+			for size in (3, 0, 12, -1, 5):
+				self.assertEqual(reader.read(size), fileptr.read(size))
+				self.assertEqual(reader.tell(), fileptr.tell())
+			for offset, whence in ((15, 0), (-4, 1), (-6, 2)):
+				reader.seek(offset, whence)
+				fileptr.seek(offset, whence)
+				self.assertEqual(reader.read(2), fileptr.read(2))
+			reader.seek(15)
+			self.assertEqual(reader.readline(), b'line one\n')
+			self.assertEqual(reader.readline(4), b'line')
+			reader.seek(len(DATA) + 10)
+			self.assertEqual(reader.read(4), b'')
+			fileptr.close()
+			reader.close()
+
+	def test04_eof(self):
+		for reader in self.get_readers():
+			reader.seek(-3, 2)
+			self.assertRaises(struct.error, reader.read_dword)
+			self.assertEqual(reader.tell(), len(DATA))
+			reader.close()
+
+	def test05_start_position(self):
+		fileptr = open(self.path, 'rb')
+		fileptr.seek(7)
+		reader = BinaryReader(fileptr)
+		self.assertEqual(reader.tell(), 7)
+		self.assertEqual(reader.read_pair_dword(), (1, 2))
+		reader.seek(0)
+		self.assertEqual(reader.read_byte(), 7)
+		reader.close()
+		self.assertTrue(fileptr.closed)
+
+	def test06_empty_file(self):
+		path = os.path.join(self.tmp_dir, 'empty.bin')
+		open(path, 'wb').close()
+		reader = BinaryReader(open(path, 'rb'))
+		self.assertTrue(reader.mmap is None)
+		self.assertEqual(reader.read(), b'')
+		self.assertRaises(struct.error, reader.read_byte)
+		reader.close()
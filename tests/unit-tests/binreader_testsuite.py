@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import unittest
+import binreader_tests
+
+def get_suite():
+	suite = unittest.TestSuite()
+	suite.addTest(unittest.makeSuite(binreader_tests.TestBinaryReader))
+	return suite
+
+
+if __name__ == '__main__':
+	unittest.TextTestRunner(verbosity=2).run(get_suite())
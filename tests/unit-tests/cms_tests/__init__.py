@@ -19,7 +19,7 @@ import unittest, os
 from PIL import Image
 
 from uc2 import uc2const
-from uc2.cms import libcms
+from uc2.cms import libcms, ColorManager
 
 _pkgdir = __path__[0]
 
@@ -342,6 +342,25 @@ class TestCmsFunctions(unittest.TestCase):
 			return
 		self.fail()
 
+	def test22a_do_transform_many_matches_single_transform(self):
+		colors = [[0, 0, 0, 0], [255, 255, 255, 0], [100, 190, 150, 0]]
+		inbuff = []
+		for color in colors:
+			inbuff += color
+		outbuff = libcms.cms_do_transform_many(self.transform, inbuff, 3)
+		self.assertEqual(len(outbuff), 12)
+		for index, color in enumerate(colors):
+			cmyk = [0, 0, 0, 0]
+			libcms.cms_do_transform(self.transform, color, cmyk)
+			self.assertEqual(outbuff[index * 4:index * 4 + 4], cmyk)
+
+	def test22b_do_transform_many_with_incorrect_input_buffer(self):
+		try:
+			libcms.cms_do_transform_many(self.transform, [255, 255, 255], 1)
+		except libcms.CmsError:
+			return
+		self.fail()
+
 	#---Pixmap related tests
 
 	def test23_do_transform2_with_null_input(self):
@@ -453,3 +472,66 @@ class TestCmsFunctions(unittest.TestCase):
 			self.fail()
 
 
+
+
+class TestColorManagerCache(unittest.TestCase):
+
+	def setUp(self):
+		self.cms = ColorManager()
+		self.color = [uc2const.COLOR_CMYK, [0.1, 0.2, 0.3, 0.4], 1.0, '']
+
+	def test01_repeated_conversion_hits_cache(self):
+		hits, misses = self.cms.get_cache_info()[:2]
+		rgb = self.cms.get_rgb_color(self.color)
+		self.assertEqual(self.cms.get_rgb_color(self.color), rgb)
+		self.assertEqual(self.cms.get_cache_info()[:2], (hits + 1, misses + 1))
+
+	def test02_cached_values_are_not_shared(self):
+		rgb = self.cms.get_rgb_color(self.color)
+		rgb[1][0] = 2.0
+		self.assertNotEqual(self.cms.get_rgb_color(self.color), rgb)
+
+	def test03_clear_transforms_invalidates_cache(self):
+		self.cms.get_rgb_color(self.color)
+		self.assertEqual(self.cms.get_cache_info()[2], 1)
+		self.cms.clear_transforms()
+		self.assertEqual(self.cms.get_cache_info()[2], 0)
+
+	def test04_cache_is_bounded(self):
+		self.cms.color_cache_size = 10
+		for i in range(20):
+			color = [uc2const.COLOR_RGB, [i / 255.0, 0.0, 0.0], 1.0, '']
+			self.cms.get_cmyk_color(color)
+		self.assertEqual(self.cms.get_cache_info()[2], 10)
+
+	def test05_batch_conversion_matches_single(self):
+		colors = [self.color, [uc2const.COLOR_RGB, [0.5, 0.1, 0.9], 0.5, 'a']]
+		colors.append(self.color)
+		self.assertEqual(self.cms.get_colors(colors),
+						[self.cms.get_rgb_color(item) for item in colors])
+
+	def check_batch_transform(self, colors, cs_in, cs_out):
+		batch = ColorManager().do_transform_many(colors, cs_in, cs_out)
+		single = ColorManager()
+		self.assertEqual(batch, [single.do_transform(color, cs_in, cs_out)
+								for color in colors])
+
+	def test06_batch_gray_to_rgb(self):
+		colors = [[uc2const.COLOR_GRAY, [value], 1.0, '']
+				for value in (0.0, 0.2, 0.5, 0.9, 1.0)]
+		self.check_batch_transform(colors, uc2const.COLOR_GRAY,
+								uc2const.COLOR_RGB)
+
+	def test07_batch_cmyk_to_gray(self):
+		colors = [[uc2const.COLOR_CMYK, values, 1.0, ''] for values in
+				([0.0, 0.0, 0.0, 0.0], [0.1, 0.2, 0.3, 0.4],
+				[0.0, 0.0, 0.0, 1.0], [0.5, 0.9, 0.1, 0.0])]
+		self.check_batch_transform(colors, uc2const.COLOR_CMYK,
+								uc2const.COLOR_GRAY)
+
+	def test08_batch_lab_to_rgb(self):
+		colors = [[uc2const.COLOR_LAB, values, 1.0, ''] for values in
+				([0.0, 0.5, 0.5], [0.5, 0.2, 0.8], [1.0, 0.5, 0.5],
+				[0.7, 0.9, 0.1])]
+		self.check_batch_transform(colors, uc2const.COLOR_LAB,
+								uc2const.COLOR_RGB)
@@ -21,6 +21,7 @@ import cms_tests
 def get_suite():
 	suite = unittest.TestSuite()
 	suite.addTest(unittest.makeSuite(cms_tests.TestCmsFunctions))
+	suite.addTest(unittest.makeSuite(cms_tests.TestColorManagerCache))
 	return suite
 
 
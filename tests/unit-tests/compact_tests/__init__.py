@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import pickle
+import unittest
+from copy import deepcopy
+
+from uc2 import libgeom
+from uc2.libgeom import CompactPath, is_compact, pack_path, pack_paths, \
+	unpack_path, unpack_paths
+from uc2.sk2const import NODE_CUSP, NODE_SMOOTH, CURVE_CLOSED, CURVE_OPENED
+
+CURVE_POINT = [[10.0, 5.0], [5.0, 10.0], [0.0, 10.0], NODE_SMOOTH]
+PATHS = [
+	[[0.0, 0.0], [[10.0, 0.0], CURVE_POINT, [0.0, 0.0]], CURVE_CLOSED],
+	[[20.0, 20.0], [[30.0, 20.0], [30.0, 30.0]], CURVE_OPENED],
+]
+TRAFO = [2.0, 0.5, -0.5, 1.5, 10.0, -5.0]
+
+
+class TestCompactPath(unittest.TestCase):
+
+	def setUp(self):
+		self.paths = deepcopy(PATHS)
+		self.path = pack_path(self.paths[0])
+
+	def test01_pack_unpack(self):
+		paths = pack_paths(self.paths)
+		self.assertTrue(all([is_compact(item) for item in paths]))
+		self.assertEqual(unpack_paths(paths), PATHS)
+		self.assertTrue(pack_paths(paths)[0] is paths[0])
+		self.assertTrue(unpack_path(self.paths[0]) is self.paths[0])
+		unpacked = unpack_paths(paths)
+		self.assertTrue(all([isinstance(item, list) for item in unpacked]))
+		self.assertEqual(pickle.loads(pickle.dumps(paths[0])), PATHS[0])
+
+	def test02_indexing(self):
+		path = self.path
+		self.assertEqual(len(path), 3)
+		self.assertEqual(path[0], [0.0, 0.0])
+		self.assertEqual(path[2], CURVE_CLOSED)
+		self.assertEqual(path[-1], CURVE_CLOSED)
+		self.assertEqual(len(path[1]), 3)
+		self.assertEqual(path[1][0], [10.0, 0.0])
+		self.assertEqual(path[1][1], CURVE_POINT)
+		self.assertEqual(path[1][-1], [0.0, 0.0])
+		self.assertEqual(path[1][1:], PATHS[0][1][1:])
+		self.assertEqual(list(path[1]), PATHS[0][1])
+		self.assertRaises(IndexError, path[1].__getitem__, 3)
+		self.assertRaises(IndexError, path.__getitem__, 3)
+		start, points, closed = path
+		self.assertEqual([start, points, closed], PATHS[0])
+
+	def test03_equality(self):
+		path = self.path
+		self.assertEqual(path, PATHS[0])
+		self.assertEqual(path, pack_path(PATHS[0]))
+		self.assertEqual(path[1], PATHS[0][1])
+		self.assertNotEqual(path, PATHS[1])
+		self.assertNotEqual(path, pack_path(PATHS[1]))
+		other = pack_path(PATHS[0])
+		other[2] = CURVE_OPENED
+		self.assertNotEqual(path, other)
+		copied = deepcopy(path)
+		self.assertEqual(copied, path)
+		copied[0] = [1.0, 1.0]
+		self.assertEqual(path[0], [0.0, 0.0])
+
+	def test04_transformed(self):
+		for path in self.paths:
+			compact = pack_path(path)
+			result = libgeom.apply_trafo_to_path(compact, TRAFO)
+			self.assertTrue(is_compact(result))
+			self.assertEqual(result, libgeom.apply_trafo_to_path(path, TRAFO))
+			self.assertEqual(compact, path)
+		compact = pack_paths(self.paths)
+		self.assertEqual(libgeom.apply_trafo_to_paths(compact, TRAFO),
+			libgeom.apply_trafo_to_paths(self.paths, TRAFO))
+
+	def test05_concatenation(self):
+		path = self.path
+		self.assertEqual([] + path[0], [0.0, 0.0])
+		self.assertEqual([] + path[1], PATHS[0][1])
+		self.assertEqual(path[1] + [], PATHS[0][1])
+		self.assertEqual([] + path, PATHS[0])
+		self.assertTrue(isinstance([] + path[1], list))
+
+	def test06_points_changes(self):
+		path = self.path
+		expected = deepcopy(PATHS[0])
+		line_point = [5.0, 5.0]
+		path[1].append([] + path[0])
+		expected[1].append([0.0, 0.0])
+		self.assertEqual(path, expected)
+		path[1].append(CURVE_POINT)
+		expected[1].append(deepcopy(CURVE_POINT))
+		self.assertEqual(path, expected)
+		path[1][0] = CURVE_POINT
+		expected[1][0] = deepcopy(CURVE_POINT)
+		self.assertEqual(path, expected)
+		path[1][1] = line_point
+		expected[1][1] = line_point
+		self.assertEqual(path, expected)
+		point = path[1][-1]
+		point[3] = NODE_CUSP
+		path[1][-1] = point
+		expected[1][-1][3] = NODE_CUSP
+		self.assertEqual(path, expected)
+		path[1].insert(1, line_point)
+		expected[1].insert(1, line_point)
+		self.assertEqual(path, expected)
+		self.assertEqual(path[1].pop(), expected[1].pop())
+		self.assertEqual(path, expected)
+		del path[1][0]
+		del expected[1][0]
+		self.assertEqual(path, expected)
+		path[1].reverse()
+		expected[1].reverse()
+		self.assertEqual(path, expected)
+		points = path[1]
+		points += [line_point]
+		expected[1] += [line_point]
+		self.assertEqual(path, expected)
+		path[1].extend(PATHS[1][1])
+		expected[1].extend(PATHS[1][1])
+		self.assertEqual(path, expected)
+		self.assertEqual(path[1].index(line_point),
+			expected[1].index(line_point))
+		self.assertTrue(line_point in path[1])
+		self.assertEqual(path.get_bbox(), [0.0, 0.0, 30.0, 30.0])
+
+	def test07_cairo_path(self):
+		from uc2 import libcairo
+		compact = pack_paths(self.paths)
+		self.assertEqual(list(libcairo.create_cpath(compact)),
+			list(libcairo.create_cpath(self.paths)))
+		cpath = libcairo.create_cpath(compact)
+		self.assertEqual(libcairo.get_path_from_cpath(cpath), PATHS)
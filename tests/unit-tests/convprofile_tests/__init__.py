@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from uc2.utils import convprofile
+
+
+class Node(object):
+
+	def __init__(self, cid, childs=None):
+		self.cid = cid
+		self.childs = childs or []
+
+
+def work(num=20000):
+	return sum(i * i for i in range(num))
+
+
+class TestConversionProfile(unittest.TestCase):
+
+	def test01_noop_without_profile(self):
+		self.assertTrue(convprofile.get_profile() is None)
+		with convprofile.stage('load'):
+			work(10)
+		convprofile.add_objects(Node(1))
+
+	def test02_nested_stages(self):
+		profile = convprofile.ConversionProfile('test.sk2')
+		profile.start()
+		self.assertTrue(convprofile.get_profile() is profile)
+		with convprofile.stage('load'):
+			with convprofile.stage('parse'):
+				work()
+			with convprofile.stage('update'):
+				work()
+		with convprofile.stage('save'):
+			work()
+		profile.stop()
+		self.assertTrue(convprofile.get_profile() is None)
+		names = [item['stage'] for item in profile.stages]
+		self.assertEqual(names,
+						 ['load', 'load/parse', 'load/update', 'save'])
+		load, parse, update = profile.stages[:3]
+		self.assertTrue(load['wall'] >= parse['wall'] + update['wall'])
+		for item in profile.stages:
+			self.assertTrue(item['cpu'] >= 0.0)
+			self.assertTrue(item['peak_rss'] >= item['rss_before'])
+		self.assertTrue(profile.elapsed >= load['wall'])
+
+	def test03_object_counts(self):
+		model = Node(1, [Node(2, [Node(3), Node(3)]), Node(3)])
+		counts = convprofile.count_objects(model)
+		self.assertEqual(counts, {'Node(1)': 1, 'Node(2)': 1, 'Node(3)': 3})
+
+	def test04_report(self):
+		profile = convprofile.ConversionProfile('test.sk2')
+		profile.start()
+		with convprofile.stage('load'):
+			work()
+		convprofile.add_objects(Node(1, [Node(2)]))
+		profile.stop()
+		report = profile.get_report()
+		self.assertEqual(report['file'], 'test.sk2')
+		self.assertEqual(report['objects'], {'Node(1)': 1, 'Node(2)': 1})
+		self.assertEqual(sorted(report['subsystems'].keys()),
+						 sorted(name for name, _path
+								in convprofile.SUBSYSTEMS))
+		tmp_dir = tempfile.mkdtemp()
+		try:
+			path = os.path.join(tmp_dir, 'report.json')
+			convprofile.save_report(report, path)
+			with open(path) as fileptr:
+				self.assertEqual(json.load(fileptr)['stages'][0]['stage'],
+								 'load')
+		finally:
+			shutil.rmtree(tmp_dir)
+
+	def test05_aggregate(self):
+		reports = []
+		for index in range(3):
+			reports.append({
+				'file': 'file%d' % index, 'wall': 1.0, 'cpu': 0.5,
+				'peak_rss': 100 * index,
+				'stages': [{'stage': 'load', 'wall': 0.6, 'cpu': 0.3,
+							'peak_rss': 100 * index, 'rss_before': 0},
+						   {'stage': 'save', 'wall': 0.4, 'cpu': 0.2,
+							'peak_rss': 50, 'rss_before': 0}],
+				'methods': [{'method': 'a.py:1(f)', 'calls': 2,
+							 'self': 0.1, 'cumulative': 0.2}],
+				'subsystems': {'text': 0.25},
+				'objects': {'Node(1)': 2},
+			})
+		result = convprofile.aggregate(reports)
+		self.assertEqual(result['files'], 3)
+		self.assertAlmostEqual(result['wall'], 3.0)
+		self.assertEqual(result['peak_rss'], 200)
+		self.assertEqual([item['stage'] for item in result['stages']],
+						 ['load', 'save'])
+		self.assertAlmostEqual(result['stages'][0]['wall'], 1.8)
+		self.assertEqual(result['stages'][0]['count'], 3)
+		self.assertEqual(result['methods'][0]['calls'], 6)
+		self.assertAlmostEqual(result['subsystems']['text'], 0.75)
+		self.assertEqual(result['objects'], {'Node(1)': 6})
+		self.assertEqual(len(result['reports']), 3)
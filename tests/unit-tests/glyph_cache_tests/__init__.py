@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from uc2.libgeom import is_compact
+from uc2.libpango.glyph_cache import GlyphCache, get_glyph_key
+
+STYLE = [u'Sans', u'Regular', 12.0, 0, [], True]
+PATHS = [[[0.0, 0.0], [[10.0, 0.0], [[10.0, 5.0], [5.0, 10.0],
+		[0.0, 10.0], 0]], 1]]
+
+
+class TestGlyphCache(unittest.TestCase):
+
+	def setUp(self):
+		self.store_dir = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.store_dir)
+
+	def test01_keys(self):
+		key = get_glyph_key(u'a', -1, STYLE, [])
+		self.assertEqual(key, get_glyph_key(u'a', -1, list(STYLE), []))
+		self.assertNotEqual(key, get_glyph_key(u'b', -1, STYLE, []))
+		style = [u'Sans', u'Bold'] + STYLE[2:]
+		self.assertNotEqual(key, get_glyph_key(u'a', -1, style, []))
+		style = STYLE[:2] + [14.0] + STYLE[3:]
+		self.assertNotEqual(key, get_glyph_key(u'a', -1, style, []))
+		markup = [('b', (0, 1))]
+		self.assertNotEqual(key, get_glyph_key(u'a', -1, STYLE, markup))
+
+	def test02_compact_shared_glyphs(self):
+		cache = GlyphCache()
+		glyph = cache.put('a', PATHS, 0.8)
+		self.assertTrue(is_compact(glyph[0][0]))
+		self.assertEqual(glyph[0][0], PATHS[0])
+		self.assertEqual(glyph[1], 0.8)
+		self.assertTrue(cache.get('a') is glyph)
+
+	def test03_lru_eviction(self):
+		cache = GlyphCache(2)
+		cache.put('a', PATHS)
+		cache.put('b', PATHS)
+		cache.get('a')
+		cache.put('c', PATHS)
+		self.assertEqual(cache.get('b'), None)
+		self.assertNotEqual(cache.get('a'), None)
+		self.assertNotEqual(cache.get('c'), None)
+		self.assertEqual(cache.get_cache_info(), (3, 0, 1, 2, 2))
+		self.assertEqual(cache.get_hit_rate(), 0.75)
+		cache.set_max_size(1)
+		self.assertEqual(cache.get('a'), None)
+
+	def test04_store(self):
+		cache = GlyphCache()
+		cache.open_store(self.store_dir)
+		cache.put('a', PATHS, 0.8)
+		self.assertEqual(len(os.listdir(self.store_dir)), 1)
+
+		cache = GlyphCache()
+		cache.open_store(self.store_dir)
+		paths, vpos = cache.get('a')
+		self.assertEqual(paths, PATHS)
+		self.assertEqual(vpos, 0.8)
+		self.assertEqual(cache.get('b'), None)
+		self.assertEqual(cache.get_cache_info()[:3], (0, 1, 1))
+		cache.get('a')
+		self.assertEqual(cache.get_cache_info()[:3], (1, 1, 1))
+
+	def test05_broken_store_file(self):
+		cache = GlyphCache()
+		cache.open_store(self.store_dir)
+		cache.put('a', PATHS)
+		for name in os.listdir(self.store_dir):
+			with open(os.path.join(self.store_dir, name), 'wb') as fileptr:
+				fileptr.write('broken')
+		cache.clear()
+		self.assertEqual(cache.get('a'), None)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import os
+import tempfile
+import unittest
+
+from uc2 import sk2const
+from uc2.formats import generic_filters
+from uc2.formats.sk2 import sk2_cids
+from uc2.formats.sk2.sk2_config import SK2_Config
+from uc2.formats.sk2.sk2_filters import SK2_Loader
+from uc2.formats.generic_filters import parse_call, parse_literal, \
+	LineParserError
+
+
+class Saver(object):
+	"""Writes values like SK2_Saver does."""
+
+	def field_to_str(self, val):
+		val_str = val.__str__()
+		if isinstance(val, str):
+			val_str = val_str.replace("\n", " ").replace("\r", " ")
+			val_str = "'%s'" % val_str.replace("'", "\\'")
+		return val_str
+
+
+class Recorder(object):
+
+	def set(self, item, val):
+		self.result = (item, val)
+
+
+class Loader(generic_filters.AbstractLoader):
+
+	def bs(self, x, y, cont):
+		self.result = (x, y, cont)
+
+	def layer(self, name, visible=1, color=None):
+		self.result = (name, visible, color)
+
+
+VALUES = [0, -1, 1.5, -2.5e-05, 1e300, 12345678901234567890, None,
+	True, False, 'abc', "it's", 'a\\b"c', '\xd0\xb0\\n', [], (), (1,), {},
+	{1: [1.0, 2.0], 'key': (None,)}, [u'аб', u'q\'"', '\xd0\xb0'],
+	[[0.0, 1.0], [[1.0, 2.0], [3.0, 4.0, 5.0, 6.0, 0]], 1],
+	[[1, 0, [u'CMYK', [0.0, 0.0, 0.0, 1.0], 1.0, u'Black'], []], [],
+	[u'Sans', u'Regular', 12.0, 0, [], True], [[], [], [], []]]]
+
+SK2_LINES = [sk2const.SK2DOC_ID + '0', "obj('Document')", "obj('Pages')",
+	"set('page_counter',1)", "obj('Page')", "set('name','Page 1')",
+	"obj('Layer')", "set('name','Layer 1')", 'end()', 'end()', 'end()',
+	'end()']
+
+WRONG_LINES = ["set('a',[1,)", "set('a',foo)", "obj(", "set('a',1 2)",
+	"end(1", "set('a',{1 2})", "set(a=1, 2)", "1set()", "set('a',x=)"]
+
+
+class Presenter(object):
+	model = None
+
+	def __init__(self):
+		self.config = SK2_Config()
+
+
+class TestLineParser(unittest.TestCase):
+
+	def load_sk2(self, text, legacy_loader=False):
+		fd, path = tempfile.mkstemp()
+		try:
+			with os.fdopen(fd, 'wb') as fileptr:
+				fileptr.write(text)
+			presenter = Presenter()
+			presenter.config.legacy_loader = legacy_loader
+			return SK2_Loader().load(presenter, path)
+		finally:
+			os.remove(path)
+
+	def test01_exec_compatibility(self):
+		saver = Saver()
+		for value in VALUES:
+			line = "set('field',%s)" % saver.field_to_str(value)
+			recorder = Recorder()
+			exec(compile('recorder.' + line, '<string>', 'exec'))
+			name, args, kwargs = parse_call(line)
+			self.assertEqual('set', name)
+			self.assertEqual({}, kwargs)
+			self.assertEqual(list(recorder.result), args)
+			self.assertEqual(type(recorder.result[1]), type(args[1]))
+			if isinstance(args[1], list):
+				self.assertEqual(repr(recorder.result[1]), repr(args[1]))
+
+	def test02_cached_literals(self):
+		text = "[u'CMYK', [0.0, 0.0, 0.0, 1.0], 1.0, 'Black']"
+		first = parse_literal(text)
+		second = parse_literal(text)
+		self.assertEqual(first, second)
+		self.assertFalse(first is second)
+		self.assertFalse(first[1] is second[1])
+		self.assertEqual(str, type(second[3]))
+
+	def test03_call_lines(self):
+		self.assertEqual(('obj', ['Curve'], {}), parse_call("obj('Curve')"))
+		self.assertEqual(('end', [], {}), parse_call('end()'))
+		self.assertEqual(('f', [1, (2, 3)], {'a': 'x=1', 'b': None}),
+			parse_call("f(1, (2,3), a='x=1', b=None) "))
+
+	def test04_wrong_lines(self):
+		for line in WRONG_LINES:
+			self.assertRaises(LineParserError, parse_call, line)
+
+	def test05_loader_dispatch(self):
+		loader = Loader()
+		loader.call_line('bs(1.5,-2,0)')
+		self.assertEqual((1.5, -2, 0), loader.result)
+		loader.call_line("layer('Layer 1',color=(0.1,0.2,0.3))")
+		self.assertEqual(('Layer 1', 1, (0.1, 0.2, 0.3)), loader.result)
+		self.assertRaises(LineParserError, loader.call_line, '__init__()')
+		self.assertRaises(AttributeError, loader.call_line, 'unknown()')
+
+	def test06_raw_utf8_arguments(self):
+		# SKP saver writes names and comments as raw utf-8 bytes
+		for value in ('caf\xc3\xa9', '\xd0\x9f\xd1\x80', "\xd0\x9f it\\'s"):
+			line = "set_name('%s')" % value
+			expected = value.replace("\\'", "'")
+			self.assertEqual(('set_name', [expected], {}), parse_call(line))
+			line = "set_source('%s', 1)" % value
+			self.assertEqual(('set_source', [expected, 1], {}),
+							parse_call(line))
+
+	def test07_sk2_crlf_lines(self):
+		for eol in ('\n', '\r\n'):
+			for legacy_loader in (False, True):
+				text = eol.join(SK2_LINES) + eol
+				model = self.load_sk2(text, legacy_loader)
+				self.assertEqual(model.cid, sk2_cids.DOCUMENT)
+				pages = model.childs[0]
+				self.assertEqual(pages.cid, sk2_cids.PAGES)
+				self.assertEqual(pages.page_counter, 1)
+				page = pages.childs[0]
+				self.assertEqual(page.cid, sk2_cids.PAGE)
+				self.assertEqual(page.name, 'Page 1')
+				self.assertEqual(page.childs[0].cid, sk2_cids.LAYER)
+				self.assertEqual(page.childs[0].name, 'Layer 1')
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import unittest
+from copy import deepcopy
+from cStringIO import StringIO
+
+from PIL import Image
+
+import uc2
+from uc2 import sk2const, uc2const
+from uc2.formats.generic import ModelObject
+from uc2.formats.sk2 import sk2_model
+from uc2.formats.sk2.sk2_presenter import SK2_Presenter
+
+RED = [uc2const.COLOR_RGB, [1.0, 0.0, 0.0], 1.0, '']
+STYLE = [[sk2const.FILL_EVENODD, sk2const.FILL_SOLID, RED], [],
+		 [u'Sans', u'Regular', 12.0, 0, [], True], [[], [], [], []]]
+PATHS = [[[0.0, 0.0], [[10.0, 0.0], [10.0, 10.0]], sk2const.CURVE_CLOSED]]
+
+
+class TrackedObject(ModelObject):
+	"""Model object which tracks changes like SK2 objects do."""
+
+	incremental_update = True
+
+	def __init__(self, name, childs=None):
+		self.name = name
+		self.childs = childs or []
+		self.updates = 0
+
+	def update(self):
+		self.updates += 1
+
+
+class PlainObject(TrackedObject):
+	incremental_update = False
+
+
+class TestIncrementalUpdate(unittest.TestCase):
+
+	def setUp(self):
+		self.leaf1 = TrackedObject('leaf1')
+		self.leaf2 = TrackedObject('leaf2')
+		self.group = TrackedObject('group', [self.leaf1])
+		self.root = TrackedObject('root', [self.group, self.leaf2])
+
+	def test01_first_update(self):
+		self.assertEqual(self.root.do_update(), 4)
+		for obj in (self.root, self.group, self.leaf1, self.leaf2):
+			self.assertEqual(obj.updates, 1)
+			self.assertFalse(obj.cache_dirty)
+
+	def test02_clean_model(self):
+		self.root.do_update()
+		self.assertEqual(self.root.do_update(), 0)
+		self.assertEqual(self.root.updates, 1)
+
+	def test03_dirty_leaf(self):
+		self.root.do_update()
+		self.leaf1.set_dirty()
+		self.assertTrue(self.group.cache_dirty)
+		self.assertTrue(self.root.cache_dirty)
+		self.assertFalse(self.leaf2.cache_dirty)
+		self.assertEqual(self.root.do_update(), 3)
+		self.assertEqual(self.leaf1.updates, 2)
+		self.assertEqual(self.group.updates, 2)
+		self.assertEqual(self.leaf2.updates, 1)
+
+	def test04_appended_child(self):
+		self.root.do_update()
+		leaf3 = TrackedObject('leaf3')
+		self.group.childs.append(leaf3)
+		self.assertEqual(self.root.do_update(), 3)
+		self.assertTrue(leaf3.parent is self.group)
+		self.assertEqual(self.group.updates, 2)
+		self.assertEqual(self.leaf1.updates, 1)
+
+	def test05_plain_objects(self):
+		leaf = PlainObject('leaf')
+		root = PlainObject('root', [leaf])
+		root.do_update()
+		self.assertEqual(root.do_update(), 2)
+		self.assertEqual(leaf.updates, 2)
+
+
+def get_png_str(mode, color):
+	fobj = StringIO()
+	Image.new(mode, (4, 4), color).save(fobj, format='PNG')
+	return fobj.getvalue()
+
+
+def get_objects(obj):
+	ret = [obj]
+	for child in obj.childs:
+		ret += get_objects(child)
+	return ret
+
+
+def get_chain(obj):
+	ret = []
+	while obj is not None:
+		ret.append(obj)
+		obj = obj.parent
+	return ret
+
+
+class TestSK2DirtyTracking(unittest.TestCase):
+
+	def setUp(self):
+		self.app = uc2.uc2_init()
+		self.doc = SK2_Presenter(self.app.appdata)
+		methods = self.doc.methods
+		self.layer = methods.get_layer(methods.get_page())
+		config = self.doc.config
+		self.curve1 = sk2_model.Curve(config, None, deepcopy(PATHS),
+									  style=deepcopy(STYLE))
+		self.curve2 = sk2_model.Curve(config, None, deepcopy(PATHS),
+									  style=deepcopy(STYLE))
+		self.group = sk2_model.Group(config, None,
+									 [self.curve1, self.curve2])
+		methods.append_object(self.group, self.layer)
+		self.doc.update()
+
+	def tearDown(self):
+		self.doc.close()
+
+	def get_dirty(self):
+		return [obj for obj in get_objects(self.doc.model)
+				if obj.cache_dirty]
+
+	def check_rebuilt(self, objs):
+		self.assertEqual(set(self.get_dirty()), set(objs))
+		self.doc.update()
+		self.assertEqual(self.doc.rebuilt_num, len(objs))
+		self.assertEqual(self.get_dirty(), [])
+
+	def test01_clean_model(self):
+		self.assertEqual(self.get_dirty(), [])
+		self.doc.update()
+		self.assertEqual(self.doc.rebuilt_num, 0)
+
+	def test02_field_assignment(self):
+		self.curve1.trafo = [2.0, 0.0, 0.0, 2.0, 0.0, 0.0]
+		self.check_rebuilt(get_chain(self.curve1))
+		self.curve2.style = deepcopy(STYLE)
+		self.check_rebuilt(get_chain(self.curve2))
+		self.curve1.paths = deepcopy(PATHS)
+		self.check_rebuilt(get_chain(self.curve1))
+
+	def test03_untracked_fields(self):
+		self.curve1.cache_paths = None
+		self.curve1.parent = self.group
+		self.curve1.style[0] = []
+		self.assertEqual(self.get_dirty(), [])
+
+	def test04_insert_delete(self):
+		methods = self.doc.methods
+		curve = sk2_model.Curve(self.doc.config, None, deepcopy(PATHS),
+								style=deepcopy(STYLE))
+		methods.insert_object(curve, self.group, 1)
+		self.check_rebuilt([curve] + get_chain(self.group))
+		methods.delete_object(self.curve2)
+		self.check_rebuilt(get_chain(self.group))
+		self.assertEqual(self.group.childs, [self.curve1, curve])
+
+	def test05_pixmap(self):
+		pixmap = sk2_model.Pixmap(self.doc.config, None,
+								  get_png_str('RGB', (255, 0, 0)))
+		self.doc.methods.append_object(pixmap, self.layer)
+		self.doc.update()
+		self.assertEqual(self.get_dirty(), [])
+		pixmap.set_bitmap(get_png_str('RGB', (0, 0, 255)))
+		self.assertEqual(pixmap.handler.bitmap.getpixel((0, 0)), (0, 0, 255))
+		self.check_rebuilt(get_chain(pixmap))
+		pixmap.set_alpha_channel(get_png_str('L', 128))
+		self.assertTrue(pixmap.has_alpha())
+		self.check_rebuilt(get_chain(pixmap))
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import random
+import unittest
+
+from reportlab.pdfgen.pathobject import PDFPathObject
+
+from uc2 import sk2const
+from uc2.formats.pdf import pdfcontent
+from uc2.libgeom.compact import pack_paths
+
+
+def get_paths(seed, num=5):
+	rnd = random.Random(seed)
+
+	def point():
+		return [rnd.uniform(-1000.0, 1000.0), rnd.uniform(-1e-3, 1e-3)]
+
+	paths = []
+	for _i in range(num):
+		points = []
+		for _j in range(rnd.randint(1, 20)):
+			if rnd.random() < 0.5:
+				points.append(point())
+			else:
+				points.append([point(), point(), point(),
+							   sk2const.NODE_SMOOTH])
+		closed = rnd.choice([sk2const.CURVE_OPENED, sk2const.CURVE_CLOSED])
+		paths.append([point(), points, closed])
+	return paths
+
+
+def get_reference_code(paths):
+	path_obj = PDFPathObject()
+	for path in paths:
+		path_obj.moveTo(*path[0])
+		for point in path[1]:
+			if len(point) > 2:
+				path_obj.curveTo(point[0][0], point[0][1],
+								 point[1][0], point[1][1],
+								 point[2][0], point[2][1])
+			else:
+				path_obj.lineTo(*point)
+		if path[2]:
+			path_obj.close()
+	return path_obj.getCode()
+
+
+class TestPDFContent(unittest.TestCase):
+
+	def test01_list_paths(self):
+		for seed in range(10):
+			paths = get_paths(seed)
+			pdfpath, closed = pdfcontent.make_path(paths)
+			self.assertEqual(pdfpath.getCode(), get_reference_code(paths))
+			self.assertEqual(closed, any([path[2] for path in paths]))
+
+	def test02_compact_paths(self):
+		for seed in range(10):
+			paths = get_paths(seed)
+			pdfpath = pdfcontent.make_path(pack_paths(paths))[0]
+			self.assertEqual(pdfpath.getCode(), get_reference_code(paths))
+
+	def test03_empty_path(self):
+		pdfpath, closed = pdfcontent.make_path([])
+		self.assertEqual(pdfpath.getCode(), get_reference_code([]))
+		self.assertFalse(closed)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import io
+import re
+import unittest
+
+from PIL import Image
+
+from uc2.formats.pdf import pdfgen
+
+MATRIX = [2.0, 0.0, 0.0, 2.0, 10.0, 20.0]
+BBOX = [0.0, 0.0, 50.0, 60.0]
+
+
+class CountingGenerator(pdfgen.PDFGenerator):
+	"""
+	Counts images registered in document.
+	"""
+
+	def __init__(self, fileptr):
+		pdfgen.PDFGenerator.__init__(self, fileptr, None)
+		self.registered = 0
+		self.set_compression(False)
+
+	def register_image(self, image, alpha_channel=None, key=None):
+		if key is None or key not in self.images:
+			self.registered += 1
+		return pdfgen.PDFGenerator.register_image(self, image,
+			alpha_channel, key)
+
+
+def get_objects(data):
+	return re.findall(r'\d+ 0 obj\n(.*?)endobj', data, re.S)
+
+
+def get_object(objects, marker):
+	ret = [item for item in objects if marker in item]
+	return ret[0] if len(ret) == 1 else None
+
+
+class TestPDFResources(unittest.TestCase):
+
+	def setUp(self):
+		self.fileptr = io.BytesIO()
+		self.renderer = CountingGenerator(self.fileptr)
+		self.image = Image.new('RGB', (4, 3), (255, 0, 0))
+
+	def save(self):
+		self.renderer.save()
+		return self.fileptr.getvalue().decode('latin-1')
+
+	def test01_shared_image(self):
+		renderer = self.renderer
+		xobjects = []
+		for _index in range(3):
+			renderer.start_page(100.0, 100.0)
+			xobject = renderer.get_image_xobject(self.image, None, 'hash')
+			renderer.draw_xobject(*xobject)
+			xobjects.append(xobject)
+			renderer.end_page()
+		self.assertEqual(renderer.registered, 1)
+		self.assertEqual(xobjects, [xobjects[0]] * 3)
+		self.assertEqual(xobjects[0][1:], (4, 3))
+		data = self.save()
+		self.assertEqual(data.count('/Subtype /Image'), 1)
+		name = pdfgen.xObjectName(xobjects[0][0])
+		self.assertEqual(data.count('/%s Do' % name), 3)
+
+	def test02_unhashed_images(self):
+		renderer = self.renderer
+		renderer.start_page(100.0, 100.0)
+		renderer.draw_image(self.image)
+		renderer.draw_image(self.image)
+		renderer.end_page()
+		self.assertEqual(renderer.registered, 2)
+		self.assertEqual(renderer.images, {})
+
+	def test03_tiling_pattern(self):
+		renderer = self.renderer
+		renderer.start_page(100.0, 100.0)
+		xobject = renderer.get_image_xobject(self.image, None, 'hash')
+		renderer.draw_tiling_pattern([xobject], (4, 3), MATRIX, BBOX,
+			'0 0 50 60 re f')
+		renderer.end_page()
+		objects = get_objects(self.save())
+		image_name = pdfgen.xObjectName(xobject[0])
+
+		pattern = get_object(objects, '/PatternType 1')
+		self.assertNotEqual(pattern, None)
+		self.assertTrue('/Matrix [ 2 0 0 2 10 20 ]' in pattern)
+		self.assertTrue('/XStep 4 ' in pattern)
+		self.assertTrue('/YStep 3\n' in pattern)
+		self.assertTrue('/BBox [ 0 0 4 3 ]' in pattern)
+		self.assertTrue(re.search(r'/Resources <<\n/XObject <<\n/%s \d+ 0 R'
+			% re.escape(image_name), pattern))
+		self.assertTrue('q 4 0 0 3 0 0 cm /%s Do Q' % image_name in pattern)
+
+		form = get_object(objects, '/Subtype /Form')
+		self.assertNotEqual(form, None)
+		self.assertTrue('/BBox [ 0 0 50 60 ]' in form)
+		self.assertTrue(re.search(r'/Resources <<\n/Pattern <<\n/P0 \d+ 0 R',
+			form))
+		self.assertTrue('/Pattern cs /P0 scn\n0 0 50 60 re f' in form)
+		self.assertEqual(len([item for item in objects
+			if '/Subtype /Image' in item]), 1)
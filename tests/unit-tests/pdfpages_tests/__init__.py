@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pickle
+import unittest
+
+from uc2.formats.pdf import pdfcontent, pdfpages
+
+
+class FakeRenderer(object):
+
+	def __init__(self):
+		self.canvas = pdfpages.RecordingCanvas()
+		self.images = {}
+		self.calls = []
+
+	def register_image(self, image, alpha_channel=None, key=None):
+		if key is not None and key in self.images:
+			return self.images[key]
+		xobject = ('img%d' % len(self.calls), 10, 20)
+		self.calls.append(('register_image', image))
+		if key is not None:
+			self.images[key] = xobject
+		return xobject
+
+	def draw_xobject(self, name, width, height):
+		self.calls.append(('draw_xobject', name, width, height))
+
+	def draw_tiling_pattern(self, xobjects, size, matrix, bbox, code):
+		self.calls.append(('draw_tiling_pattern', xobjects, code))
+
+
+class TestPDFPages(unittest.TestCase):
+
+	def test01_recording_canvas(self):
+		canvas = pdfpages.RecordingCanvas()
+		canvas.saveState()
+		canvas.rect(0, 0, 10, 10, stroke=0, fill=1)
+		self.assertEqual(canvas.ops, [
+			('saveState', (), {}),
+			('rect', (0, 0, 10, 10), {'stroke': 0, 'fill': 1})])
+		self.assertRaises(AttributeError, getattr, canvas, '_code')
+
+	def test02_replay(self):
+		ops = [
+			('register_image', ('key', 'image', None, 'key'), {}),
+			('draw_xobject', ('key',), {}),
+			('register_image', (2, 'image2', None, None), {}),
+			('draw_tiling_pattern', (['key', 2], (1, 1), [], [], 'f'), {}),
+			('restoreState', (), {}),
+		]
+		renderer = FakeRenderer()
+		pdfpages.replay(renderer, ops)
+		# image sent with previous page of worker
+		ops = [('register_image', ('key', None, None, 'key'), {}),
+			   ('draw_xobject', ('key',), {})]
+		pdfpages.replay(renderer, ops)
+		self.assertEqual(renderer.calls, [
+			('register_image', 'image'),
+			('draw_xobject', 'img0', 10, 20),
+			('register_image', 'image2'),
+			('draw_tiling_pattern', [('img0', 10, 20), ('img2', 10, 20)],
+			 'f'),
+			('draw_xobject', 'img0', 10, 20)])
+		self.assertEqual(renderer.canvas.ops, [('restoreState', (), {})])
+
+	def test03_pickle(self):
+		canvas = pdfpages.RecordingCanvas()
+		canvas.drawPath(pdfcontent.make_path([[[0.0, 0.0],
+											   [[1.0, 1.0]], 1]])[0], 0, 1)
+		# pool sends task results by the highest protocol
+		ops = pickle.loads(pickle.dumps(canvas.ops, pickle.HIGHEST_PROTOCOL))
+		self.assertEqual(ops[0][0], 'drawPath')
+		self.assertEqual(ops[0][1][0].getCode(), canvas.ops[0][1][0].getCode())
+		self.assertEqual(ops[0][1][1:], (0, 1))
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import io
+import re
+import unittest
+
+from uc2 import sk2const, uc2const
+from uc2.cms import ColorManager
+from uc2.formats.pdf import pdfgen, pdfshading
+
+RED = [uc2const.COLOR_RGB, [1.0, 0.0, 0.0], 1.0, '']
+BLUE = [uc2const.COLOR_RGB, [0.0, 0.0, 1.0], 1.0, '']
+GHOST = [uc2const.COLOR_RGB, [0.0, 0.0, 1.0], 0.5, '']
+GREEN = [uc2const.COLOR_RGB, [0.0, 1.0, 0.0], 1.0, '']
+GRAY = [uc2const.COLOR_GRAY, [0.25], 1.0, '']
+NORMAL_TRAFO = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
+PATHS = [[[0.0, 0.0], [[40.0, 0.0], [40.0, 30.0], [0.0, 30.0]],
+		  sk2const.CURVE_CLOSED]]
+
+
+class PathObject(object):
+	is_curve = True
+	trafo = NORMAL_TRAFO
+	paths = PATHS
+
+
+def get_gradient_style(stops):
+	gradient = [sk2const.GRADIENT_LINEAR, [[0.0, 0.0], [40.0, 0.0]], stops]
+	return [sk2const.FILL_EVENODD, sk2const.FILL_GRADIENT, gradient]
+
+
+class TestPDFShading(unittest.TestCase):
+
+	def test01_normalize_stops(self):
+		stops = pdfshading.normalize_stops([[0.7, BLUE], [0.2, RED]])
+		self.assertEqual([stop[0] for stop in stops], [0.0, 0.2, 0.7, 1.0])
+		self.assertTrue(stops[0][1] is RED)
+		self.assertTrue(stops[-1][1] is BLUE)
+		stops = pdfshading.normalize_stops([[1.5, RED]])
+		self.assertEqual([stop[0] for stop in stops], [0.0, 1.0])
+		self.assertEqual(pdfshading.normalize_stops([]), [])
+
+	def test02_alpha(self):
+		stops = [[0.0, RED], [1.0, BLUE]]
+		self.assertFalse(pdfshading.has_alpha(stops))
+		self.assertEqual(pdfshading.get_constant_alpha(stops), 1.0)
+		stops = [[0.0, RED], [1.0, GHOST]]
+		self.assertTrue(pdfshading.has_alpha(stops))
+		self.assertEqual(pdfshading.get_constant_alpha(stops), None)
+		stops = [[0.0, GHOST], [1.0, GHOST]]
+		self.assertEqual(pdfshading.get_constant_alpha(stops), 0.5)
+
+	def test03_function_segments(self):
+		segments, bounds = pdfshading.get_function_segments(
+			[0.0, 1.0], [[0.0], [1.0]])
+		self.assertEqual(segments, [([0.0], [1.0])])
+		self.assertEqual(bounds, [])
+		segments, bounds = pdfshading.get_function_segments(
+			[0.0, 0.3, 1.0], [[0.0], [0.5], [1.0]])
+		self.assertEqual(segments, [([0.0], [0.5]), ([0.5], [1.0])])
+		self.assertEqual(bounds, [0.3])
+
+	def test04_sharp_transition(self):
+		segments, bounds = pdfshading.get_function_segments(
+			[0.0, 0.5, 0.5, 1.0], [[0.0], [0.2], [0.8], [1.0]])
+		self.assertEqual(segments, [([0.0], [0.2]), ([0.8], [1.0])])
+		self.assertEqual(bounds, [0.5])
+		segments, bounds = pdfshading.get_function_segments(
+			[0.0, 0.0], [[0.0], [1.0]])
+		self.assertEqual(segments, [([1.0], [1.0])])
+		self.assertEqual(bounds, [])
+
+	def test05_shading_geometry(self):
+		linear = [sk2const.GRADIENT_LINEAR, [[0.0, 0.0], [30.0, 40.0]], []]
+		radial = [sk2const.GRADIENT_RADIAL, [[10.0, 10.0], [13.0, 14.0]], []]
+		self.assertEqual(pdfshading.get_shading_type(linear),
+						 pdfshading.SHADING_AXIAL)
+		self.assertEqual(pdfshading.get_shading_coords(linear),
+						 [0.0, 0.0, 30.0, 40.0])
+		self.assertEqual(pdfshading.get_shading_type(radial),
+						 pdfshading.SHADING_RADIAL)
+		self.assertEqual(pdfshading.get_shading_coords(radial),
+						 [10.0, 10.0, 0.0, 10.0, 10.0, 5.0])
+		self.assertFalse(pdfshading.is_degenerate(linear))
+		point = [sk2const.GRADIENT_LINEAR, [[1.0, 1.0], [1.0, 1.0]], []]
+		self.assertTrue(pdfshading.is_degenerate(point))
+
+
+class TestShadingGenerator(unittest.TestCase):
+
+	def setUp(self):
+		self.fileptr = io.BytesIO()
+		self.renderer = pdfgen.PDFGenerator(self.fileptr, ColorManager())
+		self.renderer.set_compression(False)
+
+	def render(self, stops, mode=pdfshading.SHADING_MODE):
+		renderer = self.renderer
+		renderer.set_gradient_mode(mode)
+		renderer.start_page(100.0, 100.0)
+		obj = PathObject()
+		pdfpath = renderer.make_pdfpath(obj.paths)[0]
+		renderer.fill_pdfpath(obj, pdfpath, get_gradient_style(stops))
+		renderer.end_page()
+		renderer.save()
+		data = self.fileptr.getvalue().decode('latin-1')
+		# page content is the last stream of document
+		content = re.findall(r'stream\n(.*?)endstream', data, re.S)[-1]
+		return data, content
+
+	def test01_shading_values(self):
+		renderer = self.renderer
+		self.assertEqual(renderer.get_shading_values([RED, BLUE]),
+						 ('DeviceRGB', [[1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]))
+		self.assertEqual(renderer.get_shading_values([GRAY, GRAY]),
+						 ('DeviceCMYK', [[0.0, 0.0, 0.0, 0.75]] * 2))
+		renderer.set_colorspace(uc2const.COLOR_RGB)
+		colorspace, values = renderer.get_shading_values([RED, GRAY])
+		self.assertEqual(colorspace, 'DeviceRGB')
+		self.assertEqual(len(values), 2)
+		self.assertEqual([len(item) for item in values], [3, 3])
+		renderer.set_colorspace(uc2const.COLOR_CMYK)
+		colorspace, values = renderer.get_shading_values([RED, BLUE])
+		self.assertEqual(colorspace, 'DeviceCMYK')
+		self.assertEqual([len(item) for item in values], [4, 4])
+
+	def test02_stitching_function(self):
+		data, content = self.render([[0.0, RED], [0.5, GREEN], [1.0, RED]])
+		self.assertEqual(re.findall(r'/\w+ sh', content), ['/Sh0 sh'])
+		self.assertEqual(data.count('/ShadingType 2'), 1)
+		self.assertEqual(data.count('/FunctionType 3'), 1)
+		self.assertEqual(data.count('/FunctionType 2'), 2)
+		self.assertTrue('/Bounds [ .5 ]' in data)
+		self.assertTrue('/ColorSpace /DeviceRGB' in data)
+		self.assertFalse('/SMask' in data)
+
+	def test03_soft_mask(self):
+		data, content = self.render([[0.0, RED], [1.0, GHOST]])
+		self.assertTrue(re.search(r'/ExtGState <<\n/gRLs0 <<\n/SMask <<\n'
+								  r'/G \d+ 0 R /S /Luminosity /Type /Mask',
+								  data))
+		self.assertTrue('/S /Transparency' in data)
+		self.assertTrue('/BBox [ 0 0 40 30 ]' in data)
+		self.assertTrue('/ColorSpace /DeviceGray' in data)
+		self.assertTrue('/C0 [ 1 ] /C1 [ .5 ]' in data)
+		self.assertEqual(re.findall(r'/\w+ (?:gs|sh)', content),
+						 ['/gRLs0 gs', '/Sh0 sh'])
+
+	def test04_stripes(self):
+		data, content = self.render([[0.0, RED], [1.0, GHOST]],
+									pdfshading.STRIPES_MODE)
+		self.assertFalse('/Shading' in data)
+		self.assertFalse('/SMask' in data)
+		self.assertFalse(re.search(r' sh\b', content))
+		self.assertTrue(len(re.findall(r' re f', content)) > 2)
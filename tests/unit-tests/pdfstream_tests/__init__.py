@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import io
+import re
+import unittest
+
+from uc2.formats.pdf import pdfgen, pdfstream
+
+
+def make_pdf(streaming, pages=3):
+	fileptr = io.BytesIO()
+	renderer = pdfgen.PDFGenerator(fileptr, None)
+	renderer.set_streaming(streaming)
+	for index in range(pages):
+		renderer.start_page(100.0, 100.0)
+		renderer.canvas.rect(0, 0, 10 + index, 10, stroke=0, fill=1)
+		renderer.end_page()
+	renderer.save()
+	return fileptr.getvalue().decode('latin-1'), renderer
+
+
+class TestPDFStream(unittest.TestCase):
+
+	def test01_cross_reference(self):
+		data = make_pdf(True)[0]
+		self.assertTrue(data.startswith('%PDF-'))
+		self.assertTrue(data.endswith('%%EOF\n'))
+		xref = int(data.rsplit('startxref', 1)[1].split()[0])
+		self.assertTrue(data[xref:].startswith('xref'))
+		offsets = re.findall(r'(\d{10}) 00000 n', data[xref:])
+		for number, offset in enumerate(offsets, 1):
+			self.assertTrue(data[int(offset):].startswith('%d 0 obj' % number))
+
+	def test02_same_objects(self):
+		streamed = make_pdf(True)[0]
+		in_memory = make_pdf(False)[0]
+		pattern = re.compile(r'\d+ 0 obj')
+		self.assertEqual(len(pattern.findall(streamed)),
+						 len(pattern.findall(in_memory)))
+
+	def test03_released_pages(self):
+		renderer = make_pdf(True)[1]
+		for obj in renderer.canvas._doc.idToObject.values():
+			for attr in pdfstream.RELEASED_ATTRS:
+				self.assertEqual(getattr(obj, attr, None), None)
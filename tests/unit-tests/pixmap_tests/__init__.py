@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import unittest
+from base64 import b64encode
+from cStringIO import StringIO
+
+from PIL import Image
+
+from uc2.libimg.handlers import EditableImageHandler
+from uc2.libimg.imgcache import ImageCache, IMAGE_CACHE
+
+
+def get_image_str(mode, size, color, fmt='PNG'):
+	fobj = StringIO()
+	Image.new(mode, size, color).save(fobj, format=fmt)
+	return fobj.getvalue()
+
+
+class TestPixmapStorage(unittest.TestCase):
+
+	def setUp(self):
+		self.bitmap_str = get_image_str('RGB', (40, 30), (255, 0, 0))
+		self.alpha_str = get_image_str('L', (40, 30), 128)
+		self.hdl = EditableImageHandler(None)
+		self.hdl.set_images_from_str(self.bitmap_str, self.alpha_str)
+
+	def test01_lazy_decoding(self):
+		self.assertFalse(self.hdl.is_decoded())
+		self.assertEqual(self.hdl.get_size(), (40, 30))
+		self.assertEqual(self.hdl.get_mode(), 'RGB')
+		self.assertTrue(self.hdl.has_alpha())
+		self.assertFalse(self.hdl.is_decoded())
+
+	def test02_untouched_strings(self):
+		self.assertTrue(self.hdl.get_bitmap_str() is self.bitmap_str)
+		self.assertTrue(self.hdl.get_alpha_str() is self.alpha_str)
+		self.assertEqual(self.hdl.get_bitmap_b64str(),
+						b64encode(self.bitmap_str))
+		self.assertFalse(self.hdl.is_decoded())
+
+	def test03_decoding(self):
+		self.assertEqual(self.hdl.bitmap.getpixel((0, 0)), (255, 0, 0))
+		self.assertEqual(self.hdl.alpha.getpixel((0, 0)), 128)
+		self.assertTrue(self.hdl.is_decoded())
+		self.assertTrue(self.hdl.get_bitmap_str() is self.bitmap_str)
+
+	def test04_changed_image(self):
+		self.hdl.flip_top_to_bottom()
+		self.assertTrue(self.hdl.bitmap_str is None)
+		self.assertTrue(self.hdl.alpha_str is None)
+		bitmap_str = self.hdl.get_bitmap_str()
+		image = Image.open(StringIO(bitmap_str))
+		self.assertEqual(image.size, (40, 30))
+		self.assertTrue(self.hdl.get_bitmap_str() is bitmap_str)
+
+	def test05_b64_strings(self):
+		hdl = EditableImageHandler(None)
+		hdl.set_images_from_b64str(b64encode(self.bitmap_str))
+		self.assertEqual(hdl.get_bitmap_str(), self.bitmap_str)
+		self.assertFalse(hdl.has_alpha())
+		self.assertTrue(hdl.get_alpha_b64str() is None)
+
+	def test06_copy(self):
+		hdl = self.hdl.copy()
+		self.assertFalse(hdl.is_decoded())
+		self.assertTrue(hdl.get_bitmap_str() is self.bitmap_str)
+		hdl.remove_alpha()
+		self.assertFalse(hdl.has_alpha())
+		self.assertTrue(self.hdl.has_alpha())
+
+	def test07_replaced_bitmap(self):
+		self.hdl.bitmap
+		bitmap_str = get_image_str('CMYK', (10, 20), (0, 0, 0, 255), 'TIFF')
+		self.hdl.set_images_from_str(bitmap_str)
+		self.assertFalse(self.hdl.is_decoded())
+		self.assertEqual(self.hdl.get_size(), (10, 20))
+		self.assertEqual(self.hdl.get_mode(), 'CMYK')
+		self.assertTrue(self.hdl.get_alpha_str() is self.alpha_str)
+
+
+
+class TestImageCache(unittest.TestCase):
+
+	def test01_lru_eviction(self):
+		cache = ImageCache(100)
+		cache.put('a', 'A', 40)
+		cache.put('b', 'B', 40)
+		self.assertEqual(cache.get('a'), 'A')
+		cache.put('c', 'C', 40)
+		self.assertEqual(cache.get('b'), None)
+		self.assertEqual(cache.get('a'), 'A')
+		self.assertEqual(cache.get('c'), 'C')
+		self.assertEqual(cache.get_cache_info(), (3, 1, 2, 80, 100))
+
+	def test02_large_value(self):
+		cache = ImageCache(100)
+		cache.put('a', 'A', 101)
+		self.assertEqual(cache.get('a'), None)
+		cache.put('a', 'A', 10)
+		cache.put('a', 'AA', 20)
+		self.assertEqual(cache.get('a'), 'AA')
+		self.assertEqual(cache.size, 20)
+
+	def test03_shared_decoding(self):
+		IMAGE_CACHE.clear()
+		bitmap_str = get_image_str('RGB', (40, 30), (0, 255, 0))
+		hdl1 = EditableImageHandler(None)
+		hdl1.set_images_from_str(bitmap_str)
+		hdl2 = EditableImageHandler(None)
+		hdl2.set_images_from_str(bitmap_str)
+		self.assertEqual(hdl1.get_content_hash(), hdl2.get_content_hash())
+		self.assertTrue(hdl1.bitmap is hdl2.bitmap)
+
+	def test04_content_hash(self):
+		hdl1 = EditableImageHandler(None)
+		hdl1.set_images_from_str(get_image_str('RGB', (40, 30), (0, 0, 255)))
+		self.assertEqual(hdl1.get_content_hash()[1], None)
+		hdl1.flip_left_to_right()
+		hdl2 = EditableImageHandler(None)
+		hdl2.set_images(Image.new('RGB', (40, 30), (0, 0, 255)))
+		self.assertEqual(hdl1.get_content_hash(), hdl2.get_content_hash())
+		hdl2.set_images(alpha=Image.new('L', (40, 30), 0))
+		self.assertNotEqual(hdl1.get_content_hash(), hdl2.get_content_hash())
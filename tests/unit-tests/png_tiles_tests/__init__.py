@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import os
+import shutil
+import tempfile
+import unittest
+from cStringIO import StringIO
+
+from PIL import Image
+
+import uc2
+from uc2 import sk2const, uc2const
+from uc2.formats.png import png_saver, png_tiles
+from uc2.formats.sk2 import sk2_model
+from uc2.formats.sk2.sk2_presenter import SK2_Presenter
+
+RED = [uc2const.COLOR_RGB, [1.0, 0.0, 0.0], 1.0, '']
+BLUE = [uc2const.COLOR_RGB, [0.0, 0.0, 1.0], 1.0, '']
+BLACK = [uc2const.COLOR_RGB, [0.0, 0.0, 0.0], 1.0, '']
+
+
+def get_style(color, stroke=True):
+	fill = [sk2const.FILL_EVENODD, sk2const.FILL_SOLID, color]
+	stroke = [sk2const.STROKE_MIDDLE, 2.0, BLACK, [], 0, 0,
+		10.433, 0, 0, []] if stroke else []
+	return [fill, stroke, [u'Sans', u'Regular', 12.0, 0, [], True],
+		[[], [], [], []]]
+
+
+class TestPNGStreamWriter(unittest.TestCase):
+
+	def test01_tiles(self):
+		bands = png_tiles.get_tiles(100, 70, 32)
+		self.assertEqual(len(bands), 3)
+		self.assertEqual([band[0][3] for band in bands], [32, 32, 6])
+		self.assertEqual([band[0][1] for band in bands], [0, 32, 64])
+		for band in bands:
+			self.assertEqual([tile[0] for tile in band], [0, 32, 64, 96])
+			self.assertEqual([tile[2] for tile in band], [32, 32, 32, 4])
+		self.assertEqual(bands[-1][-1], (96, 64, 4, 6))
+		self.assertEqual(png_tiles.get_tiles(64, 64, 32),
+			[[(0, 0, 32, 32), (32, 0, 32, 32)],
+			 [(0, 32, 32, 32), (32, 32, 32, 32)]])
+		self.assertEqual(png_tiles.get_tiles(10, 5, 32), [[(0, 0, 10, 5)]])
+
+	def test02_rows(self):
+		pixels = [(255, 0, 0, 255), (0, 255, 0, 128), (0, 0, 255, 0),
+			(10, 20, 30, 40), (50, 60, 70, 80), (90, 100, 110, 120)]
+		data = b''.join([b''.join([chr(item) for item in pixel])
+			for pixel in pixels])
+		fileptr = StringIO()
+		writer = png_tiles.PNGStreamWriter(fileptr, 3, 2)
+		writer.write_rows(data[:12])
+		writer.write_rows(data[12:])
+		writer.close()
+		image = Image.open(StringIO(fileptr.getvalue()))
+		self.assertEqual(image.size, (3, 2))
+		self.assertEqual(image.mode, 'RGBA')
+		self.assertEqual(list(image.getdata()), pixels)
+
+	def test03_missing_rows(self):
+		writer = png_tiles.PNGStreamWriter(StringIO(), 3, 2)
+		writer.write_rows(b'\x00' * 12)
+		self.assertRaises(IOError, writer.close)
+		writer = png_tiles.PNGStreamWriter(StringIO(), 3, 2)
+		self.assertRaises(IOError, writer.close)
+
+
+class TestTiledRendering(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp_dir = tempfile.mkdtemp()
+		self.app = uc2.uc2_init()
+		self.app.init_mngrs()
+		self.doc = SK2_Presenter(self.app.appdata)
+		methods = self.doc.methods
+		page = methods.get_page()
+		methods.set_page_format(page, ['Custom', [100.0, 70.0],
+			uc2const.LANDSCAPE])
+		config = self.doc.config
+		objs = [
+			sk2_model.Rectangle(config, None, [-45.0, -30.0, 60.0, 40.0],
+				[1.0, 0.0, 0.0, 1.0, 0.0, 0.0], get_style(RED)),
+			sk2_model.Circle(config, None, [0.0, -30.0, 40.0, 40.0],
+				style=get_style(BLUE, False)),
+		]
+		methods.append_objects(objs, methods.get_layer(page))
+		self.doc.update()
+
+	def tearDown(self):
+		self.doc.close()
+		shutil.rmtree(self.tmp_dir)
+
+	def render(self, name, **cnf):
+		path = os.path.join(self.tmp_dir, name)
+		png_saver(self.doc, path, cnf=dict(cnf, image_antialiasing=False))
+		image = Image.open(path)
+		image.load()
+		return image
+
+	def test01_tiled_rendering(self):
+		image = self.render('page.png', image_tile_size=-1)
+		self.assertEqual(image.size, (100, 70))
+		for tile_size in (16, 30, 100):
+			tiled = self.render('tiled%d.png' % tile_size,
+				image_tile_size=tile_size, image_threads=2)
+			self.assertEqual(tiled.size, image.size)
+			self.assertEqual(list(tiled.convert('RGBA').getdata()),
+				list(image.convert('RGBA').getdata()))
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import unittest
+
+from uc2 import events
+
+
+class TestProgress(unittest.TestCase):
+
+	def setUp(self):
+		self.messages = []
+		events.clean_channel(events.FILTER_INFO)
+
+	def tearDown(self):
+		events.clean_channel(events.FILTER_INFO)
+
+	def receiver(self, msg, position):
+		self.messages.append((msg, position))
+
+	def connect(self):
+		events.connect(events.FILTER_INFO, self.receiver)
+
+	def test01_no_receivers(self):
+		self.assertFalse(events.has_receivers(events.FILTER_INFO))
+		progress = events.Progress('msg', interval=0.0)
+		self.assertFalse(progress.is_active())
+		progress.set_total(1000)
+		for _i in range(1000):
+			progress.tick()
+		progress.update(0.5, force=True)
+		events.emit_progress('msg', 1.0)
+		self.assertTrue(progress.position is None)
+
+	def test02_step_throttling(self):
+		self.connect()
+		progress = events.Progress('msg', interval=0.0, step=0.0995)
+		for index in range(1001):
+			progress.update(index / 1000.0)
+		self.assertEqual(len(self.messages), 11)
+		self.assertEqual(self.messages[0], ('msg', 0.0))
+		self.assertAlmostEqual(self.messages[-1][1], 1.0)
+
+	def test03_time_throttling(self):
+		self.connect()
+		progress = events.Progress('msg', interval=1000.0, step=0.0)
+		for index in range(100):
+			progress.update(index / 100.0)
+		self.assertEqual(len(self.messages), 1)
+		progress.update(1.0, 'done', force=True)
+		self.assertEqual(self.messages[-1], ('done', 1.0))
+
+	def test04_ticks(self):
+		self.connect()
+		progress = events.Progress('msg', interval=0.0, step=0.0)
+		progress.set_total(10000)
+		for _i in range(10000):
+			progress.tick()
+		self.assertEqual(len(self.messages), 100)
+		self.assertAlmostEqual(self.messages[-1][1], 1.0)
+
+	def test05_range(self):
+		self.connect()
+		progress = events.Progress('msg', start=0.5, end=0.75,
+								   interval=0.0, step=0.0)
+		progress.update(0.0)
+		progress.update(1.0)
+		self.assertEqual([item[1] for item in self.messages], [0.5, 0.75])
+		progress.set_range(0.0, 0.5)
+		progress.update(0.5)
+		self.assertEqual(self.messages[-1][1], 0.25)
+
+	def test06_receiver_errors(self):
+		def failing_receiver(*args):
+			raise ValueError('receiver error')
+
+		events.connect(events.FILTER_INFO, failing_receiver)
+		self.connect()
+		events.emit_progress('msg', 0.5)
+		self.assertEqual(self.messages, [('msg', 0.5)])
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+
+from uc2 import msgconst
+import uc2.cmds.serve
+
+# uc2.cmds.serve name is taken by server function
+serve = sys.modules['uc2.cmds.serve']
+
+
+class FakeResult(object):
+
+	def __init__(self, value=None, error=None):
+		self.value = value
+		self.error = error
+
+	def get(self, timeout=None):
+		if self.error is not None:
+			raise self.error
+		return self.value
+
+
+class FakePool(object):
+	"""
+	Runs nothing, returns successful job result with single message.
+	Pool with error fails all jobs by this error.
+	"""
+	error = None
+	terminated = False
+
+	def apply_async(self, func, args):
+		filepath, out_filepath, options = args[0]
+		return FakeResult((filepath, out_filepath, True,
+			[(msgconst.OK, 'done')]), self.error)
+
+	def terminate(self):
+		self.terminated = True
+
+	def join(self):
+		pass
+
+
+def crash_worker(job):
+	os._exit(1)
+
+
+def init_worker():
+	pass
+
+
+class TestConversionServer(unittest.TestCase):
+
+	def setUp(self):
+		self.workdir = tempfile.mkdtemp()
+		self.path = os.path.join(self.workdir, serve.SOCKET_NAME)
+		self.pools = []
+		self.pool_factory = serve.multiprocessing.Pool
+		serve.multiprocessing.Pool = self.get_pool
+
+	def tearDown(self):
+		serve.multiprocessing.Pool = self.pool_factory
+		shutil.rmtree(self.workdir)
+
+	def get_pool(self, *_args):
+		self.pools.append(FakePool())
+		return self.pools[-1]
+
+	def start_server(self):
+		server = serve.ConversionServer(self.path, serve.ConversionHandler)
+		server.start_pool(1)
+		server.workdir = self.workdir
+		thread = threading.Thread(target=server.serve_forever)
+		thread.start()
+		return server, thread
+
+	def send(self, lines):
+		sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		sock.connect(self.path)
+		fileptr = sock.makefile('rwb')
+		for line in lines:
+			fileptr.write(line.encode('utf-8') + b'\n')
+		fileptr.flush()
+		responses = [json.loads(fileptr.readline().decode('utf-8'))
+			for _line in lines]
+		fileptr.close()
+		sock.close()
+		return responses
+
+	def test01_requests(self):
+		server, thread = self.start_server()
+		try:
+			job = {'id': 2, 'input': 'in.sk2', 'output': '/tmp/out.svg'}
+			responses = self.send([
+				json.dumps({'id': 1, 'command': 'ping'}),
+				json.dumps(job),
+				json.dumps({'id': 3, 'input': 'in.sk2'}),
+				'{broken',
+				'[]',
+			])
+		finally:
+			server.shutdown()
+			thread.join()
+			server.server_close()
+		self.assertEqual(responses[0], {'id': 1, 'status': 'ok'})
+		response = responses[1]
+		self.assertEqual(response['id'], 2)
+		self.assertEqual(response['status'], 'ok')
+		self.assertEqual(response['input'],
+			os.path.join(self.workdir, 'in.sk2'))
+		self.assertEqual(response['output'], '/tmp/out.svg')
+		self.assertEqual(response['messages'],
+			[[msgconst.MESSAGES[msgconst.OK], 'done']])
+		self.assertEqual(responses[2]['id'], 3)
+		self.assertEqual(responses[2]['status'], 'fail')
+		self.assertTrue(responses[2]['error'])
+		for response in responses[3:]:
+			self.assertEqual(response['status'], 'fail')
+			self.assertFalse('id' in response)
+
+	def test02_shutdown_command(self):
+		server, thread = self.start_server()
+		try:
+			response = self.send([json.dumps({'command': 'shutdown'})])[0]
+			thread.join(5.0)
+			self.assertFalse(thread.is_alive())
+		finally:
+			if thread.is_alive():
+				server.shutdown()
+				thread.join()
+			server.server_close()
+		self.assertEqual(response, {'status': 'ok'})
+
+	def test03_stale_socket(self):
+		sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		sock.bind(self.path)
+		sock.close()
+		self.assertTrue(os.path.exists(self.path))
+		self.assertTrue(serve._check_stale_socket(self.path))
+		self.assertFalse(os.path.exists(self.path))
+		self.assertTrue(serve._check_stale_socket(self.path))
+
+	def test04_live_socket(self):
+		sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		sock.bind(self.path)
+		sock.listen(1)
+		try:
+			self.assertFalse(serve._check_stale_socket(self.path))
+			self.assertTrue(os.path.exists(self.path))
+		finally:
+			sock.close()
+
+	def test05_not_socket(self):
+		with open(self.path, 'wb') as fileptr:
+			fileptr.write(b'data')
+		self.assertFalse(serve._check_stale_socket(self.path))
+		self.assertRaises(Exception, serve.serve, None,
+			{'serve': self.path})
+		with open(self.path, 'rb') as fileptr:
+			self.assertEqual(fileptr.read(), b'data')
+
+	def test06_bind_failure(self):
+		path = os.path.join(self.workdir, 'missing', serve.SOCKET_NAME)
+		self.assertRaises(socket.error, serve.serve, None, {'serve': path})
+		self.assertEqual(self.pools, [])
+
+	def test07_job_timeout(self):
+		server = serve.ConversionServer(self.path, serve.ConversionHandler)
+		try:
+			server.workdir = self.workdir
+			server.start_pool(1)
+			pool = server.pool
+			pool.error = serve.multiprocessing.TimeoutError()
+			job = {'id': 1, 'input': 'in.sk2', 'output': 'out.svg'}
+			response = server.run_job(job)
+			self.assertEqual(response['status'], 'fail')
+			self.assertTrue(response['error'])
+			self.assertTrue(pool.terminated)
+			self.assertEqual(len(self.pools), 2)
+			self.assertTrue(server.pool is self.pools[1])
+			self.assertEqual(server.run_job(job)['status'], 'ok')
+		finally:
+			server.stop_pool()
+			server.server_close()
+		self.assertTrue(self.pools[1].terminated)
+
+	def test08_crashed_worker(self):
+		serve.multiprocessing.Pool = self.pool_factory
+		init_server_worker = serve._init_server_worker
+		worker_convert = serve.translate._worker_convert
+		serve._init_server_worker = init_worker
+		serve.translate._worker_convert = crash_worker
+		server = serve.ConversionServer(self.path, serve.ConversionHandler)
+		try:
+			server.workdir = self.workdir
+			server.job_timeout = 2
+			server.start_pool(1)
+			pool = server.pool
+			response = server.run_job({'id': 1, 'input': 'in.sk2',
+				'output': 'out.svg'})
+			self.assertEqual(response['status'], 'fail')
+			self.assertFalse(server.pool is pool)
+		finally:
+			serve._init_server_worker = init_server_worker
+			serve.translate._worker_convert = worker_convert
+			server.stop_pool()
+			server.server_close()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2021 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import unittest
+import random
+import unittest
+
+from uc2.libgeom.spatial import SpatialIndex
+
+
+def is_intersected(bbox1, bbox2):
+	return not (bbox1[0] > bbox2[2] or bbox1[2] < bbox2[0] or
+				bbox1[1] > bbox2[3] or bbox1[3] < bbox2[1])
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+	def setUp(self):
+		rnd = random.Random(1)
+		self.items = []
+		for i in range(3000):
+			x, y = rnd.uniform(0, 1000), rnd.uniform(0, 1000)
+			bbox = [x, y, x + rnd.uniform(0, 20), y + rnd.uniform(0, 20)]
+			self.items.append((bbox, i))
+		self.index = SpatialIndex(self.items)
+
+	def test01_empty(self):
+		index = SpatialIndex([])
+		self.assertEqual(len(index), 0)
+		self.assertEqual(index.bbox, [])
+		self.assertEqual(index.query([0, 0, 10, 10]), [])
+
+	def test02_bbox(self):
+		bbox = self.index.bbox
+		self.assertEqual(bbox[0], min(item[0][0] for item in self.items))
+		self.assertEqual(bbox[3], max(item[0][3] for item in self.items))
+		self.assertEqual(self.index.query(bbox), list(range(3000)))
+
+	def test03_queries(self):
+		rnd = random.Random(2)
+		for _i in range(50):
+			x, y = rnd.uniform(0, 1000), rnd.uniform(0, 1000)
+			bbox = [x, y, x + rnd.uniform(0, 150), y + rnd.uniform(0, 150)]
+			result = [i for item_bbox, i in self.items
+					  if is_intersected(item_bbox, bbox)]
+			self.assertEqual(self.index.query(bbox), result)
+
+	def test04_unbound_items(self):
+		index = SpatialIndex([([5, 5, 6, 6], 'a'), ([], 'b'),
+							  ([16, 6, 15, 5], 'c')])
+		self.assertEqual(index.query([0, 0, 1, 1]), ['b'])
+		self.assertEqual(index.query([14, 4, 20, 5]), ['b', 'c'])
+		self.assertEqual(index.query([20, 20, 0, 0]), ['a', 'b', 'c'])